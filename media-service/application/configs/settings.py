@@ -14,9 +14,34 @@ class AppConfig(BaseModel):
     port: int = 8003
 
 
+class AccessLogConfig(BaseModel):
+    enabled: bool = True
+    # Доля успешных запросов в access-логе; 5xx и медленные пишутся всегда.
+    # Полный лог: ACCESS_SAMPLE_RATE=1.0
+    sample_rate: float = 0.1
+    slow_threshold_ms: float = 1000.0
+
+
+class ProfilingConfig(BaseModel):
+    # Запуск tracemalloc при старте процесса; по умолчанию только через admin API
+    memory_on_start: bool = False
+    traceback_frames: int = 1
+    top_limit: int = 25
+    # Токен заголовка X-Admin-Token; без него admin API профилирования отключено
+    admin_token: str | None = None
+
+
+class SqlMetricsConfig(BaseModel):
+    # Метрики SQL по эндпоинтам (число запросов, время, строки)
+    enabled: bool = True
+    # Детектор N+1 работает только в режиме DEV: порог повторов одной формы запроса
+    n_plus_one_threshold: int = 5
+
+
 class ApiV1Prefix(BaseModel):
     prefix: str = "/v1"
     service: str = "/media_service"
+    profiling: str = "/profiling"
 
 
 class ApiPrefix(BaseModel):
@@ -78,9 +103,14 @@ class Settings(BaseSettings):
         env_file=str(ENV_PATH),
         case_sensitive=False,
         env_nested_delimiter="_",
+        # Делится только первый "_" после префикса секции: MEDIA_ACCESS_SAMPLE_RATE -> access.sample_rate
+        env_nested_max_split=1,
         env_prefix="MEDIA_",
     )
     app: AppConfig
+    access: AccessLogConfig = AccessLogConfig()
+    profiling: ProfilingConfig = ProfilingConfig()
+    sql_metrics: SqlMetricsConfig = SqlMetricsConfig()
     api: ApiPrefix = ApiPrefix()
     db: DatabaseSettings
     s3: S3Settings
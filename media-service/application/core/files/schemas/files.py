@@ -3,9 +3,13 @@ from enum import Enum
 from uuid import UUID
 
 from fastapi import UploadFile
-from pydantic import BaseModel, ConfigDict
+from pydantic import BaseModel, ConfigDict, Field
 
-from application.utils.constants import NOTES_ATTACHMENT_NAME, USERS_AVATAR_NAME
+from application.utils.constants import (
+    DELETE_BATCH_MAX_FILES,
+    NOTES_ATTACHMENT_NAME,
+    USERS_AVATAR_NAME,
+)
 
 
 class FileProcessUCInputDTO(BaseModel):
@@ -89,3 +93,13 @@ class FileMeatadataRead(FileMetadataBase):
 
 class FileMetadataDelete(BaseModel):
     id: int
+
+
+class FilesBatchDeleteRequest(BaseModel):
+    file_uuids: list[UUID] = Field(min_length=1, max_length=DELETE_BATCH_MAX_FILES)
+
+
+class FileDeleteResult(BaseModel):
+    uuid: UUID
+    ok: bool
+    error: str | None = None
@@ -0,0 +1,110 @@
+from uuid import UUID
+
+from application.core.files.schemas.files import FileDeleteResult
+from application.exceptions.base import BaseAPIException
+from application.exceptions.exceptions import DeleteFileFailedError
+from application.repositories.database.commiter import Commiter
+from application.repositories.files_repository import FileRepository
+from application.repositories.storage.s3.client import S3Client
+from application.utils.logging import logger
+
+
+class DeleteFilesBatchUseCase:
+    """Удаление нескольких файлов за один запрос.
+
+    Метаданные читаются одним SELECT, объекты удаляются из S3 одним
+    DeleteObjects, записи удаляются из БД одним DELETE. Результат
+    возвращается отдельно по каждому файлу.
+    """
+
+    def __init__(
+        self,
+        file_meta_repo: FileRepository,
+        s3_client: S3Client,
+        commiter: Commiter,
+    ) -> None:
+        self.s3_client = s3_client
+        self.file_meta_repo = file_meta_repo
+        self.commiter = commiter
+
+    async def execute(self, file_ids: list[UUID]) -> list[FileDeleteResult]:
+        try:
+            file_ids = list(dict.fromkeys(file_ids))
+            logger.info(f"[DeleteFilesBatch] Начало удаления {len(file_ids)} файлов")
+
+            # 1. Получение метаданных всех файлов из БД
+            files = await self.file_meta_repo.get_files_metadata_batch(
+                file_uuids=file_ids
+            )
+            files_by_id = {file.file_id: file for file in files}
+
+            errors: dict[UUID, str] = {}
+            keys_by_id: dict[UUID, str] = {}
+            for file_id in file_ids:
+                file_obj = files_by_id.get(file_id)
+                if not file_obj:
+                    errors[file_id] = "File not found"
+                elif not file_obj.s3_url:
+                    errors[file_id] = "S3 URL is missing"
+                else:
+                    try:
+                        keys_by_id[file_id] = await self.s3_client.convert_url_to_key(
+                            url=file_obj.s3_url
+                        )
+                    except ValueError as e:
+                        errors[file_id] = str(e)
+
+            # 2. Удаление из S3 одним запросом
+            s3_errors = await self.s3_client.delete_objects(
+                keys=list(keys_by_id.values())
+            )
+            deleted_ids = []
+            for file_id, key in keys_by_id.items():
+                if key in s3_errors:
+                    errors[file_id] = f"Failed to delete from S3: {s3_errors[key]}"
+                else:
+                    deleted_ids.append(file_id)
+
+            # 3. Удаление метаданных из БД
+            if deleted_ids:
+                await self._delete_files_db(file_ids=deleted_ids)
+
+            logger.info(
+                f"[DeleteFilesBatch] Удалено {len(deleted_ids)}/{len(file_ids)} файлов"
+            )
+            if errors:
+                logger.warning(f"[DeleteFilesBatch] Ошибки удаления: {errors}")
+
+            return [
+                FileDeleteResult(
+                    uuid=file_id,
+                    ok=file_id not in errors,
+                    error=errors.get(file_id),
+                )
+                for file_id in file_ids
+            ]
+
+        except BaseAPIException:
+            raise
+        except Exception as e:
+            logger.exception(f"[DeleteFilesBatch] Неожиданная ошибка удаления: {e}")
+            raise DeleteFileFailedError(
+                detail=f"Failed to delete files: {str(e)}"
+            ) from e
+
+    async def _delete_files_db(self, file_ids: list[UUID]) -> None:
+        try:
+            await self.file_meta_repo.delete_files_metadata_batch(file_uuids=file_ids)
+            await self.commiter.commit()
+            logger.info(
+                f"[DeleteFilesBatch] Метаданные удалены из БД: {len(file_ids)} файлов"
+            )
+        except BaseAPIException:
+            await self.commiter.rollback()
+            raise
+        except Exception as e:
+            await self.commiter.rollback()
+            logger.exception(f"[DeleteFilesBatch] Ошибка удаления метаданных: {e}")
+            raise DeleteFileFailedError(
+                detail=f"Failed to delete metadata: {str(e)}"
+            ) from e
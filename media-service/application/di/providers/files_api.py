@@ -2,6 +2,7 @@ from dishka import Provider, Scope, provide
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from application.core.files.use_cases.delete_file import DeleteFileUseCase
+from application.core.files.use_cases.delete_files_batch import DeleteFilesBatchUseCase
 from application.core.files.use_cases.process_file import ProcessFileUseCase
 from application.core.files.use_cases.upload_file import UploadFileUseCase
 from application.repositories.database.commiter import Commiter
@@ -81,5 +82,18 @@ class FilesProvider(Provider):
             commiter=commiter,
         )
 
+    @provide(scope=Scope.REQUEST)
+    def delete_files_batch_use_case(
+        self,
+        s3_client: S3Client,
+        file_meta_repo: FileRepository,
+        commiter: Commiter,
+    ) -> DeleteFilesBatchUseCase:
+        return DeleteFilesBatchUseCase(
+            s3_client=s3_client,
+            file_meta_repo=file_meta_repo,
+            commiter=commiter,
+        )
+
 
 # Create File Metadata Use case provider
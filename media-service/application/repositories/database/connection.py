@@ -6,6 +6,7 @@ from sqlalchemy.ext.asyncio import (
 )
 
 from application.configs.settings import settings
+from application.utils.sql_metrics import instrument_engine
 
 engine: AsyncEngine = create_async_engine(
     url=settings.db.DB_URL_asyncpg,
@@ -14,6 +15,9 @@ engine: AsyncEngine = create_async_engine(
     pool_size=settings.db.pool_size,
     max_overflow=settings.db.max_overflow,
 )
+if settings.sql_metrics.enabled:
+    instrument_engine(engine)
+
 async_session: async_sessionmaker[AsyncSession] = async_sessionmaker(
     bind=engine,
     autoflush=False,
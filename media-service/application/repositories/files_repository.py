@@ -1,6 +1,6 @@
 from uuid import UUID
 
-from sqlalchemy import or_, select
+from sqlalchemy import delete, or_, select
 from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.ext.asyncio import AsyncSession
 
@@ -93,6 +93,49 @@ class FileRepository:
                 f"Не удалось получить метаданные файла с UUID {file_uuid} из-за неожиданной ошибки."
             ) from e
 
+    async def get_files_metadata_batch(
+        self, file_uuids: list[UUID]
+    ) -> list[FilesMetadataOrm]:
+        try:
+            stmt = (
+                select(FilesMetadataOrm)
+                .where(FilesMetadataOrm.file_id.in_(file_uuids))
+                .order_by(FilesMetadataOrm.id)
+            )
+            result = await self.session.scalars(stmt)
+            return list(result.all())
+        except SQLAlchemyError as e:
+            logger.exception(f"Ошибка БД при пакетном получении метаданных: {e}")
+            raise RepositoryInternalError(
+                "Не удалось получить метаданные файлов из-за ошибки базы данных."
+            ) from e
+        except Exception as e:
+            logger.exception(
+                f"Неожиданная ошибка при пакетном получении метаданных: {e}"
+            )
+            raise RepositoryInternalError(
+                "Не удалось получить метаданные файлов из-за неожиданной ошибки."
+            ) from e
+
+    async def delete_files_metadata_batch(self, file_uuids: list[UUID]) -> None:
+        try:
+            await self.session.execute(
+                delete(FilesMetadataOrm).where(FilesMetadataOrm.file_id.in_(file_uuids))
+            )
+            await self.session.flush()
+        except SQLAlchemyError as e:
+            logger.exception(f"Ошибка БД при пакетном удалении метаданных: {e}")
+            raise RepositoryInternalError(
+                "Не удалось удалить метаданные файлов из-за ошибки базы данных."
+            ) from e
+        except Exception as e:
+            logger.exception(
+                f"Неожиданная ошибка при пакетном удалении метаданных: {e}"
+            )
+            raise RepositoryInternalError(
+                "Не удалось удалить метаданные файлов из-за неожиданной ошибки."
+            ) from e
+
     async def delete_file_metadata(self, file_metadata_obj: FilesMetadataOrm) -> None:
         try:
             await self.session.delete(file_metadata_obj)
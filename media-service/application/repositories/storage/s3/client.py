@@ -8,6 +8,7 @@ from application.exceptions.exceptions import (
     S3DeleteObjectFailedError,
     S3PutObjectFailedError,
 )
+from application.utils.constants import S3_DELETE_OBJECTS_LIMIT
 from application.utils.logging import logger
 
 
@@ -70,6 +71,38 @@ class S3Client:
                 detail=f"Failed to delete {key}: {str(e)}"
             ) from e
 
+    async def delete_objects(self, keys: list[str]) -> dict[str, str]:
+        """Удаляет несколько объектов одним запросом DeleteObjects.
+
+        Возвращает словарь {key: сообщение об ошибке} для неудаленных объектов.
+        """
+        errors: dict[str, str] = {}
+        if not keys:
+            return errors
+        try:
+            async with self.get_client() as client:
+                for start in range(0, len(keys), S3_DELETE_OBJECTS_LIMIT):
+                    chunk = keys[start : start + S3_DELETE_OBJECTS_LIMIT]
+                    response = await client.delete_objects(
+                        Bucket=self.bucket_name,
+                        Delete={
+                            "Objects": [{"Key": key} for key in chunk],
+                            "Quiet": True,
+                        },
+                    )  # type: ignore
+                    for error in response.get("Errors", []):
+                        errors[error["Key"]] = error.get("Message", "Unknown error")
+
+            logger.info(
+                f"[S3] Пакетное удаление: {len(keys) - len(errors)}/{len(keys)} файлов"
+            )
+            return errors
+        except Exception as e:
+            logger.exception(f"[S3] Ошибка пакетного удаления: {keys}")
+            raise S3DeleteObjectFailedError(
+                detail=f"Failed to delete {len(keys)} objects: {str(e)}"
+            ) from e
+
     async def move_file(
         self,
         src_key: str,
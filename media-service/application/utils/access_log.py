@@ -0,0 +1,64 @@
+import random
+import time
+
+from application.utils.logging import logger
+
+UNMATCHED_ROUTE = "<unmatched>"
+
+
+class AccessLogMiddleware:
+    """ASGI middleware структурного access-лога.
+
+    Тело запроса и заголовки не читаются: пишутся метод, шаблон пути
+    маршрута, статус и длительность. Успешные быстрые запросы пишутся
+    с вероятностью sample_rate, ошибки 5xx и медленные - всегда.
+    """
+
+    def __init__(
+        self, app, sample_rate: float = 1.0, slow_threshold_ms: float = 1000.0
+    ):
+        self.app = app
+        self.sample_rate = sample_rate
+        self.slow_threshold_ms = slow_threshold_ms
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started_at = time.perf_counter()
+        status_code = 500
+
+        async def send_with_status(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            duration_ms = (time.perf_counter() - started_at) * 1000
+            rate = self._sample_rate(status_code, duration_ms)
+            if rate is not None:
+                route = scope.get("route")
+                logger.bind(
+                    access={
+                        "method": scope["method"],
+                        "path": getattr(route, "path_format", None)
+                        or getattr(route, "path", None)
+                        or UNMATCHED_ROUTE,
+                        "status": status_code,
+                        "duration_ms": round(duration_ms, 2),
+                        # Вес записи при подсчете: запрос представляет 1 / sample_rate запросов
+                        "sample_rate": rate,
+                    }
+                ).info("access")
+
+    def _sample_rate(self, status_code: int, duration_ms: float) -> float | None:
+        """Доля, с которой записан запрос, или None, если он не попал в выборку"""
+        if status_code >= 500 or duration_ms >= self.slow_threshold_ms:
+            return 1.0
+        if random.random() < self.sample_rate:
+            return self.sample_rate
+        return None
@@ -90,3 +90,8 @@ AVATARS = {
 
 NOTES_ATTACHMENT_NAME = "post_attachment"
 USERS_AVATAR_NAME = "avatar"
+
+# Максимум ключей в одном запросе S3 DeleteObjects
+S3_DELETE_OBJECTS_LIMIT = 1000
+# Максимум файлов в одном запросе пакетного удаления
+DELETE_BATCH_MAX_FILES = 100
@@ -0,0 +1,156 @@
+import re
+import time
+from collections import Counter
+from contextvars import ContextVar
+
+from prometheus_client import Histogram
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from application.utils.logging import logger
+
+UNMATCHED_ROUTE = "<unmatched>"
+STATE_KEY = "sql_stats"
+
+# Списки плейсхолдеров (IN из selectin и expanding-параметров) и пробелы
+# схлопываются: запросы, отличающиеся только числом параметров, - одна форма
+_PLACEHOLDERS_RE = re.compile(r"\$\d+(?:\s*,\s*\$\d+)*")
+_WHITESPACE_RE = re.compile(r"\s+")
+
+sql_queries = Histogram(
+    "http_request_sql_queries",
+    "Число SQL-запросов на HTTP-запрос",
+    ["handler", "method"],
+    buckets=(0, 1, 2, 3, 5, 10, 20, 50, 100),
+)
+sql_duration_seconds = Histogram(
+    "http_request_sql_duration_seconds",
+    "Время выполнения SQL на HTTP-запрос",
+    ["handler", "method"],
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5),
+)
+sql_rows = Histogram(
+    "http_request_sql_rows",
+    "Строк, возвращенных или затронутых SQL, на HTTP-запрос",
+    ["handler", "method"],
+    buckets=(0, 1, 10, 50, 100, 500, 1000, 5000, 10000),
+)
+
+
+class SqlStats:
+    """Счетчики SQL одного HTTP-запроса"""
+
+    __slots__ = ("queries", "duration", "rows", "shapes")
+
+    def __init__(self) -> None:
+        self.queries = 0
+        self.duration = 0.0
+        self.rows = 0
+        self.shapes: Counter[str] = Counter()
+
+    def add(self, statement: str, duration: float, rowcount: int) -> None:
+        self.queries += 1
+        self.duration += duration
+        # Для executemany и серверных курсоров драйвер возвращает -1
+        self.rows += max(rowcount, 0)
+        self.shapes[statement_shape(statement)] += 1
+
+
+_current_stats: ContextVar[SqlStats | None] = ContextVar("sql_stats", default=None)
+
+
+def statement_shape(statement: str) -> str:
+    shape = _PLACEHOLDERS_RE.sub("?", statement)
+    return _WHITESPACE_RE.sub(" ", shape).strip()
+
+
+def instrument_engine(engine: AsyncEngine) -> None:
+    """Подписка на события курсора движка.
+
+    Время считается вокруг execute курсора: asyncpg выбирает строки сразу,
+    поэтому в него входит и получение результата. Запросы вне HTTP-запроса
+    (lifespan, фоновые задачи) не учитываются.
+    """
+    sync_engine = engine.sync_engine
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def before_cursor_execute(
+        conn, cursor, statement, parameters, context, executemany
+    ):
+        context.sql_started_at = time.perf_counter()
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        stats = _current_stats.get()
+        if stats is not None:
+            stats.add(
+                statement,
+                time.perf_counter() - context.sql_started_at,
+                cursor.rowcount,
+            )
+
+
+class SqlStatsMiddleware:
+    """ASGI middleware сбора статистики SQL по запросу.
+
+    Счетчики кладутся в request.state, откуда их забирает инструментация
+    Instrumentator. С detect_n_plus_one формы запросов, повторенные не меньше
+    n_plus_one_threshold раз за запрос, пишутся в лог как вероятный N+1.
+    """
+
+    def __init__(
+        self, app, detect_n_plus_one: bool = False, n_plus_one_threshold: int = 5
+    ):
+        self.app = app
+        self.detect_n_plus_one = detect_n_plus_one
+        self.n_plus_one_threshold = n_plus_one_threshold
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = SqlStats()
+        scope.setdefault("state", {})[STATE_KEY] = stats
+        token = _current_stats.set(stats)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            _current_stats.reset(token)
+            if self.detect_n_plus_one:
+                self._report_n_plus_one(scope, stats)
+
+    def _report_n_plus_one(self, scope, stats: SqlStats) -> None:
+        repeated = [
+            (shape, count)
+            for shape, count in stats.shapes.most_common()
+            if count >= self.n_plus_one_threshold
+        ]
+        if not repeated:
+            return
+        route = scope.get("route")
+        path = (
+            getattr(route, "path_format", None)
+            or getattr(route, "path", None)
+            or UNMATCHED_ROUTE
+        )
+        for shape, count in repeated:
+            logger.warning(
+                f"Вероятный N+1: {scope['method']} {path} выполнил {count} "
+                f"одинаковых запросов из {stats.queries}: {shape[:500]}"
+            )
+
+
+def sql_metrics():
+    """Инструментация Instrumentator: число запросов, время SQL и строки по эндпоинту"""
+
+    def instrumentation(info) -> None:
+        stats = getattr(info.request.state, STATE_KEY, None)
+        if stats is None:
+            return
+        labels = (info.modified_handler, info.method)
+        sql_queries.labels(*labels).observe(stats.queries)
+        sql_duration_seconds.labels(*labels).observe(stats.duration)
+        sql_rows.labels(*labels).observe(stats.rows)
+
+    return instrumentation
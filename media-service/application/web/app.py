@@ -1,21 +1,25 @@
 # Main app, include fastapi routers ...
-import tracemalloc
 from contextlib import asynccontextmanager
 
 from dishka.integrations.fastapi import setup_dishka
-from fastapi import FastAPI, Request
+from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import ORJSONResponse
-from prometheus_fastapi_instrumentator import Instrumentator
+from prometheus_fastapi_instrumentator import Instrumentator, metrics
 
+from application.configs.settings import settings
 from application.di.container import file_api_container
+from application.utils.access_log import AccessLogMiddleware
 from application.utils.errors_handlers import register_errors_handlers
 from application.utils.logging import logger
+from application.utils.memory_profiler import MemoryProfiler
+from application.utils.sql_metrics import SqlStatsMiddleware, sql_metrics
 from application.utils.telemetry import setup_telemetry
 from application.web.views.v1.media import router as api_router
 
-# Включаем отслеживание памяти, для дебага ошибок в ассинхронных функциях
-tracemalloc.start()
+# Отслеживание памяти только по настройке: иначе включается через admin API профилирования
+if settings.profiling.memory_on_start:
+    MemoryProfiler.start(settings.profiling.traceback_frames)
 
 
 @asynccontextmanager
@@ -44,19 +48,21 @@ def create_app() -> FastAPI:
         allow_headers=["*"],
     )
 
-    # Подключаем middleware для просмотра содержимого http запроса
-    @app.middleware("http")
-    async def log_requests(request: Request, call_next):
-        logger.info("\n----------- New request -----------")
-        logger.info(f"Request: {request.method} {request.url}")
-        logger.info(f"Headers: {request.headers}")
-        try:
-            body = await request.json()
-            logger.info(f"Body: {body}\n")
-        except Exception as e:
-            logger.warning(f"Could not decode JSON body: {e}\n")
-        response = await call_next(request)
-        return response
+    # Подключаем структурный access-лог (без чтения тела запроса)
+    if settings.access.enabled:
+        app.add_middleware(
+            AccessLogMiddleware,
+            sample_rate=settings.access.sample_rate,
+            slow_threshold_ms=settings.access.slow_threshold_ms,
+        )
+
+    # Подключаем сбор статистики SQL по запросу (и детектор N+1 в режиме DEV)
+    if settings.sql_metrics.enabled:
+        app.add_middleware(
+            SqlStatsMiddleware,
+            detect_n_plus_one=settings.app.mode == "DEV",
+            n_plus_one_threshold=settings.sql_metrics.n_plus_one_threshold,
+        )
 
     # Инитиализируеум dishka
     setup_dishka(file_api_container, app)
@@ -68,7 +74,11 @@ def create_app() -> FastAPI:
     register_errors_handlers(app)
 
     # Подключаем prometheus метрики
-    Instrumentator().instrument(app).expose(app)
+    instrumentator = Instrumentator()
+    if settings.sql_metrics.enabled:
+        # С пользовательской инструментацией стандартные метрики подключаются явно
+        instrumentator.add(metrics.default(), sql_metrics())
+    instrumentator.instrument(app).expose(app)
 
     # Подключаем админ панель
     # setup_admin(app, db_manager.engine)
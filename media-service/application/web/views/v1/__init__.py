@@ -3,8 +3,12 @@ from fastapi import APIRouter
 from application.configs.settings import settings
 
 from .media import router as media_router
+from .profiling import router as profiling_router
 
 router = APIRouter(prefix=settings.api.v1.prefix)
 router.include_router(
     media_router,
 )
+router.include_router(
+    profiling_router,
+)
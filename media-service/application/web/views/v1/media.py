@@ -13,8 +13,10 @@ from application.core.files.schemas.files import (
     FileMeatadataRead,
     FileProcessUCInputDTO,
     FileUploadUCInputDTO,
+    FilesBatchDeleteRequest,
 )
 from application.core.files.use_cases.delete_file import DeleteFileUseCase
+from application.core.files.use_cases.delete_files_batch import DeleteFilesBatchUseCase
 from application.core.files.use_cases.process_file import ProcessFileUseCase
 from application.core.files.use_cases.upload_file import UploadFileUseCase
 from application.exceptions.base import BaseAPIException
@@ -36,6 +38,7 @@ router = APIRouter(prefix=settings.api.v1.service, tags=["Media Service"])
 # | GET | /files/{file_uuid} | Получение метаданных о файле | Возвращает JSON: URL, размер, тип, дату загрузки |
 # | GET | /files/{file_uuid}/view | Прямая ссылка или редирект на файл | Позволяет просматривать файл в браузере |
 # | DELETE | /files/{file_uuid} | Удаление файла | Удаляет файл из S3 и запись из базы данных |
+# | POST | /files/delete_batch | Пакетное удаление файлов | JSON: file_uuids, возвращает результат по каждому файлу |
 
 # TODO all: сделать статус "uploaded" после того как файл был успешно отправлен в S3
 
@@ -188,4 +191,30 @@ async def delete_file(
         raise DeleteFileFailedError(detail=f"Unexpected error: {str(e)}") from e
 
 
+@router.post("/files/delete_batch/")
+@inject
+async def delete_files_batch(
+    delete_files_batch_uc: FromDishka[DeleteFilesBatchUseCase],
+    data: FilesBatchDeleteRequest,
+):
+    try:
+        logger.info(f"[API Delete Batch] Начало удаления {len(data.file_uuids)} файлов")
+
+        results = await delete_files_batch_uc.execute(file_ids=data.file_uuids)
+        deleted_count = sum(result.ok for result in results)
+
+        logger.info(f"[API Delete Batch] Удалено {deleted_count}/{len(results)} файлов")
+        return {
+            "ok": deleted_count == len(results),
+            "message": f"Удалено {deleted_count} из {len(results)} файлов",
+            "results": results,
+        }
+    except BaseAPIException as e:
+        logger.error(f"[API Delete Batch] Ошибка пакетного удаления: {e.detail}")
+        raise
+    except Exception as e:
+        logger.exception(f"[API Delete Batch] Неожиданная ошибка удаления: {e}")
+        raise DeleteFileFailedError(detail=f"Unexpected error: {str(e)}") from e
+
+
 # ----- Вспомогательные API ендпоинты -----
@@ -0,0 +1,162 @@
+import asyncio
+import time
+
+import orjson
+import pytest
+
+from application.utils import access_log
+from application.utils.access_log import UNMATCHED_ROUTE, AccessLogMiddleware
+from application.utils.logging import add_access_sink, logger
+
+ROUTE_PATH = "/items/{item_id}"
+
+
+class Route:
+    path_format = ROUTE_PATH
+
+
+def make_app(status: int = 200, delay: float = 0.0, error: Exception | None = None):
+    """ASGI-приложение, которое, как роутер Starlette, кладет маршрут в scope"""
+
+    async def app(scope, receive, send):
+        scope["route"] = Route()
+        if delay:
+            await asyncio.sleep(delay)
+        if error is not None:
+            raise error
+        await send({"type": "http.response.start", "status": status, "headers": []})
+        await send({"type": "http.response.body", "body": b"ok"})
+
+    return app
+
+
+async def call(middleware, scope_type: str = "http") -> list[dict]:
+    sent = []
+
+    async def receive():
+        return {"type": "http.request"}
+
+    async def send(message):
+        sent.append(message)
+
+    await middleware(
+        {"type": scope_type, "method": "GET", "path": "/items/1"}, receive, send
+    )
+    return sent
+
+
+@pytest.fixture
+def records():
+    """Записи access-лога текущего теста"""
+    records = []
+    handler = logger.add(
+        lambda message: records.append(message.record["extra"]["access"]),
+        filter=lambda record: "access" in record["extra"],
+    )
+    yield records
+    logger.remove(handler)
+
+
+async def test_sampled_out_request_is_not_logged(records):
+    sent = await call(AccessLogMiddleware(make_app(), sample_rate=0.0))
+
+    assert sent[0]["status"] == 200
+    assert records == []
+
+
+@pytest.mark.parametrize("draw, logged", [(0.1, True), (0.25, False), (0.9, False)])
+async def test_sampling_keeps_record_weight(monkeypatch, records, draw, logged):
+    monkeypatch.setattr(access_log.random, "random", lambda: draw)
+
+    await call(AccessLogMiddleware(make_app(), sample_rate=0.25))
+
+    if not logged:
+        assert records == []
+        return
+    [record] = records
+    assert record["sample_rate"] == 0.25
+    assert record["method"] == "GET"
+    assert record["path"] == ROUTE_PATH
+    assert record["status"] == 200
+    assert record["duration_ms"] >= 0
+
+
+async def test_server_errors_are_always_logged(records):
+    await call(AccessLogMiddleware(make_app(status=503), sample_rate=0.0))
+
+    [record] = records
+    assert record["status"] == 503
+    assert record["sample_rate"] == 1.0
+
+
+async def test_unhandled_error_is_logged_as_500(records):
+    middleware = AccessLogMiddleware(
+        make_app(error=RuntimeError("boom")), sample_rate=0.0
+    )
+
+    with pytest.raises(RuntimeError):
+        await call(middleware)
+
+    [record] = records
+    assert record["status"] == 500
+    assert record["sample_rate"] == 1.0
+
+
+async def test_slow_requests_are_always_logged(records):
+    middleware = AccessLogMiddleware(
+        make_app(delay=0.02), sample_rate=0.0, slow_threshold_ms=10
+    )
+
+    await call(middleware)
+
+    [record] = records
+    assert record["duration_ms"] >= 10
+    assert record["sample_rate"] == 1.0
+
+
+async def test_unmatched_route_is_labeled(records):
+    async def app(scope, receive, send):
+        await send({"type": "http.response.start", "status": 404, "headers": []})
+        await send({"type": "http.response.body", "body": b""})
+
+    await call(AccessLogMiddleware(app, sample_rate=1.0))
+
+    [record] = records
+    assert record["path"] == UNMATCHED_ROUTE
+
+
+async def test_non_http_scope_passes_through(records):
+    calls = []
+
+    async def app(scope, receive, send):
+        calls.append(scope["type"])
+
+    await call(AccessLogMiddleware(app, sample_rate=1.0), scope_type="lifespan")
+
+    assert calls == ["lifespan"]
+    assert records == []
+
+
+async def test_slow_sink_does_not_delay_response():
+    lines = []
+
+    def slow_sink(message):
+        time.sleep(0.3)
+        lines.append(str(message))
+
+    handler = add_access_sink(slow_sink)
+    try:
+        started_at = time.perf_counter()
+        await call(AccessLogMiddleware(make_app(), sample_rate=1.0))
+        elapsed = time.perf_counter() - started_at
+        # Дожидаемся фонового потока loguru
+        logger.complete()
+    finally:
+        logger.remove(handler)
+
+    assert elapsed < 0.2
+    [line] = lines
+    entry = orjson.loads(line)
+    assert entry["path"] == ROUTE_PATH
+    assert entry["status"] == 200
+    assert "time" in entry
@@ -0,0 +1,33 @@
+"""Add notes (user, id) index for keyset pagination
+
+Revision ID: 5c1e7a2b9d04
+Revises: a16c32e16d67
+Create Date: 2026-10-17 10:10:42.118305
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "5c1e7a2b9d04"
+down_revision: Union[str, Sequence[str], None] = "a16c32e16d67"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        "ix_notes_orms_user_id",
+        "notes_orms",
+        ["user", "id"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_notes_orms_user_id", table_name="notes_orms")
@@ -0,0 +1,54 @@
+"""Add notes full-text search vector
+
+Revision ID: 8f3d2c61ab47
+Revises: 5c1e7a2b9d04
+Create Date: 2026-10-17 11:30:05.482913
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = "8f3d2c61ab47"
+down_revision: Union[str, Sequence[str], None] = "5c1e7a2b9d04"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        "notes_orms",
+        sa.Column(
+            "search_vector",
+            postgresql.TSVECTOR(),
+            sa.Computed(
+                "setweight(to_tsvector('russian', coalesce(title, '')), 'A') || "
+                "setweight(to_tsvector('russian', coalesce(content, '')), 'B')",
+                persisted=True,
+            ),
+            nullable=True,
+        ),
+    )
+    op.create_index(
+        "ix_notes_orms_search_vector",
+        "notes_orms",
+        ["search_vector"],
+        unique=False,
+        postgresql_using="gin",
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(
+        "ix_notes_orms_search_vector",
+        table_name="notes_orms",
+        postgresql_using="gin",
+    )
+    op.drop_column("notes_orms", "search_vector")
@@ -0,0 +1,41 @@
+"""Add notes title trigram index
+
+Revision ID: b27e90d4c3f1
+Revises: 8f3d2c61ab47
+Create Date: 2026-10-17 12:45:19.730442
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "b27e90d4c3f1"
+down_revision: Union[str, Sequence[str], None] = "8f3d2c61ab47"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    op.execute("CREATE EXTENSION IF NOT EXISTS btree_gin")
+    op.create_index(
+        "ix_notes_orms_user_title_trgm",
+        "notes_orms",
+        ["user", "title"],
+        unique=False,
+        postgresql_using="gin",
+        postgresql_ops={"title": "gin_trgm_ops"},
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(
+        "ix_notes_orms_user_title_trgm",
+        table_name="notes_orms",
+        postgresql_using="gin",
+    )
@@ -0,0 +1,216 @@
+"""Add note attachments table
+
+Revision ID: 3a9c5d7e1f20
+Revises: b27e90d4c3f1
+Create Date: 2026-10-17 14:00:42.518306
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlalchemy_utc
+
+# revision identifiers, used by Alembic.
+revision: str = "3a9c5d7e1f20"
+down_revision: Union[str, Sequence[str], None] = "b27e90d4c3f1"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+ATTACHMENT_KINDS = ("video", "image", "audio")
+FILE_COLUMNS = (
+    "note_id, uuid, s3_url, category, content_type, uploaded_at_s3, "
+    "created_at, updated_at"
+)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "note_attachments_orms",
+        sa.Column("note_id", sa.Integer(), nullable=False),
+        sa.Column("kind", sa.String(length=16), nullable=False),
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("uuid", sa.Uuid(), nullable=False),
+        sa.Column("s3_url", sa.String(length=512), nullable=False),
+        sa.Column("category", sa.String(length=100), nullable=False),
+        sa.Column("content_type", sa.String(length=100), nullable=False),
+        sa.Column("uploaded_at_s3", sa.String(), nullable=False),
+        sa.Column(
+            "created_at",
+            sqlalchemy_utc.sqltypes.UtcDateTime(timezone=True),
+            server_default=sa.text("CURRENT_TIMESTAMP"),
+            nullable=False,
+        ),
+        sa.Column(
+            "updated_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("CURRENT_TIMESTAMP"),
+            nullable=False,
+        ),
+        sa.CheckConstraint(
+            "kind IN ('video', 'image', 'audio')",
+            name=op.f("ck_note_attachments_orms_kind"),
+        ),
+        sa.ForeignKeyConstraint(
+            ["note_id"],
+            ["notes_orms.id"],
+            name=op.f("fk_note_attachments_orms_note_id_notes_orms"),
+            ondelete="CASCADE",
+        ),
+        sa.PrimaryKeyConstraint("id", name=op.f("pk_note_attachments_orms")),
+        sa.UniqueConstraint("s3_url", name=op.f("uq_note_attachments_orms_s3_url")),
+    )
+    op.create_index(
+        op.f("ix_note_attachments_orms_uuid"),
+        "note_attachments_orms",
+        ["uuid"],
+        unique=True,
+    )
+    op.create_index(
+        "ix_note_attachments_orms_note_id_kind",
+        "note_attachments_orms",
+        ["note_id", "kind"],
+        unique=False,
+    )
+
+    # Перенос вложений из таблиц по видам файлов
+    for kind in ATTACHMENT_KINDS:
+        op.execute(
+            f"INSERT INTO note_attachments_orms (kind, {FILE_COLUMNS}) "
+            f"SELECT '{kind}', {FILE_COLUMNS} FROM {kind}_files_orms ORDER BY id"
+        )
+
+    for kind in ATTACHMENT_KINDS:
+        op.drop_index(
+            op.f(f"ix_{kind}_files_orms_uuid"), table_name=f"{kind}_files_orms"
+        )
+        op.drop_table(f"{kind}_files_orms")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.create_table(
+        "video_files_orms",
+        sa.Column("note_id", sa.Integer(), nullable=False),
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("uuid", sa.Uuid(), nullable=False),
+        sa.Column("s3_url", sa.String(length=512), nullable=False),
+        sa.Column("category", sa.String(length=100), nullable=False),
+        sa.Column("content_type", sa.String(length=100), nullable=False),
+        sa.Column("uploaded_at_s3", sa.String(), nullable=False),
+        sa.Column(
+            "created_at",
+            sqlalchemy_utc.sqltypes.UtcDateTime(timezone=True),
+            server_default=sa.text("CURRENT_TIMESTAMP"),
+            nullable=False,
+        ),
+        sa.Column(
+            "updated_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("CURRENT_TIMESTAMP"),
+            nullable=False,
+        ),
+        sa.ForeignKeyConstraint(
+            ["note_id"],
+            ["notes_orms.id"],
+            name=op.f("fk_video_files_orms_note_id_notes_orms"),
+            ondelete="CASCADE",
+        ),
+        sa.PrimaryKeyConstraint("id", name=op.f("pk_video_files_orms")),
+        sa.UniqueConstraint("s3_url", name=op.f("uq_video_files_orms_s3_url")),
+    )
+    op.create_index(
+        op.f("ix_video_files_orms_uuid"),
+        "video_files_orms",
+        ["uuid"],
+        unique=True,
+    )
+    op.create_table(
+        "image_files_orms",
+        sa.Column("note_id", sa.Integer(), nullable=False),
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("uuid", sa.Uuid(), nullable=False),
+        sa.Column("s3_url", sa.String(length=512), nullable=False),
+        sa.Column("category", sa.String(length=100), nullable=False),
+        sa.Column("content_type", sa.String(length=100), nullable=False),
+        sa.Column("uploaded_at_s3", sa.String(), nullable=False),
+        sa.Column(
+            "created_at",
+            sqlalchemy_utc.sqltypes.UtcDateTime(timezone=True),
+            server_default=sa.text("CURRENT_TIMESTAMP"),
+            nullable=False,
+        ),
+        sa.Column(
+            "updated_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("CURRENT_TIMESTAMP"),
+            nullable=False,
+        ),
+        sa.ForeignKeyConstraint(
+            ["note_id"],
+            ["notes_orms.id"],
+            name=op.f("fk_image_files_orms_note_id_notes_orms"),
+            ondelete="CASCADE",
+        ),
+        sa.PrimaryKeyConstraint("id", name=op.f("pk_image_files_orms")),
+        sa.UniqueConstraint("s3_url", name=op.f("uq_image_files_orms_s3_url")),
+    )
+    op.create_index(
+        op.f("ix_image_files_orms_uuid"),
+        "image_files_orms",
+        ["uuid"],
+        unique=True,
+    )
+    op.create_table(
+        "audio_files_orms",
+        sa.Column("note_id", sa.Integer(), nullable=False),
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("uuid", sa.Uuid(), nullable=False),
+        sa.Column("s3_url", sa.String(length=512), nullable=False),
+        sa.Column("category", sa.String(length=100), nullable=False),
+        sa.Column("content_type", sa.String(length=100), nullable=False),
+        sa.Column("uploaded_at_s3", sa.String(), nullable=False),
+        sa.Column(
+            "created_at",
+            sqlalchemy_utc.sqltypes.UtcDateTime(timezone=True),
+            server_default=sa.text("CURRENT_TIMESTAMP"),
+            nullable=False,
+        ),
+        sa.Column(
+            "updated_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("CURRENT_TIMESTAMP"),
+            nullable=False,
+        ),
+        sa.ForeignKeyConstraint(
+            ["note_id"],
+            ["notes_orms.id"],
+            name=op.f("fk_audio_files_orms_note_id_notes_orms"),
+            ondelete="CASCADE",
+        ),
+        sa.PrimaryKeyConstraint("id", name=op.f("pk_audio_files_orms")),
+        sa.UniqueConstraint("s3_url", name=op.f("uq_audio_files_orms_s3_url")),
+    )
+    op.create_index(
+        op.f("ix_audio_files_orms_uuid"),
+        "audio_files_orms",
+        ["uuid"],
+        unique=True,
+    )
+
+    for kind in ATTACHMENT_KINDS:
+        op.execute(
+            f"INSERT INTO {kind}_files_orms ({FILE_COLUMNS}) "
+            f"SELECT {FILE_COLUMNS} FROM note_attachments_orms "
+            f"WHERE kind = '{kind}' ORDER BY id"
+        )
+
+    op.drop_index(
+        "ix_note_attachments_orms_note_id_kind", table_name="note_attachments_orms"
+    )
+    op.drop_index(
+        op.f("ix_note_attachments_orms_uuid"), table_name="note_attachments_orms"
+    )
+    op.drop_table("note_attachments_orms")
@@ -0,0 +1,36 @@
+"""Add notes excerpt
+
+Revision ID: c61f0a9e2d38
+Revises: 3a9c5d7e1f20
+Create Date: 2026-10-17 15:15:08.204917
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "c61f0a9e2d38"
+down_revision: Union[str, Sequence[str], None] = "3a9c5d7e1f20"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        "notes_orms",
+        sa.Column(
+            "excerpt",
+            sa.String(),
+            sa.Computed("left(content, 200)", persisted=True),
+            nullable=True,
+        ),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column("notes_orms", "excerpt")
@@ -0,0 +1,31 @@
+"""Make note title unique per user
+
+Revision ID: 7d4e8b13f5a9
+Revises: c61f0a9e2d38
+Create Date: 2026-10-17 16:20:51.377012
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "7d4e8b13f5a9"
+down_revision: Union[str, Sequence[str], None] = "c61f0a9e2d38"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.drop_constraint(op.f("uq_notes_orms_title"), "notes_orms", type_="unique")
+    op.create_unique_constraint(
+        op.f("uq_notes_orms_user_title"), "notes_orms", ["user", "title"]
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_constraint(op.f("uq_notes_orms_user_title"), "notes_orms", type_="unique")
+    op.create_unique_constraint(op.f("uq_notes_orms_title"), "notes_orms", ["title"])
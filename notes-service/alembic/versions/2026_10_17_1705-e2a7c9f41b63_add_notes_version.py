@@ -0,0 +1,31 @@
+"""Add notes version
+
+Revision ID: e2a7c9f41b63
+Revises: 7d4e8b13f5a9
+Create Date: 2026-10-17 17:05:33.612840
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "e2a7c9f41b63"
+down_revision: Union[str, Sequence[str], None] = "7d4e8b13f5a9"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        "notes_orms",
+        sa.Column("version", sa.Integer(), server_default="1", nullable=False),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column("notes_orms", "version")
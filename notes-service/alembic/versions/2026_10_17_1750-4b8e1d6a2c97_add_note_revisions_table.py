@@ -0,0 +1,62 @@
+"""Add note revisions table
+
+Revision ID: 4b8e1d6a2c97
+Revises: e2a7c9f41b63
+Create Date: 2026-10-17 17:50:12.408315
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = "4b8e1d6a2c97"
+down_revision: Union[str, Sequence[str], None] = "e2a7c9f41b63"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "note_revisions_orms",
+        sa.Column("note_id", sa.Integer(), nullable=False),
+        sa.Column("seq", sa.Integer(), nullable=False),
+        sa.Column("version", sa.Integer(), nullable=False),
+        sa.Column("title", sa.String(), nullable=False),
+        sa.Column("is_snapshot", sa.Boolean(), nullable=False),
+        sa.Column("content", sa.String(), nullable=True),
+        sa.Column("delta", postgresql.JSONB(astext_type=sa.Text()), nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.CheckConstraint(
+            "(is_snapshot AND content IS NOT NULL AND delta IS NULL) OR "
+            "(NOT is_snapshot AND content IS NULL AND delta IS NOT NULL)",
+            name=op.f("ck_note_revisions_orms_payload"),
+        ),
+        sa.ForeignKeyConstraint(
+            ["note_id"],
+            ["notes_orms.id"],
+            name=op.f("fk_note_revisions_orms_note_id_notes_orms"),
+            ondelete="CASCADE",
+        ),
+        sa.PrimaryKeyConstraint("id", name=op.f("pk_note_revisions_orms")),
+        sa.UniqueConstraint(
+            "note_id",
+            "seq",
+            name=op.f("uq_note_revisions_orms_note_id_seq"),
+        ),
+        sa.UniqueConstraint(
+            "note_id",
+            "version",
+            name=op.f("uq_note_revisions_orms_note_id_version"),
+        ),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("note_revisions_orms")
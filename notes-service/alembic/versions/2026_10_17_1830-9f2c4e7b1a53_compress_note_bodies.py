@@ -0,0 +1,122 @@
+"""Compress note bodies
+
+Revision ID: 9f2c4e7b1a53
+Revises: 4b8e1d6a2c97
+Create Date: 2026-10-17 18:30:41.275904
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = "9f2c4e7b1a53"
+down_revision: Union[str, Sequence[str], None] = "4b8e1d6a2c97"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "note_compression_dicts_orms",
+        sa.Column("data", sa.LargeBinary(), nullable=False),
+        sa.Column("samples", sa.Integer(), nullable=False),
+        sa.Column(
+            "created_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("CURRENT_TIMESTAMP"),
+            nullable=False,
+        ),
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint("id", name=op.f("pk_note_compression_dicts_orms")),
+    )
+    op.add_column(
+        "notes_orms", sa.Column("content_zstd", sa.LargeBinary(), nullable=True)
+    )
+    op.add_column(
+        "notes_orms", sa.Column("content_dict_id", sa.Integer(), nullable=True)
+    )
+    op.create_foreign_key(
+        op.f("fk_notes_orms_content_dict_id_note_compression_dicts_orms"),
+        "notes_orms",
+        "note_compression_dicts_orms",
+        ["content_dict_id"],
+        ["id"],
+    )
+    op.alter_column("notes_orms", "content", existing_type=sa.String(), nullable=True)
+    op.create_check_constraint(
+        op.f("ck_notes_orms_body"),
+        "notes_orms",
+        "(content IS NULL) <> (content_zstd IS NULL)",
+    )
+    # Превью и tsvector больше не генерируются из content: их пишет приложение
+    # по исходному тексту, чтобы сжатые тела оставались в списках и поиске
+    op.execute("ALTER TABLE notes_orms ALTER COLUMN excerpt DROP EXPRESSION")
+    op.execute("ALTER TABLE notes_orms ALTER COLUMN search_vector DROP EXPRESSION")
+    op.alter_column("notes_orms", "excerpt", existing_type=sa.String(), nullable=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    compressed = (
+        op.get_bind()
+        .execute(sa.text("SELECT count(*) FROM notes_orms WHERE content IS NULL"))
+        .scalar()
+    )
+    if compressed:
+        raise RuntimeError(
+            f"Сжатых заметок: {compressed}. "
+            "Перед откатом выполните: python -m jobs.compress_notes decompress"
+        )
+
+    op.drop_index(
+        "ix_notes_orms_search_vector",
+        table_name="notes_orms",
+        postgresql_using="gin",
+    )
+    op.drop_column("notes_orms", "search_vector")
+    op.drop_column("notes_orms", "excerpt")
+    op.add_column(
+        "notes_orms",
+        sa.Column(
+            "excerpt",
+            sa.String(),
+            sa.Computed("left(content, 200)", persisted=True),
+            nullable=True,
+        ),
+    )
+    op.add_column(
+        "notes_orms",
+        sa.Column(
+            "search_vector",
+            postgresql.TSVECTOR(),
+            sa.Computed(
+                "setweight(to_tsvector('russian', coalesce(title, '')), 'A') || "
+                "setweight(to_tsvector('russian', coalesce(content, '')), 'B')",
+                persisted=True,
+            ),
+            nullable=True,
+        ),
+    )
+    op.create_index(
+        "ix_notes_orms_search_vector",
+        "notes_orms",
+        ["search_vector"],
+        unique=False,
+        postgresql_using="gin",
+    )
+
+    op.drop_constraint(op.f("ck_notes_orms_body"), "notes_orms", type_="check")
+    op.alter_column("notes_orms", "content", existing_type=sa.String(), nullable=False)
+    op.drop_constraint(
+        op.f("fk_notes_orms_content_dict_id_note_compression_dicts_orms"),
+        "notes_orms",
+        type_="foreignkey",
+    )
+    op.drop_column("notes_orms", "content_dict_id")
+    op.drop_column("notes_orms", "content_zstd")
+    op.drop_table("note_compression_dicts_orms")
@@ -0,0 +1,65 @@
+"""Add note tags
+
+Revision ID: 6e2b9f4a8c15
+Revises: 9f2c4e7b1a53
+Create Date: 2026-10-17 19:15:42.116830
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = "6e2b9f4a8c15"
+down_revision: Union[str, Sequence[str], None] = "9f2c4e7b1a53"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        "notes_orms",
+        sa.Column(
+            "tags",
+            postgresql.ARRAY(sa.String()),
+            server_default="{}",
+            nullable=False,
+        ),
+    )
+    # btree_gin создан миграцией индекса триграмм заголовков
+    op.create_index(
+        "ix_notes_orms_user_tags",
+        "notes_orms",
+        ["user", "tags"],
+        unique=False,
+        postgresql_using="gin",
+    )
+    op.create_table(
+        "note_tag_counts_orms",
+        sa.Column("user", sa.String(), nullable=False),
+        sa.Column("tag", sa.String(), nullable=False),
+        sa.Column("count", sa.Integer(), nullable=False),
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.CheckConstraint("count >= 0", name=op.f("ck_note_tag_counts_orms_count")),
+        sa.PrimaryKeyConstraint("id", name=op.f("pk_note_tag_counts_orms")),
+        sa.UniqueConstraint(
+            "user",
+            "tag",
+            name=op.f("uq_note_tag_counts_orms_user_tag"),
+        ),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("note_tag_counts_orms")
+    op.drop_index(
+        "ix_notes_orms_user_tags",
+        table_name="notes_orms",
+        postgresql_using="gin",
+    )
+    op.drop_column("notes_orms", "tags")
@@ -0,0 +1,98 @@
+"""Soft delete notes with background purge
+
+Revision ID: a4f7c2e9d816
+Revises: 6e2b9f4a8c15
+Create Date: 2026-10-17 20:00:27.504193
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "a4f7c2e9d816"
+down_revision: Union[str, Sequence[str], None] = "6e2b9f4a8c15"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+NOT_DELETED = sa.text("deleted_at IS NULL")
+
+# Индексы чтения заметок: (имя, колонки, параметры), становятся частичными
+READ_INDEXES = (
+    ("ix_notes_orms_user_id", ["user", "id"], {}),
+    ("ix_notes_orms_search_vector", ["search_vector"], {"postgresql_using": "gin"}),
+    (
+        "ix_notes_orms_user_title_trgm",
+        ["user", "title"],
+        {
+            "postgresql_using": "gin",
+            "postgresql_ops": {"title": "gin_trgm_ops"},
+        },
+    ),
+    ("ix_notes_orms_user_tags", ["user", "tags"], {"postgresql_using": "gin"}),
+)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        "notes_orms",
+        sa.Column("deleted_at", sa.DateTime(timezone=True), nullable=True),
+    )
+    op.add_column(
+        "notes_orms",
+        sa.Column("purge_after", sa.DateTime(timezone=True), nullable=True),
+    )
+    op.add_column(
+        "notes_orms",
+        sa.Column("purge_attempts", sa.Integer(), server_default="0", nullable=False),
+    )
+
+    # Заголовок удаленной заметки не должен мешать создать новую с тем же
+    op.drop_constraint(op.f("uq_notes_orms_user_title"), "notes_orms", type_="unique")
+    op.create_index(
+        "uq_notes_orms_user_title",
+        "notes_orms",
+        ["user", "title"],
+        unique=True,
+        postgresql_where=NOT_DELETED,
+    )
+    for name, columns, kwargs in READ_INDEXES:
+        op.drop_index(name, table_name="notes_orms")
+        op.create_index(
+            name,
+            "notes_orms",
+            columns,
+            unique=False,
+            postgresql_where=NOT_DELETED,
+            **kwargs,
+        )
+    op.create_index(
+        "ix_notes_orms_purge_after",
+        "notes_orms",
+        ["purge_after"],
+        unique=False,
+        postgresql_where=sa.text("deleted_at IS NOT NULL"),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # Неочищенные удаленные заметки при откате удаляются вместе с вложениями
+    # в БД; файлы в media-service остаются
+    op.execute("DELETE FROM notes_orms WHERE deleted_at IS NOT NULL")
+
+    op.drop_index("ix_notes_orms_purge_after", table_name="notes_orms")
+    for name, columns, kwargs in READ_INDEXES:
+        op.drop_index(name, table_name="notes_orms")
+        op.create_index(name, "notes_orms", columns, unique=False, **kwargs)
+    op.drop_index("uq_notes_orms_user_title", table_name="notes_orms")
+    op.create_unique_constraint(
+        op.f("uq_notes_orms_user_title"), "notes_orms", ["user", "title"]
+    )
+
+    op.drop_column("notes_orms", "purge_attempts")
+    op.drop_column("notes_orms", "purge_after")
+    op.drop_column("notes_orms", "deleted_at")
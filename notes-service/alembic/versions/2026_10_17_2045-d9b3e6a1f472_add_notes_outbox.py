@@ -0,0 +1,65 @@
+"""Add notes outbox
+
+Revision ID: d9b3e6a1f472
+Revises: a4f7c2e9d816
+Create Date: 2026-10-17 20:45:13.842571
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+import sqlalchemy_utc
+
+# revision identifiers, used by Alembic.
+revision: str = "d9b3e6a1f472"
+down_revision: Union[str, Sequence[str], None] = "a4f7c2e9d816"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "notes_outbox_orms",
+        sa.Column("message_name", sa.String(), nullable=False),
+        sa.Column("body", postgresql.JSONB(astext_type=sa.Text()), nullable=False),
+        sa.Column("status", sa.String(), server_default="pending", nullable=False),
+        sa.Column(
+            "available_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.Column("attempts", sa.Integer(), server_default="0", nullable=False),
+        sa.Column("last_error", sa.String(), nullable=True),
+        sa.Column(
+            "created_at",
+            sqlalchemy_utc.sqltypes.UtcDateTime(timezone=True),
+            server_default=sa.text("CURRENT_TIMESTAMP"),
+            nullable=False,
+        ),
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint("id", name=op.f("pk_notes_outbox_orms")),
+    )
+    op.create_index(
+        "ix_notes_outbox_orms_available_at",
+        "notes_outbox_orms",
+        ["available_at"],
+        unique=False,
+        postgresql_where=sa.text("status = 'pending'"),
+    )
+    # Повторы файлов вложений теперь у outbox, очистка заметок их не ведет
+    op.drop_column("notes_orms", "purge_attempts")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.add_column(
+        "notes_orms",
+        sa.Column("purge_attempts", sa.Integer(), server_default="0", nullable=False),
+    )
+    op.drop_index("ix_notes_outbox_orms_available_at", table_name="notes_outbox_orms")
+    op.drop_table("notes_outbox_orms")
@@ -3,9 +3,13 @@ from fastapi import APIRouter
 from core.config import settings
 
 from .notes import router as notes_router
+from .profiling import router as profiling_router
 
 
 router = APIRouter(prefix=settings.api.v1.prefix)
 router.include_router(
     notes_router,
 )
+router.include_router(
+    profiling_router,
+)
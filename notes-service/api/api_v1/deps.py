@@ -1,16 +1,36 @@
-from typing import List
+from typing import List, Sequence
 
 from fastapi import Query, UploadFile
 
+from core.config import settings
+from core.pagination import split_keyset_page
+from core.schemas import (
+    NoteSearchHit,
+    NoteSummaryRead,
+    NoteTagsMode,
+    NoteView,
+    normalize_tags,
+)
+from exceptions.exceptions import InvalidCursorError, InvalidTagsError
+
+
+def parse_tags(tags: List[str] | None) -> List[str]:
+    try:
+        return normalize_tags(tags or [])
+    except ValueError as e:
+        raise InvalidTagsError(str(e)) from None
+
 
 class NoteCreateForm:
     def __init__(
         self,
         title: str = Query(str),
         content: str = Query(str),
+        tags: List[str] | None = Query(None),
     ):
         self.title = title
         self.content = content
+        self.tags = parse_tags(tags)
 
 
 class NoteCreateMediaFilesForm:
@@ -23,3 +43,69 @@ class NoteCreateMediaFilesForm:
         self.video_files = video_files
         self.image_files = image_files
         self.audio_files = audio_files
+
+
+class NotesPageParams:
+    def __init__(
+        self,
+        limit: int = Query(
+            settings.pagination.default_limit,
+            ge=1,
+            le=settings.pagination.max_limit,
+        ),
+        after: int | None = Query(None, ge=0),
+        stream: bool = Query(False),
+        view: NoteView = Query(NoteView.full),
+        tags: List[str] | None = Query(None),
+        tags_mode: NoteTagsMode = Query(NoteTagsMode.all),
+    ):
+        self.limit = limit
+        self.after = after
+        self.stream = stream
+        self.view = view
+        self.tags = parse_tags(tags)
+        self.tags_mode = tags_mode
+
+    def build_page(self, notes: Sequence) -> dict:
+        """Формирует страницу из limit + 1 строк и курсор на следующую"""
+        page, has_more = split_keyset_page(notes, self.limit)
+        if self.view == NoteView.summary:
+            page = [NoteSummaryRead.model_validate(note) for note in page]
+        return {
+            "data": page,
+            "next_after": page[-1].id if has_more and page else None,
+        }
+
+
+class NotesSearchParams:
+    def __init__(
+        self,
+        q: str = Query(..., min_length=1, max_length=256),
+        limit: int = Query(
+            settings.pagination.default_limit,
+            ge=1,
+            le=settings.pagination.max_limit,
+        ),
+        cursor: str | None = Query(None),
+    ):
+        self.q = q
+        self.limit = limit
+        self.after = self._parse_cursor(cursor) if cursor else None
+
+    @staticmethod
+    def _parse_cursor(cursor: str) -> tuple[float, int]:
+        """Курсор поиска имеет вид '<rank>:<id>'"""
+        try:
+            rank, note_id = cursor.split(":", 1)
+            return float(rank), int(note_id)
+        except ValueError:
+            raise InvalidCursorError(f"Некорректный курсор поиска: {cursor!r}")
+
+    def build_page(self, hits: Sequence) -> dict:
+        """Формирует страницу из limit + 1 результатов и курсор на следующую"""
+        rows, has_more = split_keyset_page(hits, self.limit)
+        page = [NoteSearchHit.model_validate(hit, from_attributes=True) for hit in rows]
+        next_cursor = None
+        if has_more and page:
+            next_cursor = f"{page[-1].rank!r}:{page[-1].id}"
+        return {"data": page, "next_cursor": next_cursor}
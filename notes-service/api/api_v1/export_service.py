@@ -0,0 +1,194 @@
+import asyncio
+import mimetypes
+import zipfile
+from datetime import datetime
+from typing import AsyncIterator, Sequence
+
+import orjson
+
+from core.config import settings
+from core.models.notes import NoteAttachmentsOrm, NotesOrm
+from core.notes_repo import NotesRepo
+from core.schemas import NoteWithFilesRead
+
+from integrations.files.files import MS_stream_file
+
+from utils.logging import logger
+
+from .service import NoteService
+
+EXPORT_ERRORS_NAME = "export_errors.ndjson"
+
+
+class _ZipStreamBuffer:
+    """Приемник zipfile без seek: байты копятся до очередной выдачи клиенту"""
+
+    def __init__(self):
+        self._chunks: list[bytes] = []
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self) -> None:
+        pass
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+class NoteExportService:
+    """Потоковый экспорт всех заметок пользователя в NDJSON или zip с вложениями.
+
+    NDJSON читается серверным курсором. Для zip заметки читаются keyset-страницами,
+    каждая в своей короткой сессии: вложения страницы скачиваются уже после
+    возврата соединения в пул, и медленный media-service или клиент не держат
+    транзакцию открытой. Zip пишется инкрементально в память небольшими
+    порциями: без временных файлов и с постоянным расходом памяти.
+    """
+
+    def __init__(self, username: str):
+        self.username = username
+        self.errors: list[dict] = []
+        self._download_semaphore = asyncio.Semaphore(
+            settings.export.max_concurrent_downloads
+        )
+
+    def ndjson(self) -> AsyncIterator[bytes]:
+        return NoteService.notes_to_ndjson(
+            NotesRepo.stream_notes(username=self.username)
+        )
+
+    async def _note_pages(self) -> AsyncIterator[Sequence[NotesOrm]]:
+        page_size = settings.export.page_size
+        after = None
+        while True:
+            notes = await NotesRepo.get_user_notes(
+                self.username, limit=page_size, after=after
+            )
+            if not notes:
+                return
+            yield notes
+            if len(notes) < page_size:
+                return
+            after = notes[-1].id
+
+    async def zip(self) -> AsyncIterator[bytes]:
+        buffer = _ZipStreamBuffer()
+        with zipfile.ZipFile(buffer, mode="w") as archive:
+            async for notes in self._note_pages():
+                async for chunk in self._write_notes(archive, buffer, notes):
+                    yield chunk
+
+            if self.errors:
+                self._write_entry(
+                    archive,
+                    name=EXPORT_ERRORS_NAME,
+                    data=b"".join(orjson.dumps(error) + b"\n" for error in self.errors),
+                    modified_at=datetime.now(),
+                )
+        # Центральный каталог архива записывается при закрытии ZipFile
+        yield buffer.drain()
+        logger.info(
+            f"Экспорт заметок пользователя {self.username} завершен, "
+            f"ошибок вложений: {len(self.errors)}"
+        )
+
+    async def _write_notes(
+        self,
+        archive: zipfile.ZipFile,
+        buffer: _ZipStreamBuffer,
+        notes: Sequence[NotesOrm],
+    ) -> AsyncIterator[bytes]:
+        """Страница заметок с вложениями; сессия чтения страницы уже закрыта"""
+        for note in notes:
+            payload = NoteWithFilesRead.model_validate(note).model_dump_json()
+            self._write_entry(
+                archive,
+                name=f"notes/{note.id}.json",
+                data=payload.encode(),
+                modified_at=note.updated_at,
+            )
+            yield buffer.drain()
+
+            async for chunk in self._write_attachments(archive, buffer, note):
+                yield chunk
+
+    @staticmethod
+    def _write_entry(
+        archive: zipfile.ZipFile, name: str, data: bytes, modified_at: datetime
+    ) -> None:
+        info = zipfile.ZipInfo(name, date_time=modified_at.timetuple()[:6])
+        info.compress_type = zipfile.ZIP_DEFLATED
+        archive.writestr(info, data)
+
+    @staticmethod
+    def _attachment_name(note_id: int, attachment: NoteAttachmentsOrm) -> str:
+        extension = mimetypes.guess_extension(attachment.content_type) or ""
+        return f"attachments/{note_id}/{attachment.kind}/{attachment.uuid}{extension}"
+
+    async def _download(
+        self, attachment: NoteAttachmentsOrm, queue: asyncio.Queue
+    ) -> None:
+        """Скачивание вложения в ограниченную очередь чанков; None - конец, Exception - ошибка"""
+        try:
+            async with self._download_semaphore:
+                async with MS_stream_file(str(attachment.uuid)) as response:
+                    async for chunk in response.aiter_bytes(settings.export.chunk_size):
+                        await queue.put(chunk)
+        except Exception as e:
+            await queue.put(e)
+            return
+        await queue.put(None)
+
+    async def _write_attachments(
+        self,
+        archive: zipfile.ZipFile,
+        buffer: _ZipStreamBuffer,
+        note: NotesOrm,
+    ) -> AsyncIterator[bytes]:
+        """Вложения качаются параллельно с упреждением, а пишутся в архив по порядку"""
+        downloads = []
+        for attachment in note.attachments:
+            queue = asyncio.Queue(maxsize=settings.export.prefetch_chunks)
+            task = asyncio.create_task(self._download(attachment, queue))
+            downloads.append((attachment, queue, task))
+
+        try:
+            for attachment, queue, _ in downloads:
+                name = self._attachment_name(note.id, attachment)
+                # Медиафайлы уже сжаты - храним без повторного сжатия
+                info = zipfile.ZipInfo(
+                    name, date_time=attachment.created_at.timetuple()[:6]
+                )
+                info.compress_type = zipfile.ZIP_STORED
+                entry = None
+                try:
+                    while (item := await queue.get()) is not None:
+                        if isinstance(item, Exception):
+                            logger.error(
+                                f"Не удалось экспортировать вложение {attachment.uuid}: {item}"
+                            )
+                            self.errors.append(
+                                {
+                                    "note_id": note.id,
+                                    "uuid": str(attachment.uuid),
+                                    "name": name,
+                                    "partial": entry is not None,
+                                    "error": str(item),
+                                }
+                            )
+                            break
+                        if entry is None:
+                            entry = archive.open(info, mode="w", force_zip64=True)
+                        entry.write(item)
+                        yield buffer.drain()
+                finally:
+                    if entry is not None:
+                        entry.close()
+                yield buffer.drain()
+        finally:
+            for _, _, task in downloads:
+                task.cancel()
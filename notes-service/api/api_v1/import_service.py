@@ -0,0 +1,210 @@
+import asyncio
+import zipfile
+from pathlib import PurePosixPath
+from typing import AsyncIterator
+
+import orjson
+from fastapi import UploadFile
+
+from core.config import settings
+from core.notes_repo import NotesRepo
+from core.schemas import NoteImportResult, NoteImportRowError
+
+from exceptions.exceptions import FilesHandlingError, InvalidFileFormatError
+
+from utils.logging import logger
+
+NDJSON_EXTENSIONS = (".ndjson", ".jsonl")
+NDJSON_CONTENT_TYPES = ("application/x-ndjson", "application/jsonl")
+ZIP_CONTENT_TYPES = ("application/zip", "application/x-zip-compressed")
+MARKDOWN_EXTENSIONS = (".md", ".markdown")
+
+
+class NoteImportService:
+    """Массовый импорт заметок пользователя из NDJSON или zip-архива markdown-файлов.
+
+    Файл читается потоково, строки проверяются и пачками отдаются в
+    NotesRepo.import_notes (COPY во временную таблицу). Ошибки собираются по строкам.
+    """
+
+    def __init__(self, username: str):
+        self.username = username
+        self.rows_seen = 0
+        self.errors: list[NoteImportRowError] = []
+        # Заголовок -> (строка, источник) первой принятой заметки с этим заголовком
+        self.accepted: dict[str, tuple[int, str | None]] = {}
+
+    async def run(self, file: UploadFile) -> NoteImportResult:
+        filename = (file.filename or "").lower()
+        if filename.endswith(".zip") or file.content_type in ZIP_CONTENT_TYPES:
+            records = self._markdown_records(file)
+        elif (
+            filename.endswith(NDJSON_EXTENSIONS)
+            or file.content_type in NDJSON_CONTENT_TYPES
+        ):
+            records = self._ndjson_records(file)
+        else:
+            raise InvalidFileFormatError(
+                "Поддерживаются NDJSON (.ndjson, .jsonl) и zip-архив markdown-файлов"
+            )
+
+        logger.info(f"Импорт заметок пользователя {self.username} из {file.filename!r}")
+        imported_titles = set(
+            await NotesRepo.import_notes(
+                username=self.username, batches=self._batches(records)
+            )
+        )
+
+        for title, (row, source) in self.accepted.items():
+            if title not in imported_titles:
+                self._fail(
+                    row, source, "Заметка с таким заголовком уже существует", title
+                )
+
+        self.errors.sort(key=lambda error: error.row)
+        logger.info(
+            f"Импорт пользователя {self.username}: создано {len(imported_titles)}, "
+            f"ошибок {len(self.errors)}"
+        )
+        return NoteImportResult(
+            imported=len(imported_titles),
+            failed=len(self.errors),
+            errors=self.errors,
+        )
+
+    def _fail(
+        self, row: int, source: str | None, error: str, title: str | None = None
+    ) -> None:
+        self.errors.append(
+            NoteImportRowError(row=row, source=source, title=title, error=error)
+        )
+
+    def _accept(self, row: int, source: str | None, title, content) -> bool:
+        """Проверка строки; дубликаты заголовков внутри файла отклоняются"""
+        self.rows_seen += 1
+        if self.rows_seen > settings.imports.max_rows:
+            raise FilesHandlingError(
+                f"Превышен лимит импорта: {settings.imports.max_rows} заметок"
+            )
+
+        if not isinstance(title, str) or not title.strip():
+            self._fail(row, source, "Пустой или некорректный заголовок")
+            return False
+        title = title.strip()
+        if not isinstance(content, str):
+            self._fail(row, source, "Некорректное содержимое", title)
+            return False
+        if "\x00" in title or "\x00" in content:
+            self._fail(row, source, "Недопустимый символ NUL", title)
+            return False
+        if title in self.accepted:
+            first_row, _ = self.accepted[title]
+            self._fail(row, source, f"Повтор заголовка из строки {first_row}", title)
+            return False
+
+        self.accepted[title] = (row, source)
+        return True
+
+    async def _batches(
+        self, records: AsyncIterator[tuple[int, str | None, object, object]]
+    ) -> AsyncIterator[list[tuple[int, str, str]]]:
+        batch: list[tuple[int, str, str]] = []
+        async for row, source, title, content in records:
+            if not self._accept(row, source, title, content):
+                continue
+            batch.append((row, title.strip(), content))
+            if len(batch) >= settings.imports.batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+    @staticmethod
+    async def _iter_lines(file: UploadFile) -> AsyncIterator[bytes]:
+        buffer = b""
+        while chunk := await file.read(settings.imports.read_chunk_size):
+            buffer += chunk
+            *lines, buffer = buffer.split(b"\n")
+            for line in lines:
+                yield line
+        if buffer:
+            yield buffer
+
+    async def _ndjson_records(
+        self, file: UploadFile
+    ) -> AsyncIterator[tuple[int, str | None, object, object]]:
+        """Строка NDJSON: {"title": ..., "content": ...}"""
+        row = 0
+        async for line in self._iter_lines(file):
+            row += 1
+            if not line.strip():
+                continue
+            try:
+                item = orjson.loads(line)
+            except orjson.JSONDecodeError as e:
+                self._fail(row, None, f"Некорректный JSON: {e}")
+                continue
+            if not isinstance(item, dict):
+                self._fail(row, None, "Ожидался JSON-объект")
+                continue
+            yield row, None, item.get("title"), item.get("content", "")
+
+    @staticmethod
+    def _read_entries(archive: zipfile.ZipFile, names: list[str]) -> list[bytes]:
+        return [archive.read(name) for name in names]
+
+    @staticmethod
+    def _split_markdown(name: str, text: str) -> tuple[str, str]:
+        """Заголовок - первая строка '# ...', иначе имя файла без расширения"""
+        lines = text.lstrip("\ufeff").splitlines()
+        for index, line in enumerate(lines):
+            if not line.strip():
+                continue
+            if line.startswith("# "):
+                return line[2:], "\n".join(lines[index + 1 :]).strip("\n")
+            break
+        return PurePosixPath(name).stem, text
+
+    async def _markdown_records(
+        self, file: UploadFile
+    ) -> AsyncIterator[tuple[int, str | None, object, object]]:
+        try:
+            archive = await asyncio.to_thread(zipfile.ZipFile, file.file)
+        except zipfile.BadZipFile as e:
+            raise InvalidFileFormatError("Некорректный zip-архив") from e
+
+        with archive:
+            entries = [
+                info
+                for info in archive.infolist()
+                if not info.is_dir()
+                and info.filename.lower().endswith(MARKDOWN_EXTENSIONS)
+            ]
+            batch_size = settings.imports.batch_size
+            for start in range(0, len(entries), batch_size):
+                chunk = entries[start : start + batch_size]
+                readable = [
+                    info.filename
+                    for info in chunk
+                    if info.file_size <= settings.imports.max_markdown_size
+                ]
+                contents = dict(
+                    zip(
+                        readable,
+                        await asyncio.to_thread(self._read_entries, archive, readable),
+                    )
+                )
+
+                for offset, info in enumerate(chunk):
+                    row = start + offset + 1
+                    data = contents.get(info.filename)
+                    if data is None:
+                        self._fail(row, info.filename, "Файл слишком большой")
+                        continue
+                    try:
+                        text = data.decode("utf-8")
+                    except UnicodeDecodeError:
+                        self._fail(row, info.filename, "Файл не в кодировке UTF-8")
+                        continue
+                    title, content = self._split_markdown(info.filename, text)
+                    yield row, info.filename, title, content
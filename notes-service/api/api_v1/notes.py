@@ -1,17 +1,47 @@
-from fastapi import APIRouter, Depends
+from fastapi import (
+    APIRouter,
+    Depends,
+    File,
+    Header,
+    Query,
+    Response,
+    UploadFile,
+    status,
+)
+from fastapi.responses import StreamingResponse
 
 from core.config import settings
 from core.notes_repo import NotesRepo
-from core.schemas import NoteCreate
+from core.note_revisions_repo import NoteRevisionsRepo
+from core.note_tags_repo import NoteTagsRepo
+from core.cached_notes_repo import CachedNotesRepo
+from core.notes_cache import NotesCache
+from core.schemas import (
+    NoteCreate,
+    NoteExportFormat,
+    NoteRead,
+    NoteRevisionRead,
+    NoteSummaryRead,
+    NoteTagCount,
+    NoteUpdate,
+    NoteView,
+)
 
 from exceptions.exceptions import (
     FilesHandlingError,
     FilesUploadError,
-    FilesDeleteError,
+    InvalidFileFormatError,
     NoteNotFoundError,
     NoteAlreadyExistsError,
     NoteCreateFailedError,
     NoteDeleteFailedError,
+    NoteImportFailedError,
+    NoteUpdateFailedError,
+    NoteVersionConflictError,
+    NoteVersionRequiredError,
+    EmptyNoteUpdateError,
+    InvalidCursorError,
+    RepositoryInternalError,
 )
 
 from integrations.files.constants import (
@@ -20,11 +50,19 @@ from integrations.files.constants import (
     IMAGE_FILES_NAME,
 )
 
+from .export_service import NoteExportService
+from .import_service import NoteImportService
 from .service import NoteService
-from .deps import NoteCreateForm, NoteCreateMediaFilesForm
+from .deps import (
+    NoteCreateForm,
+    NoteCreateMediaFilesForm,
+    NotesPageParams,
+    NotesSearchParams,
+)
 
 from integrations.auth.auth import get_current_user
 
+from utils import etag_matches, make_etag, note_etag, version_from_if_match
 from utils.logging import logger
 
 router = APIRouter(prefix=settings.api.v1.notes, tags=["Notes"])
@@ -59,6 +97,7 @@ async def create_notes(
             user=current_user.username,
             title=note_create_form.title,
             content=note_create_form.content,
+            tags=note_create_form.tags,
         )
 
         new_note = await NotesRepo.create_note(note_data)
@@ -77,55 +116,20 @@ async def create_notes(
                 "note_id": new_note.id,
             }
 
-        # Обрабатываем медиафайлы
-        uploaded_files_uuids = {}
-
-        if note_media_files.video_files:
-            try:
-                video_uuids = await note_service.process_media_files(
-                    files=note_media_files.video_files,
-                    category=VIDEO_FILES_NAME,
-                    note_id=int(new_note.id),
-                )
-                uploaded_files_uuids["video"] = video_uuids
-                logger.info(
-                    f"Загружено {len(video_uuids)} видео для заметки {new_note.id}"
-                )
-            except Exception as e:
-                logger.error(f"Ошибка загрузки видео для заметки {new_note.id}: {e}")
-                raise
-
-        if note_media_files.image_files:
-            try:
-                image_uuids = await note_service.process_media_files(
-                    files=note_media_files.image_files,
-                    category=IMAGE_FILES_NAME,
-                    note_id=int(new_note.id),
-                )
-                uploaded_files_uuids["image"] = image_uuids
-                logger.info(
-                    f"Загружено {len(image_uuids)} изображений для заметки {new_note.id}"
-                )
-            except Exception as e:
-                logger.error(
-                    f"Ошибка загрузки изображений для заметки {new_note.id}: {e}"
-                )
-                raise
-
-        if note_media_files.audio_files:
-            try:
-                audio_uuids = await note_service.process_media_files(
-                    files=note_media_files.audio_files,
-                    category=AUDIO_FILES_NAME,
-                    note_id=int(new_note.id),
-                )
-                uploaded_files_uuids["audio"] = audio_uuids
-                logger.info(
-                    f"Загружено {len(audio_uuids)} аудио для заметки {new_note.id}"
-                )
-            except Exception as e:
-                logger.error(f"Ошибка загрузки аудио для заметки {new_note.id}: {e}")
-                raise
+        # Обрабатываем медиафайлы всех категорий параллельно
+        try:
+            uploaded_files_uuids = await note_service.process_media_files(
+                files_by_category={
+                    VIDEO_FILES_NAME: note_media_files.video_files,
+                    IMAGE_FILES_NAME: note_media_files.image_files,
+                    AUDIO_FILES_NAME: note_media_files.audio_files,
+                },
+                note_id=int(new_note.id),
+                username=current_user.username,
+            )
+        except Exception as e:
+            logger.error(f"Ошибка загрузки медиафайлов для заметки {new_note.id}: {e}")
+            raise
 
         logger.info(
             f"Заметка {new_note.id} создана с {sum(len(v) for v in uploaded_files_uuids.values())} медиафайлами"
@@ -141,12 +145,13 @@ async def create_notes(
         FilesUploadError,
         NoteAlreadyExistsError,
         NoteCreateFailedError,
+        RepositoryInternalError,
     ):
         if new_note:
             logger.error(
                 f"Откат: удаление заметки {new_note.id} из-за ошибки загрузки файлов"
             )
-            await NotesRepo.delete_note(new_note)
+            await NotesRepo.soft_delete_note(new_note.id, new_note.user)
         raise
     except Exception as e:
         logger.exception(
@@ -157,7 +162,48 @@ async def create_notes(
         raise NoteCreateFailedError from e
 
 
-# Удаление заметки из БД и S3
+# Массовый импорт заметок из NDJSON или zip-архива markdown-файлов
+@router.post("/import")
+async def import_notes(
+    file: UploadFile = File(...),
+    current_user=Depends(get_current_user),
+):
+    try:
+        logger.info(
+            f"Импорт заметок из {file.filename!r} пользователем {current_user.username}"
+        )
+        return await NoteImportService(username=current_user.username).run(file)
+    except (InvalidFileFormatError, FilesHandlingError, RepositoryInternalError):
+        raise
+    except Exception as e:
+        logger.exception(f"Ошибка импорта заметок из {file.filename!r}: {e}")
+        raise NoteImportFailedError from e
+
+
+# Потоковый экспорт всех заметок пользователя: NDJSON или zip с вложениями
+@router.get("/export")
+async def export_notes(
+    format: NoteExportFormat = Query(NoteExportFormat.ndjson),
+    current_user=Depends(get_current_user),
+):
+    logger.info(
+        f"Экспорт заметок пользователя {current_user.username} в {format.value}"
+    )
+    export_service = NoteExportService(username=current_user.username)
+    if format == NoteExportFormat.zip:
+        return StreamingResponse(
+            export_service.zip(),
+            media_type="application/zip",
+            headers={"Content-Disposition": 'attachment; filename="notes-export.zip"'},
+        )
+    return StreamingResponse(
+        export_service.ndjson(),
+        media_type="application/x-ndjson",
+        headers={"Content-Disposition": 'attachment; filename="notes-export.ndjson"'},
+    )
+
+
+# Мягкое удаление заметки: вложения и строку удаляет фоновая очистка
 @router.delete("/delete/{note_id}")
 async def delete_note(
     note_id: int,
@@ -165,92 +211,258 @@ async def delete_note(
 ):
     try:
         logger.info(f"Удаление заметки {note_id} пользователем {current_user.username}")
+        await NotesRepo.soft_delete_note(note_id, current_user.username)
+        return {"message": f"Заметка {note_id} успешно удалена"}
+    except NoteNotFoundError:
+        logger.warning(
+            f"Заметка {note_id} не найдена для пользователя {current_user.username}"
+        )
+        raise
+    except Exception as e:
+        logger.exception(f"Ошибка удаления заметки {note_id}: {e}")
+        raise NoteDeleteFailedError from e
 
-        note_service = NoteService()
 
-        # Проверяем существует ли заметка
-        note = await NotesRepo.get_note(note_id=note_id, username=current_user.username)
-        if not note:
-            logger.warning(
-                f"Заметка {note_id} не найдена для пользователя {current_user.username}"
-            )
-            raise NoteNotFoundError(f"Заметка {note_id} не найдена")
+# Частичное обновление заметки с оптимистичной блокировкой (If-Match или version)
+@router.patch("/update/{note_id}")
+async def update_note(
+    note_id: int,
+    note_update: NoteUpdate,
+    response: Response,
+    if_match: str | None = Header(None),
+    current_user=Depends(get_current_user),
+):
+    try:
+        logger.info(
+            f"Обновление заметки {note_id} пользователем {current_user.username}"
+        )
 
-        # Удаляем файлы из S3
-        if note.video_files or note.image_files or note.audio_files:
-            try:
-                delete_status = await note_service.delete_media_files_from_s3(note)
-                if not delete_status.get("ok"):
-                    logger.error(f"Ошибка при удалении медиафайлов заметки {note_id}")
-                    raise FilesDeleteError("Не удалось удалить медиафайлы")
-                logger.info(
-                    f"{delete_status.get('message', 'Медиафайлы удалены')} для заметки {note_id}"
-                )
-            except FilesDeleteError:
-                raise
-            except Exception as e:
-                logger.exception(
-                    f"Неожиданная ошибка удаления медиафайлов заметки {note_id}: {e}"
+        if not note_update.model_fields_set - {"version"}:
+            raise EmptyNoteUpdateError("Не переданы поля для обновления")
+
+        expected_version = note_update.version
+        if if_match is not None:
+            expected_version = version_from_if_match(if_match, note_id)
+            if expected_version is None:
+                raise NoteVersionConflictError(
+                    f"If-Match {if_match!r} не соответствует заметке {note_id}"
                 )
-                raise FilesDeleteError from e
-        else:
-            logger.info(f"Заметка {note_id} не содержит медиафайлов")
+        if expected_version is None:
+            raise NoteVersionRequiredError
+
+        note = await NotesRepo.update_note(
+            note_id=note_id,
+            username=current_user.username,
+            note_update=note_update,
+            expected_version=expected_version,
+        )
 
-        # Удаляем заметку из БД
-        try:
-            await NotesRepo.delete_note(note)
-            logger.info(f"Заметка {note_id} успешно удалена из БД")
-        except Exception as e:
-            logger.exception(f"Ошибка удаления заметки {note_id} из БД: {e}")
-            raise NoteDeleteFailedError from e
+        response.headers["ETag"] = note_etag(note.id, note.version)
+        logger.info(f"Заметка {note_id} обновлена до версии {note.version}")
+        return {"data": NoteRead.model_validate(note)}
+    except (
+        EmptyNoteUpdateError,
+        NoteVersionRequiredError,
+        NoteVersionConflictError,
+        NoteNotFoundError,
+        NoteAlreadyExistsError,
+    ):
+        raise
+    except Exception as e:
+        logger.exception(f"Ошибка обновления заметки {note_id}: {e}")
+        raise NoteUpdateFailedError from e
 
-        return {"message": f"Заметка {note_id} успешно удалена"}
 
-    except (NoteNotFoundError, NoteDeleteFailedError, FilesDeleteError):
+# История версий заметки: ревизии от новых к старым (keyset по version)
+@router.get("/revisions/{note_id}")
+async def list_note_revisions(
+    note_id: int,
+    limit: int = Query(
+        settings.revisions.default_limit,
+        ge=1,
+        le=settings.revisions.max_limit,
+    ),
+    before: int | None = Query(None, ge=1),
+    current_user=Depends(get_current_user),
+):
+    try:
+        current_version, revisions = await NoteRevisionsRepo.list_revisions(
+            note_id=note_id,
+            username=current_user.username,
+            limit=limit,
+            before=before,
+        )
+        logger.info(
+            f"Получено {len(revisions)} ревизий заметки {note_id} пользователя {current_user.username}"
+        )
+        return {
+            "current_version": current_version,
+            "data": [NoteRevisionRead.model_validate(row) for row in revisions],
+            "next_before": revisions[-1].version if len(revisions) == limit else None,
+        }
+    except (NoteNotFoundError, RepositoryInternalError):
         raise
     except Exception as e:
-        logger.exception(f"Неожиданная ошибка удаления заметки {note_id}: {e}")
-        raise NoteDeleteFailedError from e
+        logger.exception(f"Ошибка получения истории заметки {note_id}: {e}")
+        raise RepositoryInternalError("Не удалось получить историю заметки") from e
 
 
-# Получение всех заметок пользователя из БД
+# Восстановление содержимого заметки на указанной версии
+@router.get("/revisions/{note_id}/{version}")
+async def get_note_revision(
+    note_id: int,
+    version: int,
+    response: Response,
+    if_none_match: str | None = Header(None),
+    current_user=Depends(get_current_user),
+):
+    try:
+        # Прошлые версии неизменны: ETag по номеру версии
+        etag = make_etag("revision", note_id, version)
+        if etag_matches(if_none_match, etag):
+            return Response(
+                status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag}
+            )
+
+        revision = await NoteRevisionsRepo.get_revision(
+            note_id=note_id, username=current_user.username, version=version
+        )
+        response.headers["ETag"] = etag
+        logger.info(f"Версия {version} заметки {note_id} успешно восстановлена")
+        return {"data": revision}
+    except (NoteNotFoundError, RepositoryInternalError):
+        raise
+    except Exception as e:
+        logger.exception(
+            f"Ошибка восстановления версии {version} заметки {note_id}: {e}"
+        )
+        raise RepositoryInternalError("Не удалось восстановить версию заметки") from e
+
+
+# Получение заметок пользователя из БД постранично (keyset по id) или потоком NDJSON
 @router.get("/get_all_user_notes/")
-async def get_all_user_notes(current_user=Depends(get_current_user)):
+async def get_all_user_notes(
+    response: Response,
+    page_params: NotesPageParams = Depends(),
+    if_none_match: str | None = Header(None),
+    current_user=Depends(get_current_user),
+):
     try:
-        logger.info(f"Запрос всех заметок пользователя {current_user.username}")
+        # ETag коллекции по версии списков пользователя из Redis (ее меняет
+        # любая запись): 304 без обращения к БД. Страница с ETag берется из
+        # кэша, который заполняется с primary; без кэша или Redis страница
+        # читается с реплики, и ETag не выдается
+        list_version = (
+            await NotesCache.list_version(current_user.username)
+            if settings.cache.enabled
+            else None
+        )
+        etag = None
+        if list_version is not None:
+            etag = make_etag(
+                current_user.username,
+                list_version,
+                page_params.view.value,
+                page_params.limit,
+                page_params.after,
+                page_params.stream,
+                page_params.tags_mode.value,
+                *page_params.tags,
+            )
+            if etag_matches(if_none_match, etag):
+                return Response(
+                    status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag}
+                )
+        etag_headers = {"ETag": etag} if etag is not None else {}
 
-        notes = await NotesRepo.get_user_notes(current_user.username)
-        if notes:
+        if page_params.stream:
+            logger.info(
+                f"Потоковая выдача заметок пользователя {current_user.username}"
+            )
+            return StreamingResponse(
+                NoteService.notes_to_ndjson(
+                    NotesRepo.stream_notes(
+                        username=current_user.username,
+                        after=page_params.after,
+                        view=page_params.view,
+                        tags=page_params.tags,
+                        tags_mode=page_params.tags_mode,
+                        # Поток с ETag читается с primary, как и заполнение кэша
+                        primary=etag is not None,
+                    ),
+                    view=page_params.view,
+                ),
+                media_type="application/x-ndjson",
+                headers=etag_headers,
+            )
+
+        logger.info(
+            f"Запрос заметок пользователя {current_user.username} "
+            f"(limit={page_params.limit}, after={page_params.after}, view={page_params.view.value}, "
+            f"tags={page_params.tags} {page_params.tags_mode.value})"
+        )
+
+        page = await CachedNotesRepo.get_user_notes_page(
+            current_user.username,
+            limit=page_params.limit,
+            after=page_params.after,
+            view=page_params.view,
+            tags=page_params.tags,
+            tags_mode=page_params.tags_mode,
+        )
+        if page["data"]:
             logger.info(
-                f"Получено {len(notes)} заметок пользователя {current_user.username}"
+                f"Получено {len(page['data'])} заметок пользователя {current_user.username}"
             )
-            return {"data": notes}
+            response.headers.update(etag_headers)
+            return page
 
         logger.info(f"У пользователя {current_user.username} нет заметок")
-        return {"data": []}
+        response.headers.update(etag_headers)
+        return {"data": [], "next_after": None}
     except NoteNotFoundError:
-        return {"data": []}
+        return {"data": [], "next_after": None}
     except Exception as e:
         logger.exception(f"Ошибка получения заметок: {e}")
-        return {"data": []}
+        return {"data": [], "next_after": None}
 
 
-# Получение заметки по id из БД
+# Получение заметки по id из БД (view=summary - без content и вложений)
 @router.get("/get_user_note/{note_id}")
 async def get_user_note(
     note_id: int,
+    response: Response,
+    view: NoteView = Query(NoteView.full),
+    if_none_match: str | None = Header(None),
     current_user=Depends(get_current_user),
 ):
     try:
         logger.info(f"Запрос заметки {note_id} пользователем {current_user.username}")
 
-        note = await NotesRepo.get_note(note_id=note_id, username=current_user.username)
+        if view == NoteView.summary:
+            row = await NotesRepo.get_note_summary(
+                note_id=note_id, username=current_user.username
+            )
+            note = NoteSummaryRead.model_validate(row) if row else None
+        else:
+            note = await CachedNotesRepo.get_note(
+                note_id=note_id, username=current_user.username
+            )
         if not note:
             logger.warning(
                 f"Заметка {note_id} не найдена для пользователя {current_user.username}"
             )
             raise NoteNotFoundError(f"Заметка {note_id} не найдена")
 
+        version = note.version if view == NoteView.summary else note.get("version")
+        if version is not None:
+            etag = note_etag(note_id, version)
+            if etag_matches(if_none_match, etag):
+                return Response(
+                    status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag}
+                )
+            response.headers["ETag"] = etag
+
         logger.info(f"Заметка {note_id} успешно получена")
         return {"data": note}
     except NoteNotFoundError:
@@ -260,22 +472,117 @@ async def get_user_note(
         raise NoteNotFoundError from e
 
 
+# Полнотекстовый поиск по заголовкам и содержимому заметок пользователя
+@router.get("/search/")
+async def search_user_notes(
+    search_params: NotesSearchParams = Depends(),
+    current_user=Depends(get_current_user),
+):
+    try:
+        logger.info(
+            f"Поиск {search_params.q!r} в заметках пользователя {current_user.username}"
+        )
+
+        hits = await NotesRepo.search_user_notes(
+            username=current_user.username,
+            query=search_params.q,
+            limit=search_params.limit + 1,
+            after=search_params.after,
+        )
+        page = search_params.build_page(hits)
+        logger.info(
+            f"Найдено {len(page['data'])} заметок по запросу {search_params.q!r}"
+        )
+        return page
+    except (InvalidCursorError, RepositoryInternalError):
+        raise
+    except Exception as e:
+        logger.exception(f"Ошибка поиска заметок: {e}")
+        raise RepositoryInternalError("Не удалось выполнить поиск") from e
+
+
+# Автодополнение заголовков заметок пользователя (префикс + нечеткое совпадение)
+@router.get("/autocomplete/")
+async def autocomplete_note_titles(
+    prefix: str = Query(..., min_length=1, max_length=128),
+    limit: int = Query(
+        settings.autocomplete.default_limit,
+        ge=1,
+        le=settings.autocomplete.max_limit,
+    ),
+    current_user=Depends(get_current_user),
+):
+    try:
+        suggestions = await NoteService.autocomplete_titles(
+            username=current_user.username, prefix=prefix, limit=limit
+        )
+        return {"data": suggestions}
+    except RepositoryInternalError:
+        raise
+    except Exception as e:
+        logger.exception(f"Ошибка автодополнения заголовков: {e}")
+        raise RepositoryInternalError("Не удалось выполнить автодополнение") from e
+
+
+# Фасет тегов пользователя: число заметок с каждым тегом
+@router.get("/tags/")
+async def get_user_tags(
+    limit: int = Query(
+        settings.tags.default_limit,
+        ge=1,
+        le=settings.tags.max_limit,
+    ),
+    current_user=Depends(get_current_user),
+):
+    try:
+        rows = await NoteTagsRepo.get_tag_counts(current_user.username, limit)
+        logger.info(f"Получено {len(rows)} тегов пользователя {current_user.username}")
+        return {"data": [NoteTagCount.model_validate(row) for row in rows]}
+    except RepositoryInternalError:
+        raise
+    except Exception as e:
+        logger.exception(f"Ошибка получения тегов: {e}")
+        raise RepositoryInternalError("Не удалось получить теги") from e
+
+
 # TODO добавить доступом только по правам админа
-# Получение всех заметок из БД
+# Получение всех заметок из БД постранично (keyset по id) или потоком NDJSON
 @router.get("/get_all/")
-async def get_notes():
+async def get_notes(page_params: NotesPageParams = Depends()):
     try:
-        logger.info("Запрос всех заметок")
+        if page_params.stream:
+            logger.info("Потоковая выдача всех заметок")
+            return StreamingResponse(
+                NoteService.notes_to_ndjson(
+                    NotesRepo.stream_notes(
+                        after=page_params.after, view=page_params.view
+                    ),
+                    view=page_params.view,
+                ),
+                media_type="application/x-ndjson",
+            )
+
+        logger.info(
+            f"Запрос всех заметок (limit={page_params.limit}, after={page_params.after})"
+        )
 
-        notes = await NotesRepo.get_all_notes()
+        if page_params.view == NoteView.summary:
+            notes = await NotesRepo.get_notes_summary(
+                limit=page_params.limit + 1, after=page_params.after
+            )
+        else:
+            notes = await NotesRepo.get_all_notes(
+                limit=page_params.limit + 1, after=page_params.after
+            )
         if notes:
-            logger.info(f"Получено {len(notes)} заметок")
-            return {"data": notes}
+            page = page_params.build_page(notes)
+            logger.info(f"Получено {len(page['data'])} заметок")
+            return page
 
         logger.info("Нет заметок для отображения")
-        return {"data": []}
+        return {"data": [], "next_after": None}
     except NoteNotFoundError:
-        return {"data": []}
+        return {"data": [], "next_after": None}
     except Exception as e:
         logger.exception(f"Ошибка получения всех заметок: {e}")
-        return {"data": []}
+        return {"data": [], "next_after": None}
@@ -1,35 +1,83 @@
-from typing import List
+import asyncio
+from typing import AsyncIterator, List
 from uuid import UUID
 
 from fastapi import HTTPException, UploadFile
+from sqlalchemy import Row
 
+from core.config import settings
 from core.models.notes import NotesOrm
+from core.notes_repo import NotesRepo
+from core.schemas import (
+    NoteSummaryRead,
+    NoteTitleSuggestion,
+    NoteView,
+    NoteWithFilesRead,
+)
 from core.media_files_repo import MediaFilesRepo
+from core.notes_outbox_repo import DELETE_MEDIA, NotesOutboxRepo
 
 from exceptions.exceptions import (
     EmptyFileError,
-    FilesDeleteError,
     FilesHandlingError,
     FilesUploadError,
     RepositoryInternalError,
 )
 
-from integrations.files.files import MS_delete_file, MS_upload_file
+from integrations.files.files import MS_upload_file
 from integrations.files.schemas import (
     NSFileUploadRequest,
     NSFileUploadResponse,
 )
-from integrations.files.constants import (
-    NOTES_ATTACHMENT_NAME,
-    VIDEO_FILES_NAME,
-    IMAGE_FILES_NAME,
-    AUDIO_FILES_NAME,
-)
+from integrations.files.constants import NOTES_ATTACHMENT_NAME
 
+from utils import TTLCache
 from utils.logging import logger
 
+# Кэш горячих префиксов автодополнения: (username, prefix, limit) -> подсказки
+_autocomplete_cache = TTLCache(
+    maxsize=settings.autocomplete.cache_maxsize,
+    ttl=settings.autocomplete.cache_ttl,
+)
+
+
+# Общий на процесс лимит одновременных загрузок в media-service
+_process_upload_semaphore = asyncio.Semaphore(
+    settings.uploads.max_concurrent_per_process
+)
+
 
 class NoteService:
+    @staticmethod
+    async def autocomplete_titles(
+        username: str, prefix: str, limit: int
+    ) -> list[NoteTitleSuggestion]:
+        """Подсказки заголовков с коротким in-process кэшем по префиксу"""
+        normalized_prefix = prefix.strip().lower()
+        cache_key = (username, normalized_prefix, limit)
+
+        suggestions = _autocomplete_cache.get(cache_key)
+        if suggestions is not None:
+            return suggestions
+
+        rows = await NotesRepo.autocomplete_titles(
+            username=username, prefix=normalized_prefix, limit=limit
+        )
+        suggestions = [NoteTitleSuggestion.model_validate(row) for row in rows]
+        _autocomplete_cache.set(cache_key, suggestions)
+        return suggestions
+
+    @staticmethod
+    async def notes_to_ndjson(
+        notes: AsyncIterator[NotesOrm | Row],
+        view: NoteView = NoteView.full,
+    ) -> AsyncIterator[bytes]:
+        """Сериализация потока заметок в NDJSON построчно"""
+        schema = NoteSummaryRead if view == NoteView.summary else NoteWithFilesRead
+        async for note in notes:
+            payload = schema.model_validate(note).model_dump_json()
+            yield payload.encode() + b"\n"
+
     async def _upload_media_file(
         self, file: UploadFile, entity_id: int
     ) -> NSFileUploadResponse:
@@ -49,151 +97,122 @@ class NoteService:
             logger.exception(f"Ошибка загрузки {file.filename}: {e}")
             raise FilesUploadError from e
 
-    async def _save_file_to_db(
-        self, note_id: int, file_data: NSFileUploadResponse, category: str
-    ) -> UUID:
-        """Сохранение метаданных файла в БД"""
+    async def _save_files_to_db(
+        self,
+        note_id: int,
+        files: list[tuple[str, NSFileUploadResponse]],
+        username: str | None = None,
+    ) -> dict[str, list[UUID]]:
+        """Сохранение метаданных всех загруженных файлов в БД одной транзакцией"""
         try:
-            match category:
-                case category if category == VIDEO_FILES_NAME:
-                    result = await MediaFilesRepo.add_video(
-                        note_id=note_id, file_data=file_data
-                    )
-                case category if category == IMAGE_FILES_NAME:
-                    result = await MediaFilesRepo.add_image(
-                        note_id=note_id, file_data=file_data
-                    )
-                case category if category == AUDIO_FILES_NAME:
-                    result = await MediaFilesRepo.add_audio(
-                        note_id=note_id, file_data=file_data
-                    )
-                case _:
-                    raise FilesHandlingError(f"Unknown category: {category}")
-
-            if not result:
-                raise RepositoryInternalError(f"Failed to save {category} file")
-
-            logger.info(f"Файл {file_data.uuid} сохранен в БД")
-            return result.uuid
+            result = await MediaFilesRepo.add_files(
+                note_id=note_id, files=files, username=username
+            )
+            logger.info(f"{len(files)} файлов заметки {note_id} сохранены в БД")
+            return result
         except (FilesHandlingError, RepositoryInternalError):
             raise
         except Exception as e:
-            logger.exception(f"Ошибка сохранения {file_data.uuid}: {e}")
+            logger.exception(f"Ошибка сохранения файлов заметки {note_id}: {e}")
             raise RepositoryInternalError from e
 
-    async def process_media_files(
-        self, files: List[UploadFile], category: str, note_id: int
-    ) -> list[UUID]:
-        """Обработка и сохранение медиафайлов"""
+    async def _process_media_file(
+        self,
+        file: UploadFile,
+        note_id: int,
+        request_semaphore: asyncio.Semaphore,
+        uploaded: list[NSFileUploadResponse],
+    ) -> NSFileUploadResponse:
+        """Загрузка одного файла в S3 через Media service"""
+        async with request_semaphore, _process_upload_semaphore:
+            upload_response = await self._upload_media_file(
+                file=file, entity_id=note_id
+            )
+        if not upload_response:
+            raise FilesUploadError(f"No upload response for {file.filename}")
+        uploaded.append(upload_response)
+        return upload_response
+
+    async def _cleanup_uploaded_files(
+        self, uploaded: list[NSFileUploadResponse], note_id: int
+    ) -> None:
+        """Удаление из S3 уже загруженных файлов после ошибки пайплайна через outbox"""
+        if not uploaded:
+            return
+
+        logger.warning(
+            f"Откат: {len(uploaded)} загруженных файлов заметки {note_id} в outbox на удаление"
+        )
         try:
-            if not files:
-                raise EmptyFileError
-
-            logger.info(
-                f"Обработка {len(files)} файлов категории {category} для заметки {note_id}"
+            await NotesOutboxRepo.add(
+                DELETE_MEDIA, {"file_uuids": [file.uuid for file in uploaded]}
+            )
+        except RepositoryInternalError as e:
+            logger.error(
+                f"Не удалось поставить удаление файлов заметки {note_id} в outbox: {e}"
             )
 
-            uploaded_uuids: list[UUID] = []
-            for file in files:
-                # Загружаем в S3
-                upload_response = await self._upload_media_file(
-                    file=file, entity_id=note_id
-                )
-                if not upload_response:
-                    raise FilesUploadError(f"No upload response for {file.filename}")
-
-                # Сохраняем в БД
-                file_uuid = await self._save_file_to_db(
-                    note_id=note_id, file_data=upload_response, category=category
-                )
-                if not file_uuid:
-                    raise RepositoryInternalError(
-                        f"No UUID returned for {file.filename}"
-                    )
-
-                uploaded_uuids.append(file_uuid)
-
-            logger.info(f"Обработано {len(uploaded_uuids)} файлов категории {category}")
-            return uploaded_uuids
-
-        except (
-            EmptyFileError,
-            FilesUploadError,
-            FilesHandlingError,
-            RepositoryInternalError,
-        ):
-            raise
-        except Exception as e:
-            logger.exception(f"Ошибка обработки файлов {category}: {e}")
-            raise FilesUploadError from e
-
-    async def _delete_media_file(self, file_uuid: str):
-        """Удаление файла в S3 через Media service"""
+    async def process_media_files(
+        self,
+        files_by_category: dict[str, List[UploadFile] | None],
+        note_id: int,
+        username: str | None = None,
+    ) -> dict[str, list[UUID]]:
+        """Параллельная обработка и сохранение медиафайлов всех категорий.
+
+        Число одновременных загрузок ограничено на запрос и на процесс. При ошибке
+        любого файла остальные загрузки отменяются, а уже загруженные файлы
+        удаляются из S3. Метаданные всех файлов сохраняются одной транзакцией
+        после завершения загрузок.
+        """
+        jobs = [
+            (category, file)
+            for category, files in files_by_category.items()
+            for file in files or []
+        ]
+        if not jobs:
+            raise EmptyFileError
+
+        logger.info(f"Обработка {len(jobs)} файлов для заметки {note_id}")
+
+        request_semaphore = asyncio.Semaphore(
+            settings.uploads.max_concurrent_per_request
+        )
+        uploaded: list[NSFileUploadResponse] = []
         try:
-            response = await MS_delete_file(file_uuid)
-            if not response:
-                raise FilesDeleteError(f"No response for file UUID: {file_uuid}")
-            logger.info(f"Файл {file_uuid} удален из S3")
-            return response
-        except (HTTPException, FilesDeleteError):
-            raise
-        except Exception as e:
-            logger.exception(f"Ошибка удаления файла {file_uuid}: {e}")
-            raise FilesDeleteError from e
+            async with asyncio.TaskGroup() as tg:
+                tasks = [
+                    tg.create_task(
+                        self._process_media_file(
+                            file=file,
+                            note_id=note_id,
+                            request_semaphore=request_semaphore,
+                            uploaded=uploaded,
+                        )
+                    )
+                    for _, file in jobs
+                ]
+        except ExceptionGroup as eg:
+            await self._cleanup_uploaded_files(uploaded, note_id)
+            error = eg.exceptions[0]
+            # Все ошибки API и репозитория наследуются от HTTPException
+            if isinstance(error, HTTPException):
+                raise error
+            logger.exception(f"Ошибка обработки файлов заметки {note_id}: {error}")
+            raise FilesUploadError from error
 
-    async def delete_media_files_from_s3(self, note: NotesOrm):
-        """Удаление всех медиафайлов заметки из S3"""
         try:
-            total_files = (
-                len(note.video_files) + len(note.image_files) + len(note.audio_files)
+            uploaded_uuids = await self._save_files_to_db(
+                note_id=note_id,
+                files=[
+                    (category, task.result())
+                    for (category, _), task in zip(jobs, tasks)
+                ],
+                username=username,
             )
-            if total_files == 0:
-                logger.info(f"Заметка {note.id} не содержит медиафайлов")
-                return {"ok": True, "message": "No media files to delete"}
-
-            logger.info(f"Удаление {total_files} медиафайлов заметки {note.id}")
-            deleted_count = 0
-            failed_uuids = []
-
-            for video_file in note.video_files:
-                try:
-                    await self._delete_media_file(file_uuid=str(video_file.uuid))
-                    deleted_count += 1
-                except Exception as e:
-                    logger.error(f"Не удалось удалить видео {video_file.uuid}: {e}")
-                    failed_uuids.append(str(video_file.uuid))
-
-            for image_file in note.image_files:
-                try:
-                    await self._delete_media_file(file_uuid=str(image_file.uuid))
-                    deleted_count += 1
-                except Exception as e:
-                    logger.error(
-                        f"Не удалось удалить изображение {image_file.uuid}: {e}"
-                    )
-                    failed_uuids.append(str(image_file.uuid))
-
-            for audio_file in note.audio_files:
-                try:
-                    await self._delete_media_file(file_uuid=str(audio_file.uuid))
-                    deleted_count += 1
-                except Exception as e:
-                    logger.error(f"Не удалось удалить аудио {audio_file.uuid}: {e}")
-                    failed_uuids.append(str(audio_file.uuid))
-
-            if failed_uuids:
-                logger.warning(
-                    f"Удалено {deleted_count}/{total_files} файлов. Ошибки: {failed_uuids}"
-                )
-                raise FilesDeleteError(
-                    f"Failed to delete {len(failed_uuids)} files: {failed_uuids}"
-                )
-
-            logger.info(f"Все {deleted_count} медиафайлов заметки {note.id} удалены")
-            return {"ok": True, "message": f"Deleted {deleted_count} media files"}
-
-        except FilesDeleteError:
+        except Exception:
+            await self._cleanup_uploaded_files(uploaded, note_id)
             raise
-        except Exception as e:
-            logger.exception(f"Ошибка удаления медиафайлов заметки {note.id}: {e}")
-            raise FilesDeleteError from e
+
+        logger.info(f"Обработано {len(jobs)} файлов для заметки {note_id}")
+        return uploaded_uuids
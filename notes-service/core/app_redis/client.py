@@ -0,0 +1,35 @@
+from redis.asyncio import Redis
+
+from core.config import settings
+
+_redis_client: Redis | None = None
+_auth_redis_client: Redis | None = None
+
+
+async def get_redis_client() -> Redis:
+    global _redis_client
+    if _redis_client is None:
+        _redis_client = Redis.from_url(
+            settings.redis.REDIS_URL, decode_responses=True, encoding="utf-8"
+        )
+    return _redis_client
+
+
+async def get_auth_redis_client() -> Redis:
+    """Клиент базы users-service с черным списком токенов"""
+    global _auth_redis_client
+    if _auth_redis_client is None:
+        _auth_redis_client = Redis.from_url(
+            settings.redis.AUTH_REDIS_URL, decode_responses=True, encoding="utf-8"
+        )
+    return _auth_redis_client
+
+
+async def close_redis_client() -> None:
+    global _redis_client, _auth_redis_client
+    if _redis_client is not None:
+        await _redis_client.close()
+        _redis_client = None
+    if _auth_redis_client is not None:
+        await _auth_redis_client.close()
+        _auth_redis_client = None
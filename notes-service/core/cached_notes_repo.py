@@ -0,0 +1,78 @@
+from core.config import settings
+from core.notes_cache import NotesCache
+from core.notes_repo import NotesRepo
+from core.pagination import split_keyset_page
+from core.schemas import NoteSummaryRead, NoteTagsMode, NoteView, NoteWithFilesRead
+
+
+class CachedNotesRepo:
+    """Read-through слой над NotesRepo: заметки с вложениями читаются из Redis"""
+
+    @staticmethod
+    async def get_note(note_id: int, username: str) -> dict | None:
+        async def load_note() -> dict | None:
+            note = await NotesRepo.get_note(note_id=note_id, username=username)
+            if not note:
+                return None
+            return NoteWithFilesRead.model_validate(note).model_dump(mode="json")
+
+        payload = await NotesCache.read_through(
+            key=NotesCache.note_key(note_id),
+            cache_name="note",
+            ttl=settings.cache.note_ttl,
+            loader=load_note,
+        )
+        # Ключ заметки общий для всех пользователей - проверяем владельца
+        if payload is None or payload["user"] != username:
+            return None
+        return payload
+
+    @staticmethod
+    async def get_user_notes_page(
+        username: str,
+        limit: int,
+        after: int | None = None,
+        view: NoteView = NoteView.full,
+        tags: list[str] | None = None,
+        tags_mode: NoteTagsMode = NoteTagsMode.all,
+    ) -> dict:
+        async def load_page() -> dict:
+            if view == NoteView.summary:
+                notes = await NotesRepo.get_notes_summary(
+                    username,
+                    limit=limit + 1,
+                    after=after,
+                    tags=tags,
+                    tags_mode=tags_mode,
+                )
+                schema = NoteSummaryRead
+            else:
+                notes = await NotesRepo.get_user_notes(
+                    username,
+                    limit=limit + 1,
+                    after=after,
+                    tags=tags,
+                    tags_mode=tags_mode,
+                )
+                schema = NoteWithFilesRead
+            page, has_more = split_keyset_page(notes or [], limit)
+            return {
+                "data": [
+                    schema.model_validate(note).model_dump(mode="json") for note in page
+                ],
+                "next_after": page[-1].id if has_more and page else None,
+            }
+
+        return await NotesCache.read_through(
+            key=await NotesCache.list_key(
+                username,
+                limit,
+                after,
+                view.value,
+                # Теги нормализованы и без запятых
+                f"{tags_mode.value}:{','.join(sorted(tags))}" if tags else "",
+            ),
+            cache_name="list",
+            ttl=settings.cache.list_ttl,
+            loader=load_page,
+        )
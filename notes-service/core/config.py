@@ -13,9 +13,34 @@ class AppConfig(BaseModel):
     port: int = 8000
 
 
+class AccessLogConfig(BaseModel):
+    enabled: bool = True
+    # Доля успешных запросов в access-логе; 5xx и медленные пишутся всегда.
+    # Полный лог: ACCESS_SAMPLE_RATE=1.0
+    sample_rate: float = 0.1
+    slow_threshold_ms: float = 1000.0
+
+
+class ProfilingConfig(BaseModel):
+    # Запуск tracemalloc при старте процесса; по умолчанию только через admin API
+    memory_on_start: bool = False
+    traceback_frames: int = 1
+    top_limit: int = 25
+    # Токен заголовка X-Admin-Token; без него admin API профилирования отключено
+    admin_token: str | None = None
+
+
+class SqlMetricsConfig(BaseModel):
+    # Метрики SQL по эндпоинтам (число запросов, время, строки)
+    enabled: bool = True
+    # Детектор N+1 работает только в режиме DEV: порог повторов одной формы запроса
+    n_plus_one_threshold: int = 5
+
+
 class ApiV1Prefix(BaseModel):
     prefix: str = "/v1"
     notes: str = "/notes"
+    profiling: str = "/profiling"
 
 
 class ApiPrefix(BaseModel):
@@ -23,6 +48,176 @@ class ApiPrefix(BaseModel):
     v1: ApiV1Prefix = ApiV1Prefix()
 
 
+class PaginationConfig(BaseModel):
+    default_limit: int = 50
+    max_limit: int = 500
+    # Размер пачки строк, которую курсор отдает при потоковой выдаче
+    stream_batch_size: int = 200
+
+
+class TagsConfig(BaseModel):
+    # Размер фасета тегов пользователя
+    default_limit: int = 50
+    max_limit: int = 500
+
+
+class AutocompleteConfig(BaseModel):
+    default_limit: int = 10
+    max_limit: int = 25
+    # Короткий TTL кэша горячих префиксов, сек
+    cache_ttl: float = 5.0
+    cache_maxsize: int = 4096
+
+
+class RedisSettings(BaseModel):
+    host: str
+    port: int
+    db: int = 2
+    # База users-service с черным списком access-токенов
+    auth_db: int = 1
+
+    @property
+    def REDIS_URL(self):
+        return f"redis://{self.host}:{self.port}/{self.db}"
+
+    @property
+    def AUTH_REDIS_URL(self):
+        return f"redis://{self.host}:{self.port}/{self.auth_db}"
+
+
+class AuthConfig(BaseModel):
+    # local - проверка JWT публичным ключом users-service, remote - запрос self_info
+    mode: str = "local"
+    public_key_path: Path = BASE_PATH / "core" / "security_keys" / "public_key.pem"
+    algorithm: str = "EdDSA"
+    self_info_url: str = "http://krakend:8080/user/self_info/"
+    # In-process кэш проверенных токенов по jti, сек
+    cache_ttl: float = 5.0
+    cache_maxsize: int = 10000
+    # Как долго активность пользователя, подтвержденная users-service, считается
+    # актуальной: после деактивации токены перестают приниматься не позже этого, сек
+    status_ttl: float = 30.0
+    # Пул соединений общего клиента запросов self_info
+    max_connections: int = 100
+    max_keepalive_connections: int = 20
+    keepalive_expiry: float = 30.0
+    timeout: float = 5.0
+
+
+class CacheConfig(BaseModel):
+    enabled: bool = True
+    # TTL закэшированной заметки и страницы списка заметок, сек
+    note_ttl: int = 300
+    list_ttl: int = 120
+    # Защита от stampede: блокировка на заполнение ключа и ожидание чужого заполнения
+    lock_ttl_ms: int = 3000
+    lock_wait: float = 1.0
+    lock_poll_interval: float = 0.05
+    # Время жизни версии списков пользователя (ETag коллекции), сек: предел
+    # устаревания, если сбросить версию после записи не удалось совсем
+    list_version_ttl: int = 3600
+
+
+class MediaServiceConfig(BaseModel):
+    base_url: str = "http://krakend:8080"
+    # Пул соединений общего HTTP-клиента
+    max_connections: int = 100
+    max_keepalive_connections: int = 20
+    keepalive_expiry: float = 30.0
+    # Таймауты операций, сек
+    connect_timeout: float = 5.0
+    upload_timeout: float = 120.0
+    get_timeout: float = 10.0
+    delete_timeout: float = 10.0
+    # Таймаут чтения при потоковом скачивании файла (между чанками), сек
+    download_timeout: float = 60.0
+    # Максимум UUID в одном запросе пакетного удаления (лимит media-service)
+    delete_batch_size: int = 100
+
+
+class UploadsConfig(BaseModel):
+    # Одновременные загрузки вложений в media-service в рамках запроса и процесса
+    max_concurrent_per_request: int = 4
+    max_concurrent_per_process: int = 32
+
+
+class ImportsConfig(BaseModel):
+    # Строк в одной пачке COPY во временную таблицу
+    batch_size: int = 5000
+    max_rows: int = 100_000
+    # Размер чанка при потоковом чтении NDJSON, байт
+    read_chunk_size: int = 64 * 1024
+    # Максимальный размер одного markdown-файла в zip-архиве, байт
+    max_markdown_size: int = 1024 * 1024
+
+
+class ExportConfig(BaseModel):
+    # Одновременные скачивания вложений из media-service при экспорте в zip
+    max_concurrent_downloads: int = 4
+    # Заметок в странице экспорта zip; каждая страница читается отдельной короткой сессией
+    page_size: int = 100
+    # Чанков каждого скачивания в буфере; память ~ downloads * prefetch_chunks * chunk_size
+    prefetch_chunks: int = 8
+    chunk_size: int = 64 * 1024
+
+
+class RevisionsConfig(BaseModel):
+    # Каждая N-я ревизия заметки - полный снимок: восстановление не дальше N дельт
+    snapshot_interval: int = 20
+    default_limit: int = 50
+    max_limit: int = 200
+
+
+class CompressionConfig(BaseModel):
+    enabled: bool = True
+    # Тела заметок от этого размера (байт UTF-8) хранятся сжатыми zstd
+    threshold: int = 2048
+    level: int = 3
+    # Тела до этого размера сжимаются обученным словарем, крупнее - без словаря
+    dict_max_body_size: int = 64 * 1024
+    # Обучение словаря: размер словаря и число заметок-образцов
+    dict_size: int = 112 * 1024
+    dict_train_samples: int = 5000
+    # Строк в одной пачке фонового сжатия / распаковки
+    backfill_batch_size: int = 500
+
+
+class PurgeConfig(BaseModel):
+    # Фоновая очистка мягко удаленных заметок в процессе сервиса
+    enabled: bool = True
+    # Через сколько секунд после удаления заметка доступна очистке
+    delay: int = 0
+    interval: float = 5.0
+    # Заметок в одной пачке очистки
+    batch_size: int = 100
+
+
+class OutboxConfig(BaseModel):
+    # Фоновая отправка сообщений outbox в процессе сервиса
+    enabled: bool = True
+    interval: float = 1.0
+    # Сообщений в одной пачке отправки
+    batch_size: int = 100
+    # Повтор после ошибки через retry_base_delay * 2^(попытка - 1), не больше retry_max_delay, сек
+    retry_base_delay: float = 5.0
+    retry_max_delay: float = 600.0
+    # После стольких неудачных попыток сообщение получает статус failed
+    max_attempts: int = 20
+
+
+class ReplicasConfig(BaseModel):
+    # Реплики для чтения: "host" или "host:port", учетные данные и БД как у primary
+    hosts: list[str] = []
+    pool_size: int = 20
+    max_overflow: int = 10
+    # Реплика, отстающая больше max_lag_seconds, исключается из чтения
+    max_lag_seconds: float = 3.0
+    check_interval: float = 2.0
+    check_timeout: float = 1.0
+    # Закрепление клиента за primary после записи; не меньше max_lag + check_interval
+    pin_seconds: int = 5
+
+
 class DatabaseSettings(BaseModel):
     # DB URL
     host: str
@@ -35,6 +230,10 @@ class DatabaseSettings(BaseModel):
     echo_pool: bool = False
     pool_size: int = 50
     max_overflow: int = 10
+    # Соединений, открываемых и проверяемых при старте (не больше pool_size)
+    pool_warmup: int = 10
+    # Подготовленных выражений asyncpg на соединение (LRU)
+    prepared_statement_cache_size: int = 500
 
     naming_convention: dict[str, str] = {
         "ix": "ix_%(column_0_label)s",
@@ -48,17 +247,42 @@ class DatabaseSettings(BaseModel):
     def DB_URL_asyncpg(self):
         return f"postgresql+asyncpg://{self.user}:{self.pwd}@{self.host}:{self.port}/{self.name}"
 
+    def replica_URL_asyncpg(self, host: str) -> str:
+        if ":" not in host:
+            host = f"{host}:{self.port}"
+        return f"postgresql+asyncpg://{self.user}:{self.pwd}@{host}/{self.name}"
+
 
 class Settings(BaseSettings):
     model_config = SettingsConfigDict(
         env_file=str(ENV_PATH),
         case_sensitive=False,
         env_nested_delimiter="_",
+        # Делится только первый "_" после префикса секции: NOTES_DB_POOL_WARMUP -> db.pool_warmup
+        env_nested_max_split=1,
         env_prefix="NOTES_",
     )
     app: AppConfig = AppConfig()
+    access: AccessLogConfig = AccessLogConfig()
+    profiling: ProfilingConfig = ProfilingConfig()
+    sql_metrics: SqlMetricsConfig = SqlMetricsConfig()
     api: ApiPrefix = ApiPrefix()
+    pagination: PaginationConfig = PaginationConfig()
+    autocomplete: AutocompleteConfig = AutocompleteConfig()
+    tags: TagsConfig = TagsConfig()
     db: DatabaseSettings
+    replicas: ReplicasConfig = ReplicasConfig()
+    redis: RedisSettings
+    cache: CacheConfig = CacheConfig()
+    auth: AuthConfig = AuthConfig()
+    media: MediaServiceConfig = MediaServiceConfig()
+    uploads: UploadsConfig = UploadsConfig()
+    imports: ImportsConfig = ImportsConfig()
+    export: ExportConfig = ExportConfig()
+    revisions: RevisionsConfig = RevisionsConfig()
+    compression: CompressionConfig = CompressionConfig()
+    purge: PurgeConfig = PurgeConfig()
+    outbox: OutboxConfig = OutboxConfig()
 
 
 settings = Settings()  # type: ignore
@@ -66,5 +290,8 @@ print()
 print("-------- Notes Service --------")
 print(f"INFO:     Run mode: {settings.app.mode}")
 print(f"INFO:     Using Database url: {settings.db.DB_URL_asyncpg}")
+print(f"INFO:     Read replicas: {', '.join(settings.replicas.hosts) or 'none'}")
+print(f"INFO:     Using Redis url: {settings.redis.REDIS_URL}")
+print(f"INFO:     Auth mode: {settings.auth.mode} ({settings.auth.algorithm})")
 print("-------------------------------")
 print()
@@ -1,130 +1,77 @@
 from uuid import UUID
+from sqlalchemy import insert, update
 from sqlalchemy.exc import SQLAlchemyError
 
-from core.models.notes import VideoFilesOrm, ImageFilesOrm, AudioFilesOrm
+from core.models.notes import NoteAttachmentsOrm, NotesOrm
 from core.models.db_helper import db_helper
+from core.notes_cache import NotesCache
+from integrations.files.constants import ATTACHMENT_KINDS
 from integrations.files.schemas import NSFileUploadResponse
-from exceptions.exceptions import RepositoryInternalError
+from exceptions.exceptions import FilesHandlingError, RepositoryInternalError
 from utils.logging import logger
 
 
 class MediaFilesRepo:
     @staticmethod
-    async def add_video(
-        note_id: int, file_data: NSFileUploadResponse
-    ) -> VideoFilesOrm | None:
-        try:
-            async with db_helper.session_factory() as session:
-                logger.debug(
-                    f"Попытка добавления видео {file_data.uuid} к заметке {note_id}"
-                )
-
-                video = VideoFilesOrm(
-                    note_id=note_id,
-                    uuid=UUID(file_data.uuid),
-                    s3_url=file_data.s3_url,
-                    content_type=file_data.content_type,
-                    category=file_data.category,
-                    uploaded_at_s3=file_data.uploaded_at_s3,
-                )
-                session.add(video)
-                await session.commit()
-                await session.refresh(video)
-                logger.info(
-                    f"Видео {file_data.uuid} успешно добавлено к заметке {note_id}"
-                )
-                return video
-        except SQLAlchemyError as e:
-            logger.exception(
-                f"Ошибка базы данных при добавлении видео {file_data.uuid}: {e}"
-            )
-            raise RepositoryInternalError(
-                "Не удалось добавить видео из-за ошибки базы данных."
-            ) from e
-        except Exception as e:
-            logger.exception(
-                f"Неожиданная ошибка при добавлении видео {file_data.uuid}: {e}"
+    async def add_files(
+        note_id: int,
+        files: list[tuple[str, NSFileUploadResponse]],
+        username: str | None = None,
+    ) -> dict[str, list[UUID]]:
+        """Сохраняет все вложения заметки одним INSERT ... VALUES ... RETURNING"""
+        rows: list[dict] = []
+        for category, file_data in files:
+            if category not in ATTACHMENT_KINDS:
+                raise FilesHandlingError(f"Unknown category: {category}")
+            rows.append(
+                {
+                    "note_id": note_id,
+                    "kind": category,
+                    "uuid": UUID(file_data.uuid),
+                    "s3_url": file_data.s3_url,
+                    "content_type": file_data.content_type,
+                    "category": file_data.category,
+                    "uploaded_at_s3": file_data.uploaded_at_s3,
+                }
             )
-            raise RepositoryInternalError(
-                "Не удалось добавить видео из-за неожиданной ошибки."
-            ) from e
 
-    @staticmethod
-    async def add_image(
-        note_id: int, file_data: NSFileUploadResponse
-    ) -> ImageFilesOrm | None:
         try:
             async with db_helper.session_factory() as session:
                 logger.debug(
-                    f"Попытка добавления изображения {file_data.uuid} к заметке {note_id}"
+                    f"Попытка добавления {len(files)} вложений к заметке {note_id}"
                 )
 
-                image = ImageFilesOrm(
-                    note_id=note_id,
-                    uuid=UUID(file_data.uuid),
-                    s3_url=file_data.s3_url,
-                    content_type=file_data.content_type,
-                    category=file_data.category,
-                    uploaded_at_s3=file_data.uploaded_at_s3,
+                result = await session.execute(
+                    insert(NoteAttachmentsOrm)
+                    .values(rows)
+                    .returning(NoteAttachmentsOrm.kind, NoteAttachmentsOrm.uuid)
                 )
-                session.add(image)
-                await session.commit()
-                await session.refresh(image)
-                logger.info(
-                    f"Изображение {file_data.uuid} успешно добавлено к заметке {note_id}"
-                )
-                return image
-        except SQLAlchemyError as e:
-            logger.exception(
-                f"Ошибка базы данных при добавлении изображения {file_data.uuid}: {e}"
-            )
-            raise RepositoryInternalError(
-                "Не удалось добавить изображение из-за ошибки базы данных."
-            ) from e
-        except Exception as e:
-            logger.exception(
-                f"Неожиданная ошибка при добавлении изображения {file_data.uuid}: {e}"
-            )
-            raise RepositoryInternalError(
-                "Не удалось добавить изображение из-за неожиданной ошибки."
-            ) from e
-
-    @staticmethod
-    async def add_audio(
-        note_id: int, file_data: NSFileUploadResponse
-    ) -> AudioFilesOrm | None:
-        try:
-            async with db_helper.session_factory() as session:
-                logger.debug(
-                    f"Попытка добавления аудио {file_data.uuid} к заметке {note_id}"
-                )
-
-                audio = AudioFilesOrm(
-                    note_id=note_id,
-                    uuid=UUID(file_data.uuid),
-                    s3_url=file_data.s3_url,
-                    content_type=file_data.content_type,
-                    category=file_data.category,
-                    uploaded_at_s3=file_data.uploaded_at_s3,
+                saved: dict[str, list[UUID]] = {}
+                for kind, file_uuid in result.all():
+                    saved.setdefault(kind, []).append(file_uuid)
+                # Вложения - часть заметки: новая версия меняет ее ETag
+                await session.execute(
+                    update(NotesOrm)
+                    .where(NotesOrm.id == note_id)
+                    .values(version=NotesOrm.version + 1)
                 )
-                session.add(audio)
                 await session.commit()
-                await session.refresh(audio)
+                await NotesCache.invalidate_note(note_id, username)
                 logger.info(
-                    f"Аудио {file_data.uuid} успешно добавлено к заметке {note_id}"
+                    f"{len(files)} вложений успешно добавлено к заметке {note_id}"
                 )
-                return audio
+                return saved
         except SQLAlchemyError as e:
             logger.exception(
-                f"Ошибка базы данных при добавлении аудио {file_data.uuid}: {e}"
+                f"Ошибка базы данных при добавлении вложений к заметке {note_id}: {e}"
             )
             raise RepositoryInternalError(
-                "Не удалось добавить аудио из-за ошибки базы данных."
+                "Не удалось добавить вложения из-за ошибки базы данных."
             ) from e
         except Exception as e:
             logger.exception(
-                f"Неожиданная ошибка при добавлении аудио {file_data.uuid}: {e}"
+                f"Неожиданная ошибка при добавлении вложений к заметке {note_id}: {e}"
             )
             raise RepositoryInternalError(
-                "Не удалось добавить аудио из-за неожиданной ошибки."
+                "Не удалось добавить вложения из-за неожиданной ошибки."
             ) from e
@@ -1,4 +1,21 @@
-__all__ = ("db_helper", "Base", "NotesOrm")
+__all__ = (
+    "db_helper",
+    "Base",
+    "NotesOrm",
+    "NoteAttachmentsOrm",
+    "NoteCompressionDictsOrm",
+    "NoteRevisionsOrm",
+    "NoteTagCountsOrm",
+    "NotesOutboxOrm",
+    "NotesOutboxStatusesEnum",
+)
 from .db_helper import db_helper
 from .base import Base
-from .notes import NotesOrm
+from .notes import (
+    NoteAttachmentsOrm,
+    NoteCompressionDictsOrm,
+    NoteRevisionsOrm,
+    NoteTagCountsOrm,
+    NotesOrm,
+)
+from .notes_outbox import NotesOutboxOrm, NotesOutboxStatusesEnum
@@ -1,13 +1,21 @@
-from typing import AsyncGenerator
+import asyncio
+import time
+from typing import AsyncGenerator, Iterable
 
+from sqlalchemy import Executable, text
 from sqlalchemy.ext.asyncio import (
+    AsyncConnection,
     create_async_engine,
     async_sessionmaker,
     AsyncEngine,
     AsyncSession,
 )
 
+from utils.logging import logger
+from utils.sql_metrics import instrument_engine
+
 from ..config import settings
+from .db_routing import Replica, ReplicaSet, RoutingSession
 
 
 class DbHelper:
@@ -18,6 +26,13 @@ class DbHelper:
         echo_pool: bool = False,
         pool_size: int = 5,
         max_overflow: int = 10,
+        instrument: bool = False,
+        prepared_statement_cache_size: int = 100,
+        replica_urls: dict[str, str] | None = None,
+        replica_pool_size: int = 5,
+        replica_max_overflow: int = 10,
+        replica_max_lag: float = 3.0,
+        replica_check_timeout: float = 1.0,
     ) -> None:
         self.engine: AsyncEngine = create_async_engine(
             url=url,
@@ -25,7 +40,12 @@ class DbHelper:
             echo_pool=echo_pool,
             pool_size=pool_size,
             max_overflow=max_overflow,
+            connect_args={
+                "prepared_statement_cache_size": prepared_statement_cache_size
+            },
         )
+        if instrument:
+            instrument_engine(self.engine)
         self.session_factory: async_sessionmaker[AsyncSession] = async_sessionmaker(
             bind=self.engine,
             autoflush=False,
@@ -33,8 +53,102 @@ class DbHelper:
             expire_on_commit=False,
         )
 
+        replicas = []
+        for name, replica_url in (replica_urls or {}).items():
+            engine = create_async_engine(
+                url=replica_url,
+                echo=echo,
+                echo_pool=echo_pool,
+                pool_size=replica_pool_size,
+                max_overflow=replica_max_overflow,
+                connect_args={
+                    "prepared_statement_cache_size": prepared_statement_cache_size
+                },
+            )
+            if instrument:
+                instrument_engine(engine)
+            replicas.append(Replica(name, engine))
+        self.replicas: ReplicaSet | None = (
+            ReplicaSet(replicas, replica_max_lag, replica_check_timeout)
+            if replicas
+            else None
+        )
+        # Сессии только для чтения: SELECT на реплики, без реплик - на primary
+        self.read_session_factory: async_sessionmaker[AsyncSession] = (
+            async_sessionmaker(
+                bind=self.engine,
+                autoflush=False,
+                autocommit=False,
+                expire_on_commit=False,
+                sync_session_class=RoutingSession,
+                replicas=self.replicas,
+            )
+        )
+
+    @staticmethod
+    async def _warm_up_connection(
+        conn: AsyncConnection, statements: list[tuple[Executable, dict]]
+    ) -> None:
+        await conn.execute(text("SELECT 1"))
+        # Выполнение готовит выражения в кэше asyncpg этого соединения
+        for stmt, params in statements:
+            await conn.execute(stmt, params)
+        await conn.rollback()
+
+    @staticmethod
+    async def _warm_up_engine(
+        engine: AsyncEngine,
+        connections: int,
+        statements: list[tuple[Executable, dict]],
+    ) -> int:
+        """Открытие connections соединений одновременно (иначе пул переиспользует одно)"""
+        opened = await asyncio.gather(
+            *(engine.connect().start() for _ in range(connections)),
+            return_exceptions=True,
+        )
+        conns = [conn for conn in opened if not isinstance(conn, BaseException)]
+        try:
+            results = await asyncio.gather(
+                *(DbHelper._warm_up_connection(conn, statements) for conn in conns),
+                return_exceptions=True,
+            )
+        finally:
+            await asyncio.gather(*(conn.close() for conn in conns))
+        for error in (*opened, *results):
+            if isinstance(error, Exception):
+                logger.warning(f"Ошибка прогрева соединения {engine.url!r}: {error}")
+                break
+        return sum(1 for result in results if not isinstance(result, Exception))
+
+    async def warm_up(
+        self,
+        connections: int,
+        statements: Iterable[tuple[Executable, dict]] = (),
+    ) -> None:
+        """Прогрев пулов primary и реплик: соединения и горячие SELECT-запросы.
+
+        Первые запросы после деплоя не платят за установку соединения и
+        подготовку выражений. statements - SELECT с параметрами, не находящими
+        строк: они выполняются на каждом соединении и откатываются.
+        """
+        statements = list(statements)
+        engines = [self.engine]
+        if self.replicas is not None:
+            engines += [replica.engine for replica in self.replicas.replicas]
+
+        started_at = time.perf_counter()
+        for engine in engines:
+            count = min(connections, engine.pool.size())
+            warmed = await self._warm_up_engine(engine, count, statements)
+            logger.info(f"Прогрето соединений {engine.url!r}: {warmed} из {count}")
+        logger.info(
+            f"Прогрев пулов БД занял {(time.perf_counter() - started_at) * 1000:.0f} мс"
+        )
+
     async def dispose(self) -> None:
         await self.engine.dispose()
+        if self.replicas is not None:
+            await self.replicas.dispose()
 
     async def session_getter(self) -> AsyncGenerator[AsyncSession, None]:
         async with self.session_factory() as session:
@@ -47,4 +161,13 @@ db_helper = DbHelper(
     echo_pool=settings.db.echo_pool,
     pool_size=settings.db.pool_size,
     max_overflow=settings.db.max_overflow,
+    instrument=settings.sql_metrics.enabled,
+    prepared_statement_cache_size=settings.db.prepared_statement_cache_size,
+    replica_urls={
+        host: settings.db.replica_URL_asyncpg(host) for host in settings.replicas.hosts
+    },
+    replica_pool_size=settings.replicas.pool_size,
+    replica_max_overflow=settings.replicas.max_overflow,
+    replica_max_lag=settings.replicas.max_lag_seconds,
+    replica_check_timeout=settings.replicas.check_timeout,
 )
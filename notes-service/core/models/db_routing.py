@@ -0,0 +1,141 @@
+import asyncio
+import random
+
+from prometheus_client import Gauge
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.orm import Session
+from sqlalchemy.sql.dml import UpdateBase
+
+from utils.logging import logger
+from utils.read_your_writes import primary_pinned
+
+# Отставание по времени последней примененной транзакции; 0, если реплика
+# применила весь полученный WAL (иначе на простаивающем primary лаг бы рос)
+REPLICA_STATUS_SQL = text("""
+    SELECT
+        pg_is_in_recovery() AS in_recovery,
+        CASE
+            WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+            ELSE COALESCE(
+                EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0
+            )
+        END AS lag
+    """)
+
+replica_lag_seconds = Gauge(
+    "notes_db_replica_lag_seconds",
+    "Отставание реплики БД по последней проверке",
+    ["replica"],
+)
+replica_healthy = Gauge(
+    "notes_db_replica_healthy",
+    "Реплика БД доступна и отстает не больше допустимого (1) или исключена (0)",
+    ["replica"],
+)
+
+
+class Replica:
+    __slots__ = ("name", "engine", "healthy", "lag")
+
+    def __init__(self, name: str, engine: AsyncEngine) -> None:
+        self.name = name
+        self.engine = engine
+        # До первой проверки реплика не используется
+        self.healthy = False
+        self.lag: float | None = None
+
+
+class ReplicaSet:
+    """Реплики для чтения с проверкой доступности и отставания.
+
+    Проверка идет фоном раз в check_interval секунд. Недоступная реплика,
+    реплика вне recovery (повышенная до primary) или отстающая больше
+    max_lag секунд исключается до следующей успешной проверки.
+    """
+
+    def __init__(
+        self, replicas: list[Replica], max_lag: float, check_timeout: float
+    ) -> None:
+        self.replicas = replicas
+        self.max_lag = max_lag
+        self.check_timeout = check_timeout
+
+    def choose(self) -> AsyncEngine | None:
+        """Движок случайной здоровой реплики или None, если читать надо с primary"""
+        healthy = [replica for replica in self.replicas if replica.healthy]
+        if not healthy:
+            return None
+        return random.choice(healthy).engine
+
+    async def _check_replica(self, replica: Replica) -> None:
+        reason = None
+        try:
+            async with asyncio.timeout(self.check_timeout):
+                async with replica.engine.connect() as conn:
+                    status = (await conn.execute(REPLICA_STATUS_SQL)).one()
+        except Exception as e:
+            replica.lag = None
+            reason = f"недоступна ({e!r})"
+        else:
+            replica.lag = float(status.lag)
+            if not status.in_recovery:
+                reason = "не в режиме recovery"
+            elif replica.lag > self.max_lag:
+                reason = f"отставание {replica.lag:.1f} с > {self.max_lag} с"
+
+        healthy = reason is None
+        if healthy != replica.healthy:
+            if healthy:
+                logger.info(f"Реплика {replica.name} возвращена в чтение")
+            else:
+                logger.warning(f"Реплика {replica.name} исключена из чтения: {reason}")
+        replica.healthy = healthy
+        replica_healthy.labels(replica.name).set(int(healthy))
+        if replica.lag is not None:
+            replica_lag_seconds.labels(replica.name).set(replica.lag)
+
+    async def check(self) -> None:
+        await asyncio.gather(
+            *(self._check_replica(replica) for replica in self.replicas)
+        )
+
+    async def run_checks(self, interval: float) -> None:
+        while True:
+            await asyncio.sleep(interval)
+            await self.check()
+
+    async def dispose(self) -> None:
+        for replica in self.replicas:
+            await replica.engine.dispose()
+
+
+class RoutingSession(Session):
+    """Сессия чтения: SELECT на реплику, запись и запросы с закреплением - на primary.
+
+    Реплика выбирается один раз на сессию, чтобы чтения одной сессии не
+    попадали на реплики с разным отставанием. Без здоровых реплик сессия
+    работает с primary.
+    """
+
+    def __init__(self, replicas: ReplicaSet | None = None, **kwargs) -> None:
+        super().__init__(**kwargs)
+        self.replicas = replicas
+        self._replica_engine: AsyncEngine | None = None
+        self._replica_chosen = False
+
+    def get_bind(self, mapper=None, clause=None, **kwargs):
+        if (
+            self.replicas is None
+            or self._flushing
+            or isinstance(clause, UpdateBase)
+            or primary_pinned()
+        ):
+            return super().get_bind(mapper, clause=clause, **kwargs)
+
+        if not self._replica_chosen:
+            self._replica_engine = self.replicas.choose()
+            self._replica_chosen = True
+        if self._replica_engine is None:
+            return super().get_bind(mapper, clause=clause, **kwargs)
+        return self._replica_engine.sync_engine
@@ -1,13 +1,31 @@
+from datetime import datetime
 from typing import List
 from uuid import UUID, uuid7
 
-from sqlalchemy import String, ForeignKey
+from sqlalchemy import (
+    CheckConstraint,
+    DateTime,
+    Index,
+    LargeBinary,
+    String,
+    ForeignKey,
+    UniqueConstraint,
+    text,
+)
+from sqlalchemy.dialects.postgresql import ARRAY, JSONB, TSVECTOR
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
+from core.note_body_codec import NoteBodyCodec
 from core.models_crud import (
     created_at,
     updated_at,
 )
+from integrations.files.constants import (
+    ATTACHMENT_KINDS,
+    AUDIO_FILES_NAME,
+    IMAGE_FILES_NAME,
+    VIDEO_FILES_NAME,
+)
 from .base import Base
 
 
@@ -22,68 +40,212 @@ class FileBase:
     updated_at: Mapped[updated_at]
 
 
+# Условие частичных индексов: удаленные заметки ждут очистки и в чтениях не участвуют
+NOT_DELETED = text("deleted_at IS NULL")
+
+
 class NotesOrm(Base):
+    __table_args__ = (
+        CheckConstraint("(content IS NULL) <> (content_zstd IS NULL)", name="body"),
+        # Заголовок уникален среди неудаленных заметок пользователя; цель ON CONFLICT
+        # при создании (index_where=NOT_DELETED)
+        Index(
+            "uq_notes_orms_user_title",
+            "user",
+            "title",
+            unique=True,
+            postgresql_where=NOT_DELETED,
+        ),
+        # Keyset-пагинация заметок пользователя: WHERE user = ? AND id > ? ORDER BY id
+        Index("ix_notes_orms_user_id", "user", "id", postgresql_where=NOT_DELETED),
+        Index(
+            "ix_notes_orms_search_vector",
+            "search_vector",
+            postgresql_using="gin",
+            postgresql_where=NOT_DELETED,
+        ),
+        # Нечеткий поиск и автодополнение заголовков в пределах пользователя (btree_gin + pg_trgm)
+        Index(
+            "ix_notes_orms_user_title_trgm",
+            "user",
+            "title",
+            postgresql_using="gin",
+            postgresql_ops={"title": "gin_trgm_ops"},
+            postgresql_where=NOT_DELETED,
+        ),
+        # Фильтр по тегам в пределах пользователя: user = ? AND tags @> / && ? (btree_gin)
+        Index(
+            "ix_notes_orms_user_tags",
+            "user",
+            "tags",
+            postgresql_using="gin",
+            postgresql_where=NOT_DELETED,
+        ),
+        # Очередь очистки: WHERE deleted_at IS NOT NULL AND purge_after <= now()
+        Index(
+            "ix_notes_orms_purge_after",
+            "purge_after",
+            postgresql_where=text("deleted_at IS NOT NULL"),
+        ),
+    )
+
     user: Mapped[str] = mapped_column(nullable=False)
 
-    title: Mapped[str] = mapped_column(unique=True, nullable=False)
-    content: Mapped[str] = mapped_column(nullable=False)
+    title: Mapped[str] = mapped_column(nullable=False)
+    # Тело заметки: текстом в content или сжатым zstd в content_zstd (ровно одно из двух).
+    # Читать через свойство content, писать через NoteBodyCodec.body_values
+    content_plain: Mapped[str | None] = mapped_column("content", nullable=True)
+    content_zstd: Mapped[bytes | None] = mapped_column(LargeBinary, nullable=True)
+    content_dict_id: Mapped[int | None] = mapped_column(
+        ForeignKey("note_compression_dicts_orms.id"), nullable=True
+    )
+    # Теги в нормализованном виде (core.schemas.normalize_tags)
+    tags: Mapped[list[str]] = mapped_column(
+        ARRAY(String), nullable=False, default=list, server_default="{}"
+    )
+    # Версия для оптимистичной блокировки и ETag; растет при любом изменении
+    version: Mapped[int] = mapped_column(nullable=False, default=1, server_default="1")
+
+    # Мягкое удаление: заметка скрыта сразу, строку удаляет фоновая очистка
+    # (core.notes_purger) не раньше purge_after, файлы вложений - outbox
+    deleted_at: Mapped[datetime | None] = mapped_column(
+        DateTime(timezone=True), nullable=True
+    )
+    purge_after: Mapped[datetime | None] = mapped_column(
+        DateTime(timezone=True), nullable=True
+    )
+
+    # tsvector для полнотекстового поиска, пишется вместе с телом (NoteBodyCodec.search_vector).
+    # В обычных выборках не загружается
+    search_vector: Mapped[str] = mapped_column(TSVECTOR, nullable=True, deferred=True)
+
+    # Превью содержимого для списков, чтобы не читать и не распаковывать тело
+    excerpt: Mapped[str] = mapped_column(nullable=False, deferred=True)
 
     created_at: Mapped[created_at]
     updated_at: Mapped[updated_at]
 
-    video_files: Mapped[List["VideoFilesOrm"]] = relationship(
-        back_populates="note",
-        cascade="all, delete-orphan",
-        lazy="selectin",
-    )
-
-    image_files: Mapped[List["ImageFilesOrm"]] = relationship(
+    attachments: Mapped[List["NoteAttachmentsOrm"]] = relationship(
         back_populates="note",
         cascade="all, delete-orphan",
         lazy="selectin",
+        order_by="NoteAttachmentsOrm.id",
     )
 
-    audio_files: Mapped[List["AudioFilesOrm"]] = relationship(
+    revisions: Mapped[List["NoteRevisionsOrm"]] = relationship(
         back_populates="note",
         cascade="all, delete-orphan",
-        lazy="selectin",
+        passive_deletes=True,
+        lazy="noload",
     )
 
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
-        if not hasattr(self, "video_files") or self.video_files is None:
-            self.video_files = []
-        if not hasattr(self, "image_files") or self.image_files is None:
-            self.image_files = []
-        if not hasattr(self, "audio_files") or self.audio_files is None:
-            self.audio_files = []
+        if not hasattr(self, "attachments") or self.attachments is None:
+            self.attachments = []
 
+    @property
+    def content(self) -> str:
+        """Тело заметки; сжатое распаковывается только при обращении"""
+        return NoteBodyCodec.decode(
+            self.content_plain, self.content_zstd, self.content_dict_id
+        )
 
-class VideoFilesOrm(Base, FileBase):
-    note_id: Mapped[int] = mapped_column(
-        ForeignKey("notes_orms.id", ondelete="CASCADE")
-    )
+    def attachments_of_kind(self, kind: str) -> List["NoteAttachmentsOrm"]:
+        return [
+            attachment for attachment in self.attachments if attachment.kind == kind
+        ]
 
-    note: Mapped["NotesOrm"] = relationship(
-        back_populates="video_files",
+    @property
+    def video_files(self) -> List["NoteAttachmentsOrm"]:
+        return self.attachments_of_kind(VIDEO_FILES_NAME)
+
+    @property
+    def image_files(self) -> List["NoteAttachmentsOrm"]:
+        return self.attachments_of_kind(IMAGE_FILES_NAME)
+
+    @property
+    def audio_files(self) -> List["NoteAttachmentsOrm"]:
+        return self.attachments_of_kind(AUDIO_FILES_NAME)
+
+
+class NoteTagCountsOrm(Base):
+    """Число заметок пользователя с тегом; меняется в тех же транзакциях, что и заметки"""
+
+    __table_args__ = (
+        # Фасет тегов пользователя и upsert счетчика: WHERE user = ? [AND tag = ?]
+        UniqueConstraint("user", "tag"),
+        CheckConstraint("count >= 0", name="count"),
     )
 
+    user: Mapped[str] = mapped_column(nullable=False)
+    tag: Mapped[str] = mapped_column(nullable=False)
+    count: Mapped[int] = mapped_column(nullable=False)
+
+
+class NoteCompressionDictsOrm(Base):
+    """Обученный словарь zstd для сжатия небольших заметок; после создания не меняется"""
+
+    data: Mapped[bytes] = mapped_column(LargeBinary, nullable=False)
+    samples: Mapped[int] = mapped_column(nullable=False)
+    created_at: Mapped[created_at]
+
+
+class NoteAttachmentsOrm(Base, FileBase):
+    """Вложение заметки; вид файла хранится в дискриминаторе kind"""
+
+    __table_args__ = (
+        # Вложения заметки и выборка по виду: WHERE note_id = ? [AND kind = ?]
+        Index("ix_note_attachments_orms_note_id_kind", "note_id", "kind"),
+        CheckConstraint(
+            "kind IN (" + ", ".join(f"'{kind}'" for kind in ATTACHMENT_KINDS) + ")",
+            name="kind",
+        ),
+    )
 
-class ImageFilesOrm(Base, FileBase):
     note_id: Mapped[int] = mapped_column(
         ForeignKey("notes_orms.id", ondelete="CASCADE")
     )
+    kind: Mapped[str] = mapped_column(String(16), nullable=False)
 
     note: Mapped["NotesOrm"] = relationship(
-        back_populates="image_files",
+        back_populates="attachments",
     )
 
 
-class AudioFilesOrm(Base, FileBase):
+class NoteRevisionsOrm(Base):
+    """Прошлая версия заметки: полный снимок или обратная дельта.
+
+    Дельта превращает содержимое следующей (более новой) версии в эту,
+    снимок хранится у каждой snapshot_interval-й ревизии заметки (seq).
+    """
+
+    __table_args__ = (
+        # История заметки и поиск цепочки до ближайшего снимка: WHERE note_id = ? AND version >= ?
+        UniqueConstraint("note_id", "version"),
+        UniqueConstraint("note_id", "seq"),
+        CheckConstraint(
+            "(is_snapshot AND content IS NOT NULL AND delta IS NULL) OR "
+            "(NOT is_snapshot AND content IS NULL AND delta IS NOT NULL)",
+            name="payload",
+        ),
+    )
+
     note_id: Mapped[int] = mapped_column(
         ForeignKey("notes_orms.id", ondelete="CASCADE")
     )
+    # Порядковый номер ревизии заметки, определяет расстановку снимков
+    seq: Mapped[int] = mapped_column(nullable=False)
+    version: Mapped[int] = mapped_column(nullable=False)
+    title: Mapped[str] = mapped_column(nullable=False)
+    is_snapshot: Mapped[bool] = mapped_column(nullable=False)
+    content: Mapped[str | None] = mapped_column(nullable=True)
+    delta: Mapped[list | None] = mapped_column(JSONB, nullable=True)
+    # Момент, когда заметка стала этой версией (updated_at на тот момент)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), nullable=False
+    )
 
     note: Mapped["NotesOrm"] = relationship(
-        back_populates="audio_files",
+        back_populates="revisions",
     )
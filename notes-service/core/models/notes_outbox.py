@@ -0,0 +1,49 @@
+from datetime import datetime
+from enum import StrEnum
+from typing import Any
+
+from sqlalchemy import DateTime, Index, String, func, text
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import Mapped, mapped_column
+
+from core.models_crud import created_at
+from .base import Base
+
+
+class NotesOutboxStatusesEnum(StrEnum):
+    PENDING = "pending"
+    # Исчерпаны попытки (settings.outbox.max_attempts); успешные сообщения удаляются
+    FAILED = "failed"
+
+
+class NotesOutboxOrm(Base):
+    """Побочный эффект в другом сервисе, записанный в транзакции изменения заметок.
+
+    Отправляет фоновый core.outbox_relay пачками, с повторами до успеха.
+    """
+
+    __table_args__ = (
+        # Очередь отправки: WHERE status = 'pending' AND available_at <= now()
+        Index(
+            "ix_notes_outbox_orms_available_at",
+            "available_at",
+            postgresql_where=text("status = 'pending'"),
+        ),
+    )
+
+    message_name: Mapped[str] = mapped_column(String, nullable=False)
+    body: Mapped[dict[str, Any]] = mapped_column(JSONB, nullable=False)
+    status: Mapped[str] = mapped_column(
+        String,
+        nullable=False,
+        default=NotesOutboxStatusesEnum.PENDING.value,
+        server_default=NotesOutboxStatusesEnum.PENDING.value,
+    )
+    # Время следующей попытки; захват сообщения сразу переносит его вперед
+    available_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), nullable=False, server_default=func.now()
+    )
+    attempts: Mapped[int] = mapped_column(nullable=False, default=0, server_default="0")
+    last_error: Mapped[str | None] = mapped_column(String, nullable=True)
+
+    created_at: Mapped[created_at]
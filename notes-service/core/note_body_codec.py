@@ -0,0 +1,103 @@
+from compression import zstd
+
+from sqlalchemy import func, literal_column
+from sqlalchemy.dialects.postgresql import to_tsvector
+
+from core.config import settings
+from utils.constants import NOTES_EXCERPT_LENGTH, NOTES_SEARCH_CONFIG
+
+
+class NoteBodyCodec:
+    """Прозрачное сжатие тел заметок zstd.
+
+    Тела длиннее порога хранятся в content_zstd вместо content. Небольшие
+    (до dict_max_body_size) сжимаются последним обученным словарем, большие -
+    без словаря. Словари неизменяемы и загружаются из БД по id.
+    Превью и tsvector считаются по исходному тексту при записи, поэтому
+    краткие списки и поиск никогда не распаковывают тела.
+    """
+
+    _dicts: dict[int, zstd.ZstdDict] = {}
+    _current_dict_id: int | None = None
+
+    @classmethod
+    def register_dict(cls, dict_id: int, data: bytes) -> None:
+        cls._dicts[dict_id] = zstd.ZstdDict(data)
+        if cls._current_dict_id is None or dict_id > cls._current_dict_id:
+            cls._current_dict_id = dict_id
+
+    @classmethod
+    def missing_dicts(cls, dict_ids) -> set[int]:
+        return {
+            dict_id
+            for dict_id in dict_ids
+            if dict_id is not None and dict_id not in cls._dicts
+        }
+
+    @classmethod
+    def compress(cls, content: str) -> tuple[bytes, int | None] | None:
+        """(сжатые байты, id словаря) или None, если тело остается текстом"""
+        data = content.encode()
+        config = settings.compression
+        if not config.enabled or len(data) < config.threshold:
+            return None
+
+        dict_id = (
+            cls._current_dict_id if len(data) <= config.dict_max_body_size else None
+        )
+        compressed = zstd.compress(
+            data,
+            level=config.level,
+            zstd_dict=cls._dicts[dict_id] if dict_id is not None else None,
+        )
+        if len(compressed) >= len(data):
+            return None
+        return compressed, dict_id
+
+    @classmethod
+    def decompress(cls, compressed: bytes, dict_id: int | None) -> str:
+        zstd_dict = None
+        if dict_id is not None:
+            try:
+                zstd_dict = cls._dicts[dict_id]
+            except KeyError:
+                raise LookupError(f"Словарь zstd {dict_id} не загружен") from None
+        return zstd.decompress(compressed, zstd_dict=zstd_dict).decode()
+
+    @classmethod
+    def decode(
+        cls, content: str | None, compressed: bytes | None, dict_id: int | None
+    ) -> str:
+        """Тело заметки из колонок content / content_zstd + content_dict_id"""
+        if compressed is None:
+            return content
+        return cls.decompress(compressed, dict_id)
+
+    @classmethod
+    def body_values(cls, content: str) -> dict:
+        """Значения колонок тела для ORM insert/update (ключи - атрибуты NotesOrm)"""
+        values = {"excerpt": content[:NOTES_EXCERPT_LENGTH]}
+        packed = cls.compress(content)
+        if packed is None:
+            values.update(
+                content_plain=content, content_zstd=None, content_dict_id=None
+            )
+        else:
+            compressed, dict_id = packed
+            values.update(
+                content_plain=None, content_zstd=compressed, content_dict_id=dict_id
+            )
+        return values
+
+    @staticmethod
+    def search_vector(title, content):
+        """tsvector заметки: заголовок с весом A, содержимое с весом B"""
+        return func.setweight(
+            to_tsvector(NOTES_SEARCH_CONFIG, func.coalesce(title, "")),
+            literal_column("'A'"),
+        ).op("||")(
+            func.setweight(
+                to_tsvector(NOTES_SEARCH_CONFIG, func.coalesce(content, "")),
+                literal_column("'B'"),
+            )
+        )
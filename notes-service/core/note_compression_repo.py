@@ -0,0 +1,180 @@
+from typing import Iterable
+
+from sqlalchemy import bindparam, func, select, update
+from sqlalchemy.exc import SQLAlchemyError
+
+from core.config import settings
+from core.models import db_helper, NoteCompressionDictsOrm, NotesOrm
+from core.note_body_codec import NoteBodyCodec
+
+from exceptions.exceptions import RepositoryInternalError
+
+from utils.logging import logger
+
+
+class NoteCompressionRepo:
+    """Словари zstd и фоновое сжатие / распаковка тел заметок"""
+
+    @staticmethod
+    async def load_dicts() -> None:
+        """Загрузка всех словарей при старте сервиса"""
+        try:
+            async with db_helper.session_factory() as session:
+                result = await session.execute(
+                    select(NoteCompressionDictsOrm.id, NoteCompressionDictsOrm.data)
+                )
+                dicts = result.all()
+        except SQLAlchemyError as e:
+            logger.exception(f"Ошибка базы данных при загрузке словарей zstd: {e}")
+            raise RepositoryInternalError(
+                "Не удалось загрузить словари сжатия из-за ошибки базы данных."
+            ) from e
+
+        for dict_id, data in dicts:
+            NoteBodyCodec.register_dict(dict_id, data)
+        logger.info(f"Загружено словарей zstd: {len(dicts)}")
+
+    @staticmethod
+    async def ensure_dicts(dict_ids: Iterable[int | None]) -> None:
+        """Дозагрузка словарей, обученных после старта процесса; без запроса, если все известны"""
+        missing = NoteBodyCodec.missing_dicts(dict_ids)
+        if not missing:
+            return
+        try:
+            async with db_helper.session_factory() as session:
+                result = await session.execute(
+                    select(
+                        NoteCompressionDictsOrm.id, NoteCompressionDictsOrm.data
+                    ).where(NoteCompressionDictsOrm.id.in_(missing))
+                )
+                for dict_id, data in result.all():
+                    NoteBodyCodec.register_dict(dict_id, data)
+        except SQLAlchemyError as e:
+            logger.exception(f"Ошибка базы данных при загрузке словарей {missing}: {e}")
+            raise RepositoryInternalError(
+                "Не удалось загрузить словари сжатия из-за ошибки базы данных."
+            ) from e
+
+    @staticmethod
+    async def sample_bodies(limit: int) -> list[str]:
+        """Случайные несжатые тела небольших заметок - образцы для обучения словаря"""
+        async with db_helper.session_factory() as session:
+            result = await session.scalars(
+                select(NotesOrm.content_plain)
+                .where(NotesOrm.content_plain.is_not(None))
+                .where(NotesOrm.deleted_at.is_(None))
+                .where(
+                    func.octet_length(NotesOrm.content_plain)
+                    <= settings.compression.dict_max_body_size
+                )
+                .order_by(func.random())
+                .limit(limit)
+            )
+            return list(result.all())
+
+    @staticmethod
+    async def create_dict(data: bytes, samples: int) -> int:
+        async with db_helper.session_factory() as session:
+            zstd_dict = NoteCompressionDictsOrm(data=data, samples=samples)
+            session.add(zstd_dict)
+            await session.commit()
+            NoteBodyCodec.register_dict(zstd_dict.id, data)
+            return zstd_dict.id
+
+    @staticmethod
+    async def _rewrite_bodies(rows: list[dict]) -> None:
+        """Пакетная перезапись колонок тела без смены версии и updated_at.
+
+        Строка пропускается, если ее успели изменить (version отличается).
+        """
+        notes_table = NotesOrm.__table__
+        stmt = (
+            update(notes_table)
+            .where(notes_table.c.id == bindparam("b_id"))
+            .where(notes_table.c.version == bindparam("b_version"))
+            .values(
+                content=bindparam("b_content"),
+                content_zstd=bindparam("b_content_zstd"),
+                content_dict_id=bindparam("b_content_dict_id"),
+                updated_at=notes_table.c.updated_at,
+            )
+        )
+        async with db_helper.session_factory() as session:
+            await session.execute(stmt, rows)
+            await session.commit()
+
+    @staticmethod
+    async def compress_batch(after: int, limit: int) -> tuple[int | None, int]:
+        """Сжатие пачки несжатых тел выше порога; (последний id или None, сжато строк)"""
+        async with db_helper.session_factory() as session:
+            result = await session.execute(
+                select(NotesOrm.id, NotesOrm.version, NotesOrm.content_plain)
+                .where(NotesOrm.id > after)
+                .where(NotesOrm.content_plain.is_not(None))
+                .where(
+                    func.octet_length(NotesOrm.content_plain)
+                    >= settings.compression.threshold
+                )
+                # Удаленные заметки скоро очистит фоновая задача, сжимать их незачем
+                .where(NotesOrm.deleted_at.is_(None))
+                .order_by(NotesOrm.id)
+                .limit(limit)
+            )
+            notes = result.all()
+        if not notes:
+            return None, 0
+
+        rows = []
+        for note_id, version, content in notes:
+            packed = NoteBodyCodec.compress(content)
+            if packed is None:
+                continue
+            compressed, dict_id = packed
+            rows.append(
+                {
+                    "b_id": note_id,
+                    "b_version": version,
+                    "b_content": None,
+                    "b_content_zstd": compressed,
+                    "b_content_dict_id": dict_id,
+                }
+            )
+        if rows:
+            await NoteCompressionRepo._rewrite_bodies(rows)
+        return notes[-1].id, len(rows)
+
+    @staticmethod
+    async def decompress_batch(after: int, limit: int) -> tuple[int | None, int]:
+        """Распаковка пачки сжатых тел обратно в текст; (последний id или None, строк)"""
+        async with db_helper.session_factory() as session:
+            result = await session.execute(
+                select(
+                    NotesOrm.id,
+                    NotesOrm.version,
+                    NotesOrm.content_zstd,
+                    NotesOrm.content_dict_id,
+                )
+                .where(NotesOrm.id > after)
+                .where(NotesOrm.content_zstd.is_not(None))
+                .order_by(NotesOrm.id)
+                .limit(limit)
+            )
+            notes = result.all()
+        if not notes:
+            return None, 0
+
+        await NoteCompressionRepo.ensure_dicts(note.content_dict_id for note in notes)
+        rows = [
+            {
+                "b_id": note.id,
+                "b_version": note.version,
+                "b_content": NoteBodyCodec.decompress(
+                    note.content_zstd, note.content_dict_id
+                ),
+                "b_content_zstd": None,
+                "b_content_dict_id": None,
+            }
+            for note in notes
+        ]
+        await NoteCompressionRepo._rewrite_bodies(rows)
+        return notes[-1].id, len(rows)
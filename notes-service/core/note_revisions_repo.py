@@ -0,0 +1,198 @@
+from datetime import datetime
+from typing import Sequence
+
+from sqlalchemy import Row, func, select
+from sqlalchemy.exc import SQLAlchemyError
+
+from core.config import settings
+from core.models import db_helper, NoteRevisionsOrm, NotesOrm
+from core.note_body_codec import NoteBodyCodec
+from core.note_compression_repo import NoteCompressionRepo
+from core.schemas import NoteRevisionContentRead
+
+from exceptions.exceptions import NoteNotFoundError, RepositoryInternalError
+
+from utils.logging import logger
+from utils.text_delta import apply_delta, delta_size, make_delta
+
+
+class NoteRevisionsRepo:
+    """История версий заметок: снимки каждой snapshot_interval-й ревизии и обратные дельты.
+
+    Текущая версия живет в notes_orms, в истории - только замененные версии.
+    Восстановление идет от ближайшего более нового снимка (или текущей заметки)
+    назад по дельтам, поэтому применяется не больше snapshot_interval дельт.
+    """
+
+    @staticmethod
+    def build_revision(
+        note_id: int,
+        seq: int,
+        version: int,
+        title: str,
+        content: str,
+        created_at: datetime,
+        newer_content: str,
+    ) -> NoteRevisionsOrm:
+        """Ревизия замененной версии; newer_content - содержимое версии, сменившей ее"""
+        revision = NoteRevisionsOrm(
+            note_id=note_id,
+            seq=seq,
+            version=version,
+            title=title,
+            created_at=created_at,
+        )
+        if seq % settings.revisions.snapshot_interval == 0:
+            revision.is_snapshot, revision.content = True, content
+            return revision
+
+        delta = make_delta(newer_content, content)
+        # Дельта не меньше самого текста - дешевле хранить снимок
+        if delta_size(delta) >= len(content):
+            revision.is_snapshot, revision.content = True, content
+        else:
+            revision.is_snapshot, revision.delta = False, delta
+        return revision
+
+    @staticmethod
+    def restore_content(current_content: str, chain: Sequence[NoteRevisionsOrm]) -> str:
+        """Содержимое последней ревизии цепочки.
+
+        chain - ревизии от ближайшего снимка (или версии, замененной текущей
+        заметкой) вниз до нужной версии, от новых к старым.
+        """
+        content = current_content
+        for revision in chain:
+            content = (
+                revision.content
+                if revision.is_snapshot
+                else apply_delta(content, revision.delta)
+            )
+        return content
+
+    @staticmethod
+    async def list_revisions(
+        note_id: int,
+        username: str,
+        limit: int,
+        before: int | None = None,
+    ) -> tuple[int, list[Row]]:
+        """Текущая версия заметки и ее ревизии от новых к старым (keyset по version)"""
+        try:
+            async with db_helper.read_session_factory() as session:
+                current_version = await session.scalar(
+                    select(NotesOrm.version)
+                    .where(NotesOrm.id == note_id)
+                    .where(NotesOrm.user == username)
+                    .where(NotesOrm.deleted_at.is_(None))
+                )
+                if current_version is None:
+                    raise NoteNotFoundError(f"Заметка {note_id} не найдена")
+
+                stmt = (
+                    select(
+                        NoteRevisionsOrm.version,
+                        NoteRevisionsOrm.title,
+                        NoteRevisionsOrm.is_snapshot,
+                        NoteRevisionsOrm.created_at,
+                    )
+                    .where(NoteRevisionsOrm.note_id == note_id)
+                    .order_by(NoteRevisionsOrm.version.desc())
+                    .limit(limit)
+                )
+                if before is not None:
+                    stmt = stmt.where(NoteRevisionsOrm.version < before)
+                result = await session.execute(stmt)
+                return current_version, list(result.all())
+        except NoteNotFoundError:
+            raise
+        except SQLAlchemyError as e:
+            logger.exception(
+                f"Ошибка базы данных при получении истории заметки {note_id}: {e}"
+            )
+            raise RepositoryInternalError(
+                f"Не удалось получить историю заметки {note_id} из-за ошибки базы данных."
+            ) from e
+
+    @staticmethod
+    async def get_revision(
+        note_id: int, username: str, version: int
+    ) -> NoteRevisionContentRead:
+        """Восстановление версии заметки: ближайший снимок не старше нее и дельты до нее"""
+        try:
+            async with db_helper.read_session_factory() as session:
+                note = (
+                    await session.execute(
+                        select(
+                            NotesOrm.title,
+                            NotesOrm.content_plain,
+                            NotesOrm.content_zstd,
+                            NotesOrm.content_dict_id,
+                            NotesOrm.version,
+                            NotesOrm.updated_at,
+                        )
+                        .where(NotesOrm.id == note_id)
+                        .where(NotesOrm.user == username)
+                        .where(NotesOrm.deleted_at.is_(None))
+                    )
+                ).one_or_none()
+                if note is None:
+                    raise NoteNotFoundError(f"Заметка {note_id} не найдена")
+                await NoteCompressionRepo.ensure_dicts((note.content_dict_id,))
+                current_content = NoteBodyCodec.decode(
+                    note.content_plain, note.content_zstd, note.content_dict_id
+                )
+                if version == note.version:
+                    return NoteRevisionContentRead(
+                        note_id=note_id,
+                        version=note.version,
+                        title=note.title,
+                        content=current_content,
+                        created_at=note.updated_at,
+                    )
+
+                snapshot_version = (
+                    select(func.min(NoteRevisionsOrm.version))
+                    .where(NoteRevisionsOrm.note_id == note_id)
+                    .where(NoteRevisionsOrm.version >= version)
+                    .where(NoteRevisionsOrm.is_snapshot)
+                    .correlate(None)
+                    .scalar_subquery()
+                )
+                # Цепочка от ближайшего снимка (если его нет - от текущей заметки) вниз до version
+                stmt = (
+                    select(NoteRevisionsOrm)
+                    .where(NoteRevisionsOrm.note_id == note_id)
+                    .where(NoteRevisionsOrm.version >= version)
+                    .where(
+                        NoteRevisionsOrm.version
+                        <= func.coalesce(snapshot_version, note.version)
+                    )
+                    .order_by(NoteRevisionsOrm.version.desc())
+                )
+                chain = list(await session.scalars(stmt))
+        except NoteNotFoundError:
+            raise
+        except SQLAlchemyError as e:
+            logger.exception(
+                f"Ошибка базы данных при получении версии {version} заметки {note_id}: {e}"
+            )
+            raise RepositoryInternalError(
+                f"Не удалось получить версию заметки {note_id} из-за ошибки базы данных."
+            ) from e
+
+        if not chain or chain[-1].version != version:
+            raise NoteNotFoundError(f"Версия {version} заметки {note_id} не найдена")
+
+        content = NoteRevisionsRepo.restore_content(current_content, chain)
+        target = chain[-1]
+        logger.debug(
+            f"Версия {version} заметки {note_id} восстановлена по {len(chain)} ревизиям"
+        )
+        return NoteRevisionContentRead(
+            note_id=note_id,
+            version=target.version,
+            title=target.title,
+            content=content,
+            created_at=target.created_at,
+        )
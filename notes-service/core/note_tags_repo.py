@@ -0,0 +1,78 @@
+from typing import Iterable, Sequence
+
+from sqlalchemy import Row, delete, select, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.models import db_helper, NoteTagCountsOrm
+
+from exceptions.exceptions import RepositoryInternalError
+
+from utils.logging import logger
+
+
+class NoteTagsRepo:
+    """Счетчики тегов пользователя для фасета.
+
+    Счетчики меняются инкрементально в транзакции изменения заметок, поэтому
+    фасет - чтение нескольких строк без агрегации по заметкам.
+    """
+
+    @staticmethod
+    async def apply_delta(
+        session: AsyncSession,
+        username: str,
+        added: Iterable[str] = (),
+        removed: Iterable[str] = (),
+    ) -> None:
+        """Изменение счетчиков в текущей транзакции: +1 за добавленный тег, -1 за снятый.
+
+        Теги сортируются, чтобы конкурентные транзакции блокировали строки в одном порядке.
+        """
+        added, removed = sorted(set(added)), sorted(set(removed))
+        if added:
+            stmt = insert(NoteTagCountsOrm).values(
+                [{"user": username, "tag": tag, "count": 1} for tag in added]
+            )
+            await session.execute(
+                stmt.on_conflict_do_update(
+                    index_elements=["user", "tag"],
+                    set_={"count": NoteTagCountsOrm.count + 1},
+                )
+            )
+        if removed:
+            tag_counts = (
+                NoteTagCountsOrm.user == username,
+                NoteTagCountsOrm.tag.in_(removed),
+            )
+            await session.execute(
+                update(NoteTagCountsOrm)
+                .where(*tag_counts)
+                .values(count=NoteTagCountsOrm.count - 1)
+            )
+            await session.execute(
+                delete(NoteTagCountsOrm)
+                .where(*tag_counts)
+                .where(NoteTagCountsOrm.count <= 0)
+            )
+
+    @staticmethod
+    async def get_tag_counts(username: str, limit: int) -> Sequence[Row]:
+        """Теги пользователя по убыванию числа заметок"""
+        try:
+            async with db_helper.read_session_factory() as session:
+                result = await session.execute(
+                    select(NoteTagCountsOrm.tag, NoteTagCountsOrm.count)
+                    .where(NoteTagCountsOrm.user == username)
+                    .order_by(NoteTagCountsOrm.count.desc(), NoteTagCountsOrm.tag)
+                    .limit(limit)
+                )
+                return result.all()
+        except SQLAlchemyError as e:
+            logger.exception(
+                f"Ошибка базы данных при получении тегов пользоваетеля {username!r}: {e}"
+            )
+            raise RepositoryInternalError(
+                "Не удалось получить теги из-за ошибки базы данных."
+            ) from e
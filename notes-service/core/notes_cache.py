@@ -0,0 +1,246 @@
+import asyncio
+import time
+from typing import Any, Awaitable, Callable
+
+import orjson
+from prometheus_client import Counter
+from redis.exceptions import RedisError
+
+from core.app_redis.client import get_redis_client
+from core.config import settings
+
+from utils.logging import logger
+from utils.read_your_writes import read_from_primary
+
+NOTE_KEY = "notes:note:{note_id}"
+LIST_KEY = "notes:list:{username}:v{version}:{view}:{limit}:{after}:{tags}"
+LIST_VERSION_KEY = "notes:list_version:{username}"
+LOCK_SUFFIX = ":lock"
+
+cache_requests_total = Counter(
+    "notes_cache_requests_total",
+    "Обращения к кэшу чтения заметок",
+    ["cache", "result"],
+)
+
+
+class NotesCache:
+    """Read-through кэш заметок в Redis.
+
+    Заметка кэшируется по id (владелец проверяется по полю user в payload),
+    страницы списков - по пользователю и версии, которую инкрементирует любая
+    запись. Промах защищен от stampede: в процессе запросы к одному ключу
+    объединяются, между процессами ключ заполняет только владелец блокировки.
+    """
+
+    _inflight: dict[str, asyncio.Future] = {}
+
+    @staticmethod
+    def note_key(note_id: int) -> str:
+        return NOTE_KEY.format(note_id=note_id)
+
+    @staticmethod
+    async def list_version(username: str) -> int | None:
+        """Версия списков пользователя для ETag коллекции; None - Redis недоступен.
+
+        Отсутствующая версия (новый пользователь, сброс после неудачного
+        инкремента, истечение list_version_ttl, потеря данных Redis)
+        засевается текущим временем, чтобы не совпасть с выданными ранее ETag.
+        """
+        key = LIST_VERSION_KEY.format(username=username)
+        try:
+            redis = await get_redis_client()
+            version = await redis.get(key)
+            if version is None:
+                await redis.set(
+                    key, time.time_ns(), nx=True, ex=settings.cache.list_version_ttl
+                )
+                version = await redis.get(key)
+        except RedisError as e:
+            logger.warning(f"Не удалось получить версию списков {username!r}: {e}")
+            return None
+        return int(version) if version is not None else None
+
+    @staticmethod
+    async def list_key(
+        username: str,
+        limit: int,
+        after: int | None,
+        view: str = "full",
+        tags_filter: str = "",
+    ) -> str | None:
+        """Ключ страницы списка с текущей версией; None - кэш недоступен"""
+        if not settings.cache.enabled:
+            return None
+        try:
+            redis = await get_redis_client()
+            version = await redis.get(LIST_VERSION_KEY.format(username=username))
+        except RedisError as e:
+            logger.warning(f"Не удалось получить версию списков {username!r}: {e}")
+            return None
+        return LIST_KEY.format(
+            username=username,
+            version=version or 0,
+            view=view,
+            limit=limit,
+            after=after or 0,
+            tags=tags_filter,
+        )
+
+    @classmethod
+    async def read_through(
+        cls,
+        key: str | None,
+        cache_name: str,
+        ttl: int,
+        loader: Callable[[], Awaitable[Any]],
+    ) -> Any:
+        """Возвращает значение из кэша или загружает его через loader и кэширует.
+
+        Значение None не кэшируется. При выключенном кэше и недоступности Redis
+        loader читает как обычно (с реплики). Заполнение кэша читает с primary:
+        отстающая реплика не должна попасть в кэш на ttl и в ответ с ETag по
+        версии списков.
+        """
+        if key is None or not settings.cache.enabled:
+            return await loader()
+
+        try:
+            redis = await get_redis_client()
+            cached = await redis.get(key)
+        except RedisError as e:
+            logger.warning(f"Redis недоступен, чтение {key!r} мимо кэша: {e}")
+            cache_requests_total.labels(cache=cache_name, result="error").inc()
+            return await loader()
+
+        if cached is not None:
+            cache_requests_total.labels(cache=cache_name, result="hit").inc()
+            return orjson.loads(cached)
+
+        cache_requests_total.labels(cache=cache_name, result="miss").inc()
+
+        inflight = cls._inflight.get(key)
+        if inflight is not None:
+            return await asyncio.shield(inflight)
+
+        future = asyncio.get_running_loop().create_future()
+        cls._inflight[key] = future
+        try:
+            value = await cls._fill(key, ttl, loader)
+            future.set_result(value)
+            return value
+        except BaseException as e:
+            future.set_exception(e)
+            # Помечаем исключение как полученное, если ожидающих нет
+            future.exception()
+            raise
+        finally:
+            cls._inflight.pop(key, None)
+
+    @staticmethod
+    def _from_primary(
+        loader: Callable[[], Awaitable[Any]],
+    ) -> Callable[[], Awaitable[Any]]:
+        async def load() -> Any:
+            with read_from_primary():
+                return await loader()
+
+        return load
+
+    @classmethod
+    async def _fill(
+        cls, key: str, ttl: int, loader: Callable[[], Awaitable[Any]]
+    ) -> Any:
+        redis = await get_redis_client()
+        lock_key = key + LOCK_SUFFIX
+
+        try:
+            acquired = await redis.set(
+                lock_key, "1", nx=True, px=settings.cache.lock_ttl_ms
+            )
+        except RedisError as e:
+            logger.warning(f"Не удалось взять блокировку {lock_key!r}: {e}")
+            return await loader()
+
+        if not acquired:
+            # Ключ уже заполняет другой процесс - ждем его результат ограниченное время
+            deadline = time.monotonic() + settings.cache.lock_wait
+            while time.monotonic() < deadline:
+                await asyncio.sleep(settings.cache.lock_poll_interval)
+                try:
+                    cached = await redis.get(key)
+                except RedisError:
+                    break
+                if cached is not None:
+                    return orjson.loads(cached)
+
+        try:
+            value = await cls._from_primary(loader)()
+            if value is not None:
+                try:
+                    await redis.set(key, orjson.dumps(value), ex=ttl)
+                except RedisError as e:
+                    logger.warning(f"Не удалось сохранить {key!r} в кэш: {e}")
+            return value
+        finally:
+            if acquired:
+                try:
+                    await redis.delete(lock_key)
+                except RedisError:
+                    pass
+
+    @staticmethod
+    def _bump_list_version(pipe, username: str) -> None:
+        version_key = LIST_VERSION_KEY.format(username=username)
+        pipe.set(
+            version_key, time.time_ns(), nx=True, ex=settings.cache.list_version_ttl
+        )
+        pipe.incr(version_key)
+
+    @staticmethod
+    async def _drop_list_version(username: str) -> None:
+        """Удаление версии после неудачного инкремента.
+
+        Версия - ETag коллекции: без сброса клиенты получали бы 304 на
+        устаревший список до следующей записи. Новая версия засевается временем
+        при следующем чтении; если не удалось и удаление, устаревание
+        ограничено list_version_ttl.
+        """
+        try:
+            redis = await get_redis_client()
+            await redis.delete(LIST_VERSION_KEY.format(username=username))
+        except RedisError as e:
+            logger.error(
+                f"Не удалось сбросить версию списков {username!r}, ETag коллекции "
+                f"устареет до {settings.cache.list_version_ttl} с: {e}"
+            )
+
+    @staticmethod
+    async def invalidate_note(note_id: int, username: str | None = None) -> None:
+        """Сбрасывает заметку и, если известен владелец, все его страницы списков"""
+        try:
+            redis = await get_redis_client()
+            async with redis.pipeline(transaction=False) as pipe:
+                pipe.delete(NOTE_KEY.format(note_id=note_id))
+                if username is not None:
+                    NotesCache._bump_list_version(pipe, username)
+                await pipe.execute()
+            logger.debug(f"Кэш заметки {note_id} сброшен")
+        except RedisError as e:
+            logger.warning(f"Не удалось сбросить кэш заметки {note_id}: {e}")
+            if username is not None:
+                await NotesCache._drop_list_version(username)
+
+    @staticmethod
+    async def invalidate_user_lists(username: str) -> None:
+        try:
+            redis = await get_redis_client()
+            async with redis.pipeline(transaction=False) as pipe:
+                NotesCache._bump_list_version(pipe, username)
+                await pipe.execute()
+            logger.debug(f"Кэш списков заметок пользователя {username!r} сброшен")
+        except RedisError as e:
+            logger.warning(
+                f"Не удалось сбросить кэш списков пользователя {username!r}: {e}"
+            )
+            await NotesCache._drop_list_version(username)
@@ -0,0 +1,133 @@
+from typing import Any, Sequence
+
+from sqlalchemy import Row, bindparam, case, delete, func, insert, select, update
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.config import settings
+from core.models import db_helper, NotesOutboxOrm, NotesOutboxStatusesEnum
+
+from exceptions.exceptions import RepositoryInternalError
+
+from utils.logging import logger
+
+# Удаление файлов в media-service; body: {"file_uuids": [...]}
+DELETE_MEDIA = "delete_media"
+
+
+class NotesOutboxRepo:
+    """Outbox notes-service: сообщения пишутся в транзакции изменения заметок"""
+
+    @staticmethod
+    async def enqueue(
+        session: AsyncSession, message_name: str, body: dict[str, Any]
+    ) -> None:
+        """Сообщение в текущей транзакции: отправится, только если она зафиксирована"""
+        await session.execute(
+            insert(NotesOutboxOrm).values(message_name=message_name, body=body)
+        )
+
+    @staticmethod
+    async def add(message_name: str, body: dict[str, Any]) -> None:
+        """Сообщение отдельной транзакцией, когда изменения заметок нет (компенсация)"""
+        try:
+            async with db_helper.session_factory() as session:
+                await NotesOutboxRepo.enqueue(session, message_name, body)
+                await session.commit()
+        except SQLAlchemyError as e:
+            logger.exception(
+                f"Ошибка базы данных при записи в outbox {message_name}: {e}"
+            )
+            raise RepositoryInternalError(
+                "Не удалось записать сообщение outbox из-за ошибки базы данных."
+            ) from e
+
+    @staticmethod
+    async def claim_batch(limit: int) -> Sequence[Row]:
+        """Захват пачки сообщений, чье время наступило: (id, message_name, body, attempts).
+
+        Захват сразу переносит available_at на время следующей попытки
+        (экспоненциально растущая задержка), поэтому неотправленное сообщение,
+        в том числе после падения процесса, вернется в очередь само. SKIP
+        LOCKED позволяет нескольким экземплярам сервиса разбирать очередь
+        параллельно.
+        """
+        due = (
+            select(NotesOutboxOrm.id)
+            .where(NotesOutboxOrm.status == NotesOutboxStatusesEnum.PENDING.value)
+            .where(NotesOutboxOrm.available_at <= func.now())
+            .order_by(NotesOutboxOrm.available_at)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+            .cte("due_messages")
+        )
+        retry_delay = func.least(
+            settings.outbox.retry_base_delay * func.power(2, NotesOutboxOrm.attempts),
+            settings.outbox.retry_max_delay,
+        )
+        try:
+            async with db_helper.session_factory() as session:
+                result = await session.execute(
+                    update(NotesOutboxOrm)
+                    .where(NotesOutboxOrm.id == due.c.id)
+                    .values(
+                        attempts=NotesOutboxOrm.attempts + 1,
+                        available_at=func.now()
+                        + func.make_interval(0, 0, 0, 0, 0, 0, retry_delay),
+                    )
+                    .returning(
+                        NotesOutboxOrm.id,
+                        NotesOutboxOrm.message_name,
+                        NotesOutboxOrm.body,
+                        NotesOutboxOrm.attempts,
+                    )
+                )
+                messages = result.all()
+                await session.commit()
+                return messages
+        except SQLAlchemyError as e:
+            logger.exception(f"Ошибка базы данных при захвате сообщений outbox: {e}")
+            raise RepositoryInternalError(
+                "Не удалось получить сообщения outbox из-за ошибки базы данных."
+            ) from e
+
+    @staticmethod
+    async def complete(delivered: list[int], errors: dict[int, str]) -> None:
+        """Отправленные сообщения удаляются, у неотправленных сохраняется ошибка.
+
+        Сообщение, исчерпавшее settings.outbox.max_attempts, получает статус failed
+        и больше не отправляется.
+        """
+        outbox_table = NotesOutboxOrm.__table__
+        try:
+            async with db_helper.session_factory() as session:
+                if delivered:
+                    await session.execute(
+                        delete(outbox_table).where(outbox_table.c.id.in_(delivered))
+                    )
+                if errors:
+                    await session.execute(
+                        update(outbox_table)
+                        .where(outbox_table.c.id == bindparam("b_id"))
+                        .values(
+                            last_error=bindparam("b_error"),
+                            status=case(
+                                (
+                                    outbox_table.c.attempts
+                                    >= settings.outbox.max_attempts,
+                                    NotesOutboxStatusesEnum.FAILED.value,
+                                ),
+                                else_=outbox_table.c.status,
+                            ),
+                        ),
+                        [
+                            {"b_id": message_id, "b_error": error}
+                            for message_id, error in errors.items()
+                        ],
+                    )
+                await session.commit()
+        except SQLAlchemyError as e:
+            logger.exception(f"Ошибка базы данных при фиксации отправки outbox: {e}")
+            raise RepositoryInternalError(
+                "Не удалось сохранить результат отправки outbox из-за ошибки базы данных."
+            ) from e
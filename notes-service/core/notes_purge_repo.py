@@ -0,0 +1,61 @@
+from sqlalchemy import delete, func, select
+from sqlalchemy.exc import SQLAlchemyError
+
+from core.models import db_helper, NoteAttachmentsOrm, NotesOrm
+from core.notes_outbox_repo import DELETE_MEDIA, NotesOutboxRepo
+
+from exceptions.exceptions import RepositoryInternalError
+
+from utils.logging import logger
+
+
+class NotesPurgeRepo:
+    """Очередь очистки мягко удаленных заметок (deleted_at IS NOT NULL)"""
+
+    @staticmethod
+    async def purge_batch(limit: int) -> tuple[int, int]:
+        """Окончательное удаление пачки заметок, чей purge_after наступил.
+
+        В одной транзакции UUID вложений пачки пишутся в outbox сообщением
+        delete_media, а строки заметок удаляются (вложения и ревизии
+        каскадно): файлы удалит core.outbox_relay, и ни один не потеряется.
+        SKIP LOCKED позволяет нескольким экземплярам сервиса очищать
+        параллельно. Возвращает (заметок, файлов).
+        """
+        try:
+            async with db_helper.session_factory() as session:
+                note_ids = list(
+                    (
+                        await session.scalars(
+                            select(NotesOrm.id)
+                            .where(NotesOrm.deleted_at.is_not(None))
+                            .where(NotesOrm.purge_after <= func.now())
+                            .order_by(NotesOrm.purge_after)
+                            .limit(limit)
+                            .with_for_update(skip_locked=True)
+                        )
+                    ).all()
+                )
+                if not note_ids:
+                    return 0, 0
+
+                file_uuids = [
+                    str(file_uuid)
+                    for file_uuid in await session.scalars(
+                        select(NoteAttachmentsOrm.uuid).where(
+                            NoteAttachmentsOrm.note_id.in_(note_ids)
+                        )
+                    )
+                ]
+                if file_uuids:
+                    await NotesOutboxRepo.enqueue(
+                        session, DELETE_MEDIA, {"file_uuids": file_uuids}
+                    )
+                await session.execute(delete(NotesOrm).where(NotesOrm.id.in_(note_ids)))
+                await session.commit()
+                return len(note_ids), len(file_uuids)
+        except SQLAlchemyError as e:
+            logger.exception(f"Ошибка базы данных при очистке заметок: {e}")
+            raise RepositoryInternalError(
+                "Не удалось очистить заметки из-за ошибки базы данных."
+            ) from e
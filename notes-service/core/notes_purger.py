@@ -0,0 +1,42 @@
+import asyncio
+
+from prometheus_client import Counter
+
+from core.config import settings
+from core.notes_purge_repo import NotesPurgeRepo
+
+from utils.logging import logger
+
+notes_purged = Counter(
+    "notes_purged_total",
+    "Окончательно удаленные мягко удаленные заметки",
+)
+
+
+class NotesPurger:
+    """Фоновая очистка мягко удаленных заметок.
+
+    Очистка не обращается к media-service: файлы удаленных заметок уходят
+    в outbox и удаляются core.outbox_relay с повторами.
+    """
+
+    @staticmethod
+    async def purge_batch() -> int:
+        """Одна пачка очистки; возвращает число удаленных заметок"""
+        purged, files = await NotesPurgeRepo.purge_batch(settings.purge.batch_size)
+        if purged:
+            notes_purged.inc(purged)
+            logger.info(f"Очистка: удалено заметок {purged}, файлов в outbox {files}")
+        return purged
+
+    @staticmethod
+    async def run(interval: float) -> None:
+        """Очистка в цикле: полные пачки подряд, затем ожидание interval секунд"""
+        while True:
+            try:
+                purged = await NotesPurger.purge_batch()
+            except Exception as e:
+                logger.exception(f"Ошибка фоновой очистки заметок: {e}")
+                purged = 0
+            if purged < settings.purge.batch_size:
+                await asyncio.sleep(interval)
@@ -1,33 +1,179 @@
-from typing import Sequence, NoReturn
+from datetime import timedelta
+from typing import AsyncIterator, Sequence
 
-from sqlalchemy import or_, select
-from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy import (
+    Integer,
+    Row,
+    String,
+    bindparam,
+    column,
+    func,
+    literal,
+    or_,
+    select,
+    table,
+    text,
+    tuple_,
+    update,
+)
+from sqlalchemy.dialects.postgresql import insert, ts_headline, websearch_to_tsquery
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
+from sqlalchemy.orm import noload
 
-from core.models import db_helper, NotesOrm
-from core.schemas import NoteCreate, NoteDelete
+from core.config import settings
+from core.models import db_helper, NoteRevisionsOrm, NotesOrm
+from core.note_body_codec import NoteBodyCodec
+from core.note_compression_repo import NoteCompressionRepo
+from core.note_revisions_repo import NoteRevisionsRepo
+from core.note_tags_repo import NoteTagsRepo
+from core.notes_cache import NotesCache
+from core.schemas import (
+    NoteCreate,
+    NoteTagsMode,
+    NoteUpdate,
+    NoteView,
+)
 
+from exceptions.base import BaseAPIException
 from exceptions.exceptions import (
-    DeleteNoteError,
     NoteNotFoundError,
     NoteAlreadyExistsError,
+    NoteVersionConflictError,
     RepositoryInternalError,
 )
 
+from utils.constants import (
+    NOTES_EXCERPT_LENGTH,
+    NOTES_IMPORT_STAGING_TABLE,
+    NOTES_SEARCH_CONFIG,
+    NOTES_SEARCH_HEADLINE_OPTIONS,
+)
 from utils.logging import logger
 
 
 class NotesRepo:
+    # Колонки краткого представления: без content и без загрузки вложений
+    SUMMARY_COLUMNS = (
+        NotesOrm.id,
+        NotesOrm.title,
+        NotesOrm.excerpt,
+        NotesOrm.tags,
+        NotesOrm.version,
+        NotesOrm.created_at,
+        NotesOrm.updated_at,
+    )
+
+    # Горячие запросы собираются один раз на bindparam: выражение не строится
+    # на каждый вызов, а текст SQL постоянен и попадает в кэш подготовленных
+    # выражений asyncpg (db.prepared_statement_cache_size)
+    GET_NOTE_STMT = (
+        select(NotesOrm)
+        .where(NotesOrm.id == bindparam("note_id"))
+        .where(NotesOrm.user == bindparam("username"))
+        .where(NotesOrm.deleted_at.is_(None))
+    )
+    # after=0 - с начала (id начинаются с 1), limit=None - LIMIT NULL, без ограничения
+    USER_NOTES_STMT = (
+        select(NotesOrm)
+        .where(NotesOrm.user == bindparam("username"))
+        .where(NotesOrm.deleted_at.is_(None))
+        .where(NotesOrm.id > bindparam("after", type_=Integer))
+        .order_by(NotesOrm.id)
+        .limit(bindparam("limit", type_=Integer))
+    )
+    CREATE_NOTE_STMT = (
+        insert(NotesOrm)
+        .values(
+            user=bindparam("b_user"),
+            title=bindparam("b_title", type_=String),
+            tags=bindparam("b_tags"),
+            excerpt=bindparam("b_excerpt"),
+            content_plain=bindparam("b_content_plain"),
+            content_zstd=bindparam("b_content_zstd"),
+            content_dict_id=bindparam("b_content_dict_id"),
+            search_vector=NoteBodyCodec.search_vector(
+                bindparam("b_title", type_=String),
+                bindparam("b_content", type_=String),
+            ),
+        )
+        .on_conflict_do_nothing(
+            index_elements=["user", "title"],
+            index_where=NotesOrm.deleted_at.is_(None),
+        )
+        .returning(NotesOrm)
+        .options(noload(NotesOrm.attachments))
+    )
+
+    @staticmethod
+    def hot_statements() -> list[tuple]:
+        """Горячие SELECT с параметрами, не находящими строк, - для прогрева пула"""
+        return [
+            (NotesRepo.GET_NOTE_STMT, {"note_id": 0, "username": ""}),
+            (NotesRepo.USER_NOTES_STMT, {"username": "", "after": 0, "limit": 1}),
+        ]
+
+    @staticmethod
+    def _with_tags(
+        stmt,
+        username: str,
+        tags: list[str] | None,
+        tags_mode: NoteTagsMode = NoteTagsMode.all,
+    ):
+        """Фильтр заметок пользователя по тегам (all - AND, any - OR).
+
+        Подходящие id выбираются в материализованном CTE только по GIN-индексу
+        (user, tags), иначе с ORDER BY id LIMIT планировщик может пойти по
+        индексу (user, id) и отфильтровать теги перебором всех заметок пользователя.
+        """
+        if not tags:
+            return stmt
+        tags_match = (
+            NotesOrm.tags.contains(tags)
+            if tags_mode == NoteTagsMode.all
+            else NotesOrm.tags.overlap(tags)
+        )
+        tagged = (
+            select(NotesOrm.id)
+            .where(NotesOrm.user == username)
+            .where(NotesOrm.deleted_at.is_(None))
+            .where(tags_match)
+            .cte("tagged_notes")
+            .prefix_with("MATERIALIZED")
+        )
+        return stmt.join(tagged, tagged.c.id == NotesOrm.id)
+
+    @staticmethod
+    def _keyset_page(stmt, limit: int | None = None, after: int | None = None):
+        """Keyset-пагинация по id: WHERE id > after ORDER BY id LIMIT limit"""
+        if after is not None:
+            stmt = stmt.where(NotesOrm.id > after)
+        stmt = stmt.order_by(NotesOrm.id)
+        if limit is not None:
+            stmt = stmt.limit(limit)
+        return stmt
+
     @staticmethod
-    async def get_all_notes() -> Sequence[NotesOrm] | None:
+    async def get_all_notes(
+        limit: int | None = None,
+        after: int | None = None,
+    ) -> Sequence[NotesOrm] | None:
         try:
-            async with db_helper.session_factory() as session:
+            async with db_helper.read_session_factory() as session:
                 logger.debug("Попытка получить все заметки")
 
-                stmt = select(NotesOrm).order_by(NotesOrm.id)
+                stmt = NotesRepo._keyset_page(
+                    select(NotesOrm).where(NotesOrm.deleted_at.is_(None)),
+                    limit=limit,
+                    after=after,
+                )
                 result = await session.scalars(stmt)
 
                 if result:
-                    return result.all()
+                    notes = result.all()
+                    await NoteCompressionRepo.ensure_dicts(
+                        note.content_dict_id for note in notes
+                    )
+                    return notes
 
                 logger.debug("Заметки не найдены.")
                 raise NoteNotFoundError("Заметки не найдены.") from None
@@ -45,21 +191,44 @@ class NotesRepo:
             ) from e
 
     @staticmethod
-    async def get_user_notes(username: str) -> Sequence[NotesOrm] | None:
+    async def get_user_notes(
+        username: str,
+        limit: int | None = None,
+        after: int | None = None,
+        tags: list[str] | None = None,
+        tags_mode: NoteTagsMode = NoteTagsMode.all,
+    ) -> Sequence[NotesOrm] | None:
         try:
-            async with db_helper.session_factory() as session:
+            async with db_helper.read_session_factory() as session:
                 logger.debug(f"Попытка получить заметки пользоваетеля {username!r}")
 
-                stmt = (
-                    select(NotesOrm)
-                    .where(NotesOrm.user == username)
-                    .order_by(NotesOrm.id)
-                )
-                result = await session.scalars(stmt)
+                if tags:
+                    stmt = NotesRepo._keyset_page(
+                        NotesRepo._with_tags(
+                            select(NotesOrm)
+                            .where(NotesOrm.user == username)
+                            .where(NotesOrm.deleted_at.is_(None)),
+                            username,
+                            tags,
+                            tags_mode,
+                        ),
+                        limit=limit,
+                        after=after,
+                    )
+                    result = await session.scalars(stmt)
+                else:
+                    result = await session.scalars(
+                        NotesRepo.USER_NOTES_STMT,
+                        {"username": username, "after": after or 0, "limit": limit},
+                    )
 
                 if result:
                     logger.debug(f"Заметки пользоваетеля {username!r} получены.")
-                    return result.all()
+                    notes = result.all()
+                    await NoteCompressionRepo.ensure_dicts(
+                        note.content_dict_id for note in notes
+                    )
+                    return notes
 
                 logger.debug(f"Заметки пользоваетеля {username!r} не найдены.")
                 raise NoteNotFoundError(
@@ -83,25 +252,270 @@ class NotesRepo:
             ) from e
 
     @staticmethod
-    async def get_note(note_id: int, username: str) -> NotesOrm | None:
+    async def get_notes_summary(
+        username: str | None = None,
+        limit: int | None = None,
+        after: int | None = None,
+        tags: list[str] | None = None,
+        tags_mode: NoteTagsMode = NoteTagsMode.all,
+    ) -> Sequence[Row]:
+        """Краткое представление заметок (id, title, excerpt, даты) строками Core"""
         try:
-            async with db_helper.session_factory() as session:
+            async with db_helper.read_session_factory() as session:
                 logger.debug(
-                    f"Попытка получить заметку с ID: {note_id} у пользоваетеля {username!r}"
+                    f"Попытка получить краткие заметки пользоваетеля {username!r}"
+                )
+
+                stmt = select(*NotesRepo.SUMMARY_COLUMNS).where(
+                    NotesOrm.deleted_at.is_(None)
+                )
+                if username is not None:
+                    stmt = NotesRepo._with_tags(
+                        stmt.where(NotesOrm.user == username),
+                        username,
+                        tags,
+                        tags_mode,
+                    )
+                stmt = NotesRepo._keyset_page(stmt, limit=limit, after=after)
+                result = await session.execute(stmt)
+                return result.all()
+        except SQLAlchemyError as e:
+            logger.exception(
+                f"Ошибка базы данных при получении кратких заметок пользоваетеля {username!r}: {e}"
+            )
+            raise RepositoryInternalError(
+                "Не удалось получить заметки из-за ошибки базы данных."
+            ) from e
+        except Exception as e:
+            logger.exception(
+                f"Неожиданная ошибка при получении кратких заметок пользоваетеля {username!r}: {e}"
+            )
+            raise RepositoryInternalError(
+                "Не удалось получить заметки из-за неожиданной ошибки."
+            ) from e
+
+    @staticmethod
+    async def get_note_summary(note_id: int, username: str) -> Row | None:
+        """Краткое представление одной заметки пользователя"""
+        try:
+            async with db_helper.read_session_factory() as session:
+                logger.debug(
+                    f"Попытка получить краткую заметку с ID: {note_id} у пользоваетеля {username!r}"
                 )
 
                 stmt = (
-                    select(NotesOrm)
+                    select(*NotesRepo.SUMMARY_COLUMNS)
                     .where(NotesOrm.id == note_id)
                     .where(NotesOrm.user == username)
+                    .where(NotesOrm.deleted_at.is_(None))
+                )
+                result = await session.execute(stmt)
+                return result.first()
+        except SQLAlchemyError as e:
+            logger.exception(
+                f"Ошибка базы данных при получении краткой заметки с ID {note_id}: {e}"
+            )
+            raise RepositoryInternalError(
+                f"Не удалось получить заметку с ID {note_id} из-за ошибки базы данных."
+            ) from e
+        except Exception as e:
+            logger.exception(
+                f"Неожиданная ошибка при получении краткой заметки с ID {note_id}: {e}"
+            )
+            raise RepositoryInternalError(
+                f"Не удалось получить заметку с ID {note_id} из-за неожиданной ошибки."
+            ) from e
+
+    @staticmethod
+    async def stream_notes(
+        username: str | None = None,
+        after: int | None = None,
+        view: NoteView = NoteView.full,
+        tags: list[str] | None = None,
+        tags_mode: NoteTagsMode = NoteTagsMode.all,
+        primary: bool = False,
+    ) -> AsyncIterator[NotesOrm | Row]:
+        """Потоковое чтение заметок через серверный курсор с постоянным расходом памяти.
+
+        В кратком представлении отдаются строки Core без content и вложений.
+        primary - читать с primary, когда ответ помечается ETag по версии списков.
+        """
+        session_factory = (
+            db_helper.session_factory if primary else db_helper.read_session_factory
+        )
+        try:
+            async with session_factory() as session:
+                logger.debug(
+                    f"Попытка потокового чтения заметок пользоваетеля {username!r}"
+                )
+
+                if view == NoteView.summary:
+                    stmt = select(*NotesRepo.SUMMARY_COLUMNS)
+                else:
+                    stmt = select(NotesOrm)
+                stmt = stmt.where(NotesOrm.deleted_at.is_(None))
+                if username is not None:
+                    stmt = NotesRepo._with_tags(
+                        stmt.where(NotesOrm.user == username),
+                        username,
+                        tags,
+                        tags_mode,
+                    )
+                stmt = NotesRepo._keyset_page(stmt, after=after).execution_options(
+                    yield_per=settings.pagination.stream_batch_size
+                )
+
+                if view == NoteView.summary:
+                    result = await session.stream(stmt)
+                else:
+                    result = await session.stream_scalars(stmt)
+                async for note in result:
+                    if view != NoteView.summary:
+                        await NoteCompressionRepo.ensure_dicts((note.content_dict_id,))
+                    yield note
+        except SQLAlchemyError as e:
+            logger.exception(
+                f"Ошибка базы данных при потоковом чтении заметок пользоваетеля {username!r}: {e}"
+            )
+            raise RepositoryInternalError(
+                "Не удалось прочитать заметки из-за ошибки базы данных."
+            ) from e
+
+    @staticmethod
+    async def search_user_notes(
+        username: str,
+        query: str,
+        limit: int,
+        after: tuple[float, int] | None = None,
+    ) -> Sequence[Row]:
+        """Полнотекстовый поиск по GIN-индексу с ранжированием и keyset по (rank, id)"""
+        try:
+            async with db_helper.read_session_factory() as session:
+                logger.debug(
+                    f"Попытка поиска {query!r} в заметках пользоваетеля {username!r}"
+                )
+
+                ts_query = websearch_to_tsquery(NOTES_SEARCH_CONFIG, query)
+                rank = func.ts_rank_cd(NotesOrm.search_vector, ts_query)
+
+                # Сначала отбираем страницу по индексу, ts_headline считаем только для нее
+                page_stmt = (
+                    select(
+                        NotesOrm.id,
+                        NotesOrm.title,
+                        # Сжатые тела не распаковываются: фрагмент строится по превью
+                        func.coalesce(NotesOrm.content_plain, NotesOrm.excerpt).label(
+                            "content"
+                        ),
+                        rank.label("rank"),
+                    )
+                    .where(NotesOrm.user == username)
+                    .where(NotesOrm.deleted_at.is_(None))
+                    .where(NotesOrm.search_vector.op("@@")(ts_query))
+                )
+                if after is not None:
+                    page_stmt = page_stmt.where(
+                        tuple_(rank, NotesOrm.id) < tuple_(after[0], after[1])
+                    )
+                page = (
+                    page_stmt.order_by(rank.desc(), NotesOrm.id.desc())
+                    .limit(limit)
+                    .subquery()
+                )
+
+                stmt = select(
+                    page.c.id,
+                    page.c.title,
+                    ts_headline(
+                        NOTES_SEARCH_CONFIG,
+                        page.c.content,
+                        ts_query,
+                        NOTES_SEARCH_HEADLINE_OPTIONS,
+                    ).label("snippet"),
+                    page.c.rank,
+                ).order_by(page.c.rank.desc(), page.c.id.desc())
+
+                result = await session.execute(stmt)
+                return result.all()
+        except SQLAlchemyError as e:
+            logger.exception(
+                f"Ошибка базы данных при поиске в заметках пользоваетеля {username!r}: {e}"
+            )
+            raise RepositoryInternalError(
+                "Не удалось выполнить поиск из-за ошибки базы данных."
+            ) from e
+        except Exception as e:
+            logger.exception(
+                f"Неожиданная ошибка при поиске в заметках пользоваетеля {username!r}: {e}"
+            )
+            raise RepositoryInternalError(
+                "Не удалось выполнить поиск из-за неожиданной ошибки."
+            ) from e
+
+    @staticmethod
+    async def autocomplete_titles(
+        username: str,
+        prefix: str,
+        limit: int,
+    ) -> Sequence[Row]:
+        """Автодополнение заголовков: совпадения по префиксу и нечеткие по триграммам"""
+        try:
+            async with db_helper.read_session_factory() as session:
+                logger.debug(
+                    f"Попытка автодополнения {prefix!r} для пользоваетеля {username!r}"
+                )
+
+                is_prefix = NotesOrm.title.istartswith(prefix, autoescape=True)
+                stmt = (
+                    select(NotesOrm.id, NotesOrm.title)
+                    .where(NotesOrm.user == username)
+                    .where(NotesOrm.deleted_at.is_(None))
+                    .where(or_(is_prefix, literal(prefix).op("<%")(NotesOrm.title)))
+                    .order_by(
+                        is_prefix.desc(),
+                        func.word_similarity(prefix, NotesOrm.title).desc(),
+                        NotesOrm.id.desc(),
+                    )
+                    .limit(limit)
+                )
+                result = await session.execute(stmt)
+                return result.all()
+        except SQLAlchemyError as e:
+            logger.exception(
+                f"Ошибка базы данных при автодополнении для пользоваетеля {username!r}: {e}"
+            )
+            raise RepositoryInternalError(
+                "Не удалось выполнить автодополнение из-за ошибки базы данных."
+            ) from e
+        except Exception as e:
+            logger.exception(
+                f"Неожиданная ошибка при автодополнении для пользоваетеля {username!r}: {e}"
+            )
+            raise RepositoryInternalError(
+                "Не удалось выполнить автодополнение из-за неожиданной ошибки."
+            ) from e
+
+    @staticmethod
+    async def get_note(note_id: int, username: str) -> NotesOrm | None:
+        try:
+            async with db_helper.read_session_factory() as session:
+                logger.debug(
+                    f"Попытка получить заметку с ID: {note_id} у пользоваетеля {username!r}"
+                )
+
+                result = await session.scalars(
+                    NotesRepo.GET_NOTE_STMT,
+                    {"note_id": note_id, "username": username},
                 )
-                result = await session.scalars(stmt)
 
                 if result:
                     logger.debug(
                         f"Заметка с ID: {note_id} у пользоваетеля {username!r} найдена."
                     )
-                    return result.first()
+                    note = result.first()
+                    if note is not None:
+                        await NoteCompressionRepo.ensure_dicts((note.content_dict_id,))
+                    return note
 
                 logger.debug(
                     f"Заметка с ID: {note_id} у пользоваетеля {username!r} не найдена."
@@ -134,18 +548,28 @@ class NotesRepo:
                     f"Попытка создание новой заметки: {note_to_create.title!r} у пользоваетеля {note_to_create.user!r}"
                 )
 
-                existing_note = await session.scalar(
-                    select(NotesOrm).filter(or_(NotesOrm.title == note_to_create.title))
+                # Один запрос: конфликт (user, title) определяется атомарно в БД
+                body = NoteBodyCodec.body_values(note_to_create.content)
+                new_note = await session.scalar(
+                    NotesRepo.CREATE_NOTE_STMT,
+                    {
+                        "b_user": note_to_create.user,
+                        "b_title": note_to_create.title,
+                        "b_tags": note_to_create.tags,
+                        "b_content": note_to_create.content,
+                        **{f"b_{key}": value for key, value in body.items()},
+                    },
                 )
-                if existing_note:
+                if new_note is None:
                     error_msg = f"Заметка с заголовком: {note_to_create.title!r} уже существует."
                     logger.error(error_msg)
                     raise NoteAlreadyExistsError(error_msg)
 
-                new_note = NotesOrm(**note_to_create.model_dump())
-                session.add(new_note)
+                await NoteTagsRepo.apply_delta(
+                    session, new_note.user, added=new_note.tags
+                )
                 await session.commit()
-                await session.refresh(new_note)
+                await NotesCache.invalidate_user_lists(new_note.user)
                 logger.info(
                     f"Заметка ID: {new_note.id}, заголовок: {new_note.title!r} успешно создана."
                 )
@@ -168,66 +592,259 @@ class NotesRepo:
             ) from e
 
     @staticmethod
-    async def delete_user_note(note_to_delete: NoteDelete) -> NoReturn:
+    async def import_notes(
+        username: str,
+        batches: AsyncIterator[list[tuple[int, str, str]]],
+    ) -> list[str]:
+        """Массовый импорт: COPY пачек во временную таблицу и один INSERT ... SELECT.
+
+        Пачки (row, title, content) загружаются через asyncpg copy_records_to_table,
+        конфликты (user, title) пропускаются. Тела пишутся текстом, крупные сжимает
+        фоновый jobs.compress_notes. Возвращает заголовки созданных заметок.
+        """
+        staging = table(
+            NOTES_IMPORT_STAGING_TABLE,
+            column("row_no"),
+            column("title"),
+            column("content"),
+        )
+        try:
+            async with db_helper.session_factory() as session:
+                logger.debug(f"Попытка импорта заметок пользоваетеля {username!r}")
+
+                await session.execute(
+                    text(
+                        f"CREATE TEMP TABLE {NOTES_IMPORT_STAGING_TABLE} ("
+                        "row_no integer NOT NULL, title varchar NOT NULL, "
+                        "content varchar NOT NULL) ON COMMIT DROP"
+                    )
+                )
+                connection = await session.connection()
+                raw_connection = await connection.get_raw_connection()
+                driver_connection = raw_connection.driver_connection
+
+                copied = 0
+                async for batch in batches:
+                    await driver_connection.copy_records_to_table(
+                        NOTES_IMPORT_STAGING_TABLE,
+                        records=batch,
+                        columns=("row_no", "title", "content"),
+                    )
+                    copied += len(batch)
+                    logger.debug(f"Импорт {username!r}: загружено {copied} строк")
+
+                notes_table = NotesOrm.__table__
+                stmt = (
+                    insert(notes_table)
+                    .from_select(
+                        ["user", "title", "content", "excerpt", "search_vector"],
+                        select(
+                            literal(username),
+                            staging.c.title,
+                            staging.c.content,
+                            func.left(staging.c.content, NOTES_EXCERPT_LENGTH),
+                            NoteBodyCodec.search_vector(
+                                staging.c.title, staging.c.content
+                            ),
+                        ),
+                    )
+                    .on_conflict_do_nothing(
+                        index_elements=["user", "title"],
+                        index_where=notes_table.c.deleted_at.is_(None),
+                    )
+                    .returning(notes_table.c.title)
+                )
+                result = await session.scalars(stmt)
+                imported_titles = list(result.all())
+                await session.commit()
+
+                await NotesCache.invalidate_user_lists(username)
+                logger.info(
+                    f"Импортировано {len(imported_titles)}/{copied} заметок пользоваетеля {username!r}"
+                )
+                return imported_titles
+        except BaseAPIException:
+            raise
+        except SQLAlchemyError as e:
+            logger.exception(
+                f"Ошибка базы данных при импорте заметок пользоваетеля {username!r}: {e}"
+            )
+            raise RepositoryInternalError(
+                "Не удалось импортировать заметки из-за ошибки базы данных."
+            ) from e
+        except Exception as e:
+            logger.exception(
+                f"Неожиданная ошибка при импорте заметок пользоваетеля {username!r}: {e}"
+            )
+            raise RepositoryInternalError(
+                "Не удалось импортировать заметки из-за неожиданной ошибки."
+            ) from e
+
+    @staticmethod
+    async def update_note(
+        note_id: int,
+        username: str,
+        note_update: NoteUpdate,
+        expected_version: int,
+    ) -> NotesOrm:
+        """Частичное обновление с оптимистичной блокировкой по version.
+
+        Строка блокируется на время транзакции: прежние title/content нужны
+        для ревизии в истории, которая пишется в той же транзакции.
+        """
+        values = note_update.model_dump(
+            exclude_unset=True, exclude_none=True, exclude={"version"}
+        )
         try:
             async with db_helper.session_factory() as session:
                 logger.debug(
-                    f"Попытка удаления заметки с ID: {note_to_delete.id} у пользоваетеля {note_to_delete.username!r}"
+                    f"Попытка обновить заметку с ID: {note_id} версии {expected_version} у пользоваетеля {username!r}"
                 )
 
-                found_note = await session.scalar(
-                    select(NotesOrm)
-                    .where(NotesOrm.id == note_to_delete.id)
-                    .where(NotesOrm.user == note_to_delete.username)
+                last_seq = (
+                    select(func.coalesce(func.max(NoteRevisionsOrm.seq), 0))
+                    .where(NoteRevisionsOrm.note_id == NotesOrm.id)
+                    .scalar_subquery()
                 )
+                current = (
+                    await session.execute(
+                        select(
+                            NotesOrm.title,
+                            NotesOrm.content_plain,
+                            NotesOrm.content_zstd,
+                            NotesOrm.content_dict_id,
+                            NotesOrm.tags,
+                            NotesOrm.version,
+                            NotesOrm.updated_at,
+                            last_seq.label("last_seq"),
+                        )
+                        .where(NotesOrm.id == note_id)
+                        .where(NotesOrm.user == username)
+                        .where(NotesOrm.deleted_at.is_(None))
+                        .with_for_update(of=NotesOrm)
+                    )
+                ).one_or_none()
+                if current is None:
+                    raise NoteNotFoundError(f"Заметка {note_id} не найдена")
+                if current.version != expected_version:
+                    raise NoteVersionConflictError(
+                        f"Заметка {note_id} изменена: текущая версия {current.version}, ожидалась {expected_version}"
+                    )
 
-                if not found_note:
-                    logger.debug(
-                        f"Заметка с ID: {note_to_delete.id} у пользователя {note_to_delete.username!r} не найдена."
+                await NoteCompressionRepo.ensure_dicts((current.content_dict_id,))
+                current_content = NoteBodyCodec.decode(
+                    current.content_plain, current.content_zstd, current.content_dict_id
+                )
+                title = values.get("title", current.title)
+                content = values.get("content", current_content)
+                if "content" in values:
+                    values.update(NoteBodyCodec.body_values(values.pop("content")))
+
+                stmt = (
+                    update(NotesOrm)
+                    .where(NotesOrm.id == note_id)
+                    .values(
+                        **values,
+                        search_vector=NoteBodyCodec.search_vector(title, content),
+                        version=NotesOrm.version + 1,
                     )
-                    raise NoteNotFoundError(
-                        f"Заметка с ID: {note_to_delete.id} у пользователя {note_to_delete.username!r} не найдена."
-                    ) from None
+                    .returning(NotesOrm)
+                    .options(noload(NotesOrm.attachments))
+                )
+                note = await session.scalar(stmt)
 
-                if found_note:
-                    await session.delete(found_note)
-                    await session.commit()
-                    logger.debug(
-                        f"Заметка с ID: {note_to_delete.id} у пользователя {note_to_delete.username!r} успешно удалена"
+                if "tags" in values:
+                    old_tags, new_tags = set(current.tags), set(note.tags)
+                    await NoteTagsRepo.apply_delta(
+                        session,
+                        username,
+                        added=new_tags - old_tags,
+                        removed=old_tags - new_tags,
                     )
-                raise DeleteNoteError(f"Note with ID {note_to_delete.id} is not delete")
-        except NoteNotFoundError:
-            raise
-        except DeleteNoteError:
+
+                if (title, content) != (current.title, current_content):
+                    session.add(
+                        NoteRevisionsRepo.build_revision(
+                            note_id=note_id,
+                            seq=current.last_seq + 1,
+                            version=current.version,
+                            title=current.title,
+                            content=current_content,
+                            created_at=current.updated_at,
+                            newer_content=content,
+                        )
+                    )
+
+                await session.commit()
+                await NotesCache.invalidate_note(note_id, username)
+                logger.info(
+                    f"Заметка ID: {note_id} обновлена до версии {note.version}."
+                )
+                return note
+        except (NoteNotFoundError, NoteVersionConflictError):
             raise
+        except IntegrityError as e:
+            logger.error(f"Конфликт заголовка при обновлении заметки {note_id}: {e}")
+            raise NoteAlreadyExistsError(
+                f"Заметка с заголовком: {values.get('title')!r} уже существует."
+            ) from e
         except SQLAlchemyError as e:
             logger.exception(
-                f"Ошибка базы данных при удалении заметки с ID {note_to_delete.id} пользоваетеля {note_to_delete.username!r}: {e}"
+                f"Ошибка базы данных при обновлении заметки {note_id}: {e}"
             )
             raise RepositoryInternalError(
-                f"Не удалось удалить заметку с ID {note_to_delete.id} пользоваетеля из-за ошибки базы данных."
+                "Не удалось обновить заметку из-за ошибки базы данных."
             ) from e
         except Exception as e:
             logger.exception(
-                f"Неожиданная ошибка при удалении заметки с ID {note_to_delete.id} пользоваетеля {note_to_delete.username!r}: {e}"
+                f"Неожиданная ошибка при обновлении заметки {note_id}: {e}"
             )
             raise RepositoryInternalError(
-                f"Не удалось удалить заметку с ID {note_to_delete.id} пользоваетеля из-за неожиданной ошибки."
+                "Не удалось обновить заметку из-за неожиданной ошибки."
             ) from e
 
     @staticmethod
-    async def delete_note(note_obj: NotesOrm) -> None:
+    async def soft_delete_note(note_id: int, username: str) -> None:
+        """Мягкое удаление одним UPDATE: заметка сразу исчезает из чтений.
+
+        Вложения в media-service и саму строку удаляет фоновая очистка
+        (core.notes_purger) не раньше settings.purge.delay секунд.
+        """
         try:
             async with db_helper.session_factory() as session:
-                await session.delete(note_obj)
+                logger.debug(
+                    f"Попытка удаления заметки с ID: {note_id} у пользоваетеля {username!r}"
+                )
+
+                tags = await session.scalar(
+                    update(NotesOrm)
+                    .where(NotesOrm.id == note_id)
+                    .where(NotesOrm.user == username)
+                    .where(NotesOrm.deleted_at.is_(None))
+                    .values(
+                        deleted_at=func.now(),
+                        purge_after=func.now()
+                        + timedelta(seconds=settings.purge.delay),
+                        version=NotesOrm.version + 1,
+                    )
+                    .returning(NotesOrm.tags)
+                )
+                if tags is None:
+                    raise NoteNotFoundError(f"Заметка {note_id} не найдена")
+
+                await NoteTagsRepo.apply_delta(session, username, removed=tags)
                 await session.commit()
+                await NotesCache.invalidate_note(note_id, username)
+                logger.info(f"Заметка ID: {note_id} помечена удаленной.")
+        except NoteNotFoundError:
+            raise
         except SQLAlchemyError as e:
-            logger.exception(f"Ошибка базы данных при удалении заметки {note_obj}: {e}")
+            logger.exception(f"Ошибка базы данных при удалении заметки {note_id}: {e}")
             raise RepositoryInternalError(
-                f"Не удалось удалить заметку {note_obj} из-за ошибки базы данных."
+                f"Не удалось удалить заметку {note_id} из-за ошибки базы данных."
             ) from e
         except Exception as e:
-            logger.exception(f"Неожиданная ошибка при удалении заметки {note_obj}: {e}")
+            logger.exception(f"Неожиданная ошибка при удалении заметки {note_id}: {e}")
             raise RepositoryInternalError(
-                f"Не удалось удалить заметку {note_obj} из-за неожиданной ошибки."
+                f"Не удалось удалить заметку {note_id} из-за неожиданной ошибки."
             ) from e
@@ -0,0 +1,142 @@
+import asyncio
+from typing import Sequence
+
+from prometheus_client import Counter
+from sqlalchemy import Row
+
+from core.config import settings
+from core.notes_outbox_repo import DELETE_MEDIA, NotesOutboxRepo
+
+from integrations.files.files import MS_delete_files
+
+from utils.logging import logger
+
+# Ответ media-service на повторное удаление: файл уже удален прошлой попыткой
+FILE_ALREADY_DELETED = "File not found"
+
+outbox_messages = Counter(
+    "notes_outbox_messages_total",
+    "Результаты отправки сообщений outbox",
+    ["message_name", "result"],
+)
+
+
+class OutboxRelay:
+    """Фоновая отправка сообщений outbox notes-service пачками.
+
+    Сообщения одного типа из пачки обрабатываются вместе: например, файлы
+    всех сообщений delete_media удаляются общими пакетными запросами к
+    media-service. Неотправленные сообщения повторяются с растущей задержкой.
+    """
+
+    @staticmethod
+    async def _delete_files(file_uuids: list[str]) -> dict[str, str]:
+        """Неудаленные файлы: UUID -> ошибка"""
+        batch_size = settings.media.delete_batch_size
+        batches = [
+            file_uuids[start : start + batch_size]
+            for start in range(0, len(file_uuids), batch_size)
+        ]
+        responses = await asyncio.gather(
+            *(MS_delete_files(batch) for batch in batches),
+            return_exceptions=True,
+        )
+
+        failed: dict[str, str] = {}
+        for batch, response in zip(batches, responses):
+            if isinstance(response, Exception):
+                failed.update(dict.fromkeys(batch, repr(response)))
+                continue
+            failed.update(
+                (result.uuid, result.error or "unknown error")
+                for result in response
+                if not result.ok and result.error != FILE_ALREADY_DELETED
+            )
+        return failed
+
+    @staticmethod
+    async def _delete_media(messages: Sequence[Row]) -> dict[int, str]:
+        file_uuids = list(
+            dict.fromkeys(
+                file_uuid
+                for message in messages
+                for file_uuid in message.body["file_uuids"]
+            )
+        )
+        failed = await OutboxRelay._delete_files(file_uuids) if file_uuids else {}
+
+        errors = {}
+        for message in messages:
+            message_failed = {
+                file_uuid: failed[file_uuid]
+                for file_uuid in message.body["file_uuids"]
+                if file_uuid in failed
+            }
+            if message_failed:
+                errors[message.id] = f"Не удалены файлы: {message_failed}"
+        return errors
+
+    # Обработчики: сообщения одного типа -> {id сообщения: ошибка} для неотправленных
+    HANDLERS = {
+        DELETE_MEDIA: _delete_media,
+    }
+
+    @staticmethod
+    async def relay_batch() -> int:
+        """Одна пачка отправки; возвращает число захваченных сообщений"""
+        messages = await NotesOutboxRepo.claim_batch(settings.outbox.batch_size)
+        if not messages:
+            return 0
+
+        by_name: dict[str, list[Row]] = {}
+        for message in messages:
+            by_name.setdefault(message.message_name, []).append(message)
+
+        errors: dict[int, str] = {}
+        for message_name, group in by_name.items():
+            handler = OutboxRelay.HANDLERS.get(message_name)
+            if handler is None:
+                group_errors = {
+                    message.id: f"Неизвестный тип сообщения {message_name!r}"
+                    for message in group
+                }
+            else:
+                try:
+                    group_errors = await handler(group)
+                except Exception as e:
+                    logger.exception(f"Ошибка отправки сообщений {message_name}: {e}")
+                    group_errors = {message.id: repr(e) for message in group}
+            errors.update(group_errors)
+            outbox_messages.labels(message_name, "delivered").inc(
+                len(group) - len(group_errors)
+            )
+            outbox_messages.labels(message_name, "retry").inc(len(group_errors))
+
+        for message in messages:
+            if message.id not in errors:
+                continue
+            text = (
+                f"Outbox {message.message_name} {message.id}, попытка "
+                f"{message.attempts}: {errors[message.id]}"
+            )
+            if message.attempts >= settings.outbox.max_attempts:
+                logger.error(f"{text}; попытки исчерпаны")
+            else:
+                logger.warning(f"{text}; повтор позже")
+
+        delivered = [message.id for message in messages if message.id not in errors]
+        await NotesOutboxRepo.complete(delivered, errors)
+        logger.info(f"Outbox: отправлено {len(delivered)} из {len(messages)} сообщений")
+        return len(messages)
+
+    @staticmethod
+    async def run(interval: float) -> None:
+        """Отправка в цикле: полные пачки подряд, затем ожидание interval секунд"""
+        while True:
+            try:
+                claimed = await OutboxRelay.relay_batch()
+            except Exception as e:
+                logger.exception(f"Ошибка фоновой отправки outbox: {e}")
+                claimed = 0
+            if claimed < settings.outbox.batch_size:
+                await asyncio.sleep(interval)
@@ -0,0 +1,8 @@
+from typing import Sequence, TypeVar
+
+T = TypeVar("T")
+
+
+def split_keyset_page(rows: Sequence[T], limit: int) -> tuple[list[T], bool]:
+    """Делит выборку из limit + 1 строк на страницу и признак наличия следующей"""
+    return list(rows[:limit]), len(rows) > limit
@@ -4,6 +4,20 @@ __all__ = (
     "NoteUpdate",
     "NoteDelete",
     "NoteRead",
+    "NoteFileRead",
+    "NoteWithFilesRead",
+    "NoteSummaryRead",
+    "NoteView",
+    "NoteTagsMode",
+    "NoteTagCount",
+    "NoteExportFormat",
+    "NoteSearchHit",
+    "NoteTitleSuggestion",
+    "NoteImportRowError",
+    "NoteImportResult",
+    "NoteRevisionRead",
+    "NoteRevisionContentRead",
+    "normalize_tags",
 )
 
 from .notes import NoteBase
@@ -11,3 +25,17 @@ from .notes import NoteCreate
 from .notes import NoteUpdate
 from .notes import NoteDelete
 from .notes import NoteRead
+from .notes import NoteFileRead
+from .notes import NoteWithFilesRead
+from .notes import NoteSummaryRead
+from .notes import NoteView
+from .notes import NoteTagsMode
+from .notes import NoteTagCount
+from .notes import NoteExportFormat
+from .notes import NoteSearchHit
+from .notes import NoteTitleSuggestion
+from .notes import NoteImportRowError
+from .notes import NoteImportResult
+from .notes import NoteRevisionRead
+from .notes import NoteRevisionContentRead
+from .notes import normalize_tags
@@ -1,11 +1,41 @@
-from typing import Optional
-from pydantic import BaseModel, ConfigDict
+from datetime import datetime
+from enum import Enum
+from typing import List, Optional
+from uuid import UUID
+
+from pydantic import BaseModel, ConfigDict, field_validator
+
+from utils.constants import NOTES_MAX_TAGS, NOTES_TAG_MAX_LENGTH
+
+
+def normalize_tags(tags: List[str]) -> List[str]:
+    """Теги в нижнем регистре без повторов, в порядке первого появления"""
+    normalized = []
+    for tag in tags:
+        tag = tag.strip().lower()
+        if not tag:
+            continue
+        if len(tag) > NOTES_TAG_MAX_LENGTH:
+            raise ValueError(f"Тег длиннее {NOTES_TAG_MAX_LENGTH} символов: {tag!r}")
+        if "," in tag or any(char.isspace() for char in tag):
+            raise ValueError(f"Тег не может содержать пробелы и запятые: {tag!r}")
+        if tag not in normalized:
+            normalized.append(tag)
+    if len(normalized) > NOTES_MAX_TAGS:
+        raise ValueError(f"У заметки может быть не больше {NOTES_MAX_TAGS} тегов")
+    return normalized
 
 
 class NoteBase(BaseModel):
     user: str
     title: str
     content: str
+    tags: List[str] = []
+
+    @field_validator("tags")
+    @classmethod
+    def validate_tags(cls, tags: List[str]) -> List[str]:
+        return normalize_tags(tags)
 
 
 class NoteCreate(NoteBase):
@@ -15,12 +45,131 @@ class NoteCreate(NoteBase):
 class NoteUpdate(BaseModel):
     title: Optional[str] = None
     content: Optional[str] = None
+    # Полный новый набор тегов; [] - снять все теги
+    tags: Optional[List[str]] = None
+    # Ожидаемая версия, если не передан заголовок If-Match
+    version: Optional[int] = None
+
+    # Валидаторы вызываются только для переданных полей: явный null не должен
+    # превращаться в пустое обновление, поднимающее версию
+    @field_validator("title", "content")
+    @classmethod
+    def reject_null(cls, value: Optional[str]) -> str:
+        if value is None:
+            raise ValueError("Поле нельзя установить в null")
+        return value
+
+    @field_validator("tags")
+    @classmethod
+    def validate_tags(cls, tags: Optional[List[str]]) -> List[str]:
+        if tags is None:
+            raise ValueError("Поле нельзя установить в null, для снятия тегов - []")
+        return normalize_tags(tags)
 
 
 class NoteRead(NoteBase):
     model_config = ConfigDict(from_attributes=True)
 
     id: int
+    version: int
+
+
+class NoteFileRead(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    uuid: UUID
+    s3_url: str
+    category: str
+    content_type: str
+    uploaded_at_s3: str
+
+
+class NoteWithFilesRead(NoteRead):
+    created_at: datetime
+    updated_at: datetime
+
+    video_files: List[NoteFileRead] = []
+    image_files: List[NoteFileRead] = []
+    audio_files: List[NoteFileRead] = []
+
+
+class NoteSummaryRead(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    id: int
+    title: str
+    excerpt: str
+    tags: List[str] = []
+    version: int
+    created_at: datetime
+    updated_at: datetime
+
+
+class NoteView(str, Enum):
+    summary = "summary"
+    full = "full"
+
+
+class NoteTagsMode(str, Enum):
+    # all - заметка содержит все теги фильтра (AND), any - хотя бы один (OR)
+    all = "all"
+    any = "any"
+
+
+class NoteExportFormat(str, Enum):
+    ndjson = "ndjson"
+    zip = "zip"
+
+
+class NoteSearchHit(BaseModel):
+    id: int
+    title: str
+    snippet: str
+    rank: float
+
+
+class NoteTitleSuggestion(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    id: int
+    title: str
+
+
+class NoteTagCount(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    tag: str
+    count: int
+
+
+class NoteImportRowError(BaseModel):
+    row: int
+    source: Optional[str] = None
+    title: Optional[str] = None
+    error: str
+
+
+class NoteImportResult(BaseModel):
+    imported: int
+    failed: int
+    errors: List[NoteImportRowError] = []
+
+
+class NoteRevisionRead(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    version: int
+    title: str
+    is_snapshot: bool
+    created_at: datetime
+
+
+class NoteRevisionContentRead(BaseModel):
+    note_id: int
+    version: int
+    title: str
+    content: str
+    created_at: datetime
 
 
 class NoteDelete(BaseModel):
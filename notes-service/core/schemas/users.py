@@ -6,7 +6,7 @@ from pydantic import BaseModel, EmailStr
 class RequestUserData(BaseModel):
     user_id: int
     username: str
-    email: EmailStr
+    email: EmailStr | None = None
     is_active: bool
     jti: str
     access_expire: datetime
@@ -31,6 +31,33 @@ class UserCookieMissingError(BaseAPIException):
         super().__init__(detail=detail, status_code=status.HTTP_401_UNAUTHORIZED)
 
 
+# Исключения аутентификации
+class InvalidTokenError(BaseAPIException):
+    def __init__(self, detail: str = "Invalid or malformed token"):
+        super().__init__(detail=detail, status_code=status.HTTP_401_UNAUTHORIZED)
+
+
+class AccessTokenRevokedError(BaseAPIException):
+    def __init__(self, detail: str = "Access token revoked"):
+        super().__init__(detail=detail, status_code=status.HTTP_401_UNAUTHORIZED)
+
+
+# Исключения admin API
+class AdminAccessDeniedError(BaseAPIException):
+    def __init__(self, detail: str = "Invalid admin token"):
+        super().__init__(detail=detail, status_code=status.HTTP_403_FORBIDDEN)
+
+
+class ProfilingDisabledError(BaseAPIException):
+    def __init__(self, detail: str = "Profiling API is disabled"):
+        super().__init__(detail=detail, status_code=status.HTTP_404_NOT_FOUND)
+
+
+class ProfilingNotRunningError(BaseAPIException):
+    def __init__(self, detail: str = "Memory profiling is not running"):
+        super().__init__(detail=detail, status_code=status.HTTP_409_CONFLICT)
+
+
 # Исключения обработчиков данных заметок
 class DeleteNoteError(BaseAPIException):
     def __init__(self, detail: str = "Note is not delete"):
@@ -47,6 +74,33 @@ class NoteNotFoundError(BaseAPIException):
         super().__init__(detail=detail, status_code=status.HTTP_404_NOT_FOUND)
 
 
+class EmptyNoteUpdateError(BaseAPIException):
+    def __init__(self, detail: str = "Nothing to update"):
+        super().__init__(detail=detail, status_code=status.HTTP_400_BAD_REQUEST)
+
+
+class NoteVersionRequiredError(BaseAPIException):
+    def __init__(self, detail: str = "Note version is required (If-Match or version)"):
+        super().__init__(
+            detail=detail, status_code=status.HTTP_428_PRECONDITION_REQUIRED
+        )
+
+
+class NoteVersionConflictError(BaseAPIException):
+    def __init__(self, detail: str = "Note was modified by another request"):
+        super().__init__(detail=detail, status_code=status.HTTP_412_PRECONDITION_FAILED)
+
+
+class InvalidCursorError(BaseAPIException):
+    def __init__(self, detail: str = "Invalid pagination cursor"):
+        super().__init__(detail=detail, status_code=status.HTTP_400_BAD_REQUEST)
+
+
+class InvalidTagsError(BaseAPIException):
+    def __init__(self, detail: str = "Invalid note tags"):
+        super().__init__(detail=detail, status_code=status.HTTP_400_BAD_REQUEST)
+
+
 # Исключения обработки файлов
 class EmptyFileError(BaseAPIException):
     def __init__(self, detail: str = "File is empty"):
@@ -85,6 +139,20 @@ class NoteCreateFailedError(BaseAPIException):
         )
 
 
+class NoteUpdateFailedError(BaseAPIException):
+    def __init__(self, detail: str = "Note update failed"):
+        super().__init__(
+            detail=detail, status_code=status.HTTP_500_INTERNAL_SERVER_ERROR
+        )
+
+
+class NoteImportFailedError(BaseAPIException):
+    def __init__(self, detail: str = "Note import failed"):
+        super().__init__(
+            detail=detail, status_code=status.HTTP_500_INTERNAL_SERVER_ERROR
+        )
+
+
 class NoteDeleteFailedError(BaseAPIException):
     def __init__(self, detail: str = "Note delete failed"):
         super().__init__(
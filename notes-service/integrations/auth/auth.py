@@ -1,51 +1,178 @@
+from datetime import datetime, timezone
+
 from fastapi import Request, HTTPException, status
 
 import httpx
+import jwt
+from redis.exceptions import RedisError
 
-
+from core.app_redis.client import get_auth_redis_client
+from core.config import settings
 from core.schemas.users import RequestUserData
 
+from exceptions.exceptions import AccessTokenRevokedError, InvalidTokenError
+
+from utils import TTLCache
+from utils.logging import logger
+
+from .client import get_auth_client
+from .constants import ACCESS_BLACKLIST_KEY, REVOKED_TOKEN_KEY
+
+# Токены с проверенной подписью и отсутствием в черном списке: jti -> пользователь
+_verified_tokens = TTLCache(
+    maxsize=settings.auth.cache_maxsize,
+    ttl=settings.auth.cache_ttl,
+)
+# Пользователи, активность которых подтвердил users-service: user_id -> True.
+# Деактивация действует не позже чем через status_ttl секунд
+_active_users = TTLCache(
+    maxsize=settings.auth.cache_maxsize,
+    ttl=settings.auth.status_ttl,
+)
+# Публичный ключ кэшируется только после успешного чтения
+_public_key: str | None = None
+
+
+class LocalAuthUnavailable(Exception):
+    """Локальная проверка невозможна, нужен запрос в users-service"""
+
+
+def _load_public_key() -> str | None:
+    global _public_key
+    if _public_key is not None:
+        return _public_key
+    try:
+        _public_key = settings.auth.public_key_path.read_text()
+        return _public_key
+    except OSError as e:
+        logger.warning(
+            f"Публичный ключ {settings.auth.public_key_path} недоступен, "
+            f"используется проверка через users-service: {e}"
+        )
+        return None
+
+
+async def _get_local_user(token: str) -> RequestUserData:
+    """Проверка JWT публичным ключом users-service и черным списком в Redis"""
+    public_key = _load_public_key()
+    if public_key is None:
+        raise LocalAuthUnavailable("public key is missing")
+
+    try:
+        payload = jwt.decode(
+            token,
+            public_key,
+            algorithms=[settings.auth.algorithm],
+            options={"require": ["exp", "iat", "jti", "sub"]},
+        )
+    except jwt.ExpiredSignatureError:
+        raise InvalidTokenError("Access token expired")
+    except jwt.InvalidSignatureError as e:
+        # Ключ не совпадает с ключом подписи users-service (например, после
+        # перевыпуска): ключ перечитывается при следующем запросе
+        global _public_key
+        _public_key = None
+        logger.warning(f"Подпись access-токена не сошлась с публичным ключом: {e}")
+        raise LocalAuthUnavailable("signature mismatch") from e
+    except jwt.PyJWTError as e:
+        logger.warning(f"Невалидный access-токен: {e}")
+        raise InvalidTokenError()
+
+    # Подпись уже проверена, поэтому jti однозначно соответствует токену
+    jti = payload["jti"]
+    cached_user = _verified_tokens.get(jti)
+    if cached_user is not None:
+        return cached_user
+
+    username = payload.get("username")
+    if not username:
+        # Токен выпущен до появления claim username
+        raise LocalAuthUnavailable("token has no username claim")
+
+    try:
+        redis = await get_auth_redis_client()
+        revoked = await redis.exists(
+            ACCESS_BLACKLIST_KEY.format(jti=jti), REVOKED_TOKEN_KEY.format(jti=jti)
+        )
+    except RedisError as e:
+        logger.warning(f"Redis черного списка токенов недоступен: {e}")
+        raise LocalAuthUnavailable("blacklist is unavailable") from e
+    if revoked:
+        raise AccessTokenRevokedError()
+
+    # Активность пользователя в токене не отражается: ее подтверждает users-service
+    user_id = int(payload["sub"])
+    if _active_users.get(user_id) is None:
+        raise LocalAuthUnavailable("user status is not confirmed")
+
+    user = RequestUserData(
+        user_id=user_id,
+        username=username,
+        is_active=True,
+        jti=jti,
+        access_expire=payload["exp"],
+        iat=payload["iat"],
+    )
+
+    remaining = (user.access_expire - datetime.now(timezone.utc)).total_seconds()
+    _verified_tokens.set(jti, user, ttl=min(settings.auth.cache_ttl, remaining))
+    return user
+
+
+async def _get_remote_user(auth_token: str) -> RequestUserData:
+    try:
+        auth_header = {"Authorization": f"{auth_token}"}
+
+        login_response = await get_auth_client().get(
+            settings.auth.self_info_url,
+            headers=auth_header,
+        )
+
+        if login_response.status_code != 200:
+            logger.debug(
+                f"Авторизация в users-service не пройдена: {login_response.text}"
+            )
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail=f"Authorization failed: {login_response.text}",
+            )
+
+        response_data: dict = login_response.json()
+        logger.debug(f"users-service подтвердил пользователя: {response_data}")
+
+        return RequestUserData(
+            user_id=response_data["user_db"]["id"],
+            username=response_data["user_db"]["username"],
+            email=response_data["user_db"]["email"],
+            is_active=response_data["user_db"]["is_active"],
+            jti=response_data["jwt_payload"]["jti"],
+            access_expire=response_data["jwt_payload"]["exp"],
+            iat=response_data["jwt_payload"]["iat"],
+        )
+
+    except httpx.RequestError as exc:
+        logger.warning(f"Gateway недоступен при проверке токена: {exc}")
+        raise HTTPException(status_code=503, detail=f"Gateway unavailable: {exc}")
+
 
 async def get_current_user(request: Request):
-    async with httpx.AsyncClient() as client:
+    auth_token = request.headers.get("authorization")
+    if not auth_token:
+        logger.debug("В запросе нет заголовка Authorization")
+        raise HTTPException(status_code=500, detail="Get cookie fail")
+
+    if settings.auth.mode == "local":
+        scheme, _, token = auth_token.partition(" ")
+        if scheme.lower() != "bearer" or not token:
+            raise InvalidTokenError("Expected Bearer token")
         try:
-            auth_token = request.headers.get("authorization")
-            print(f"INFO:    get_current_user получил - {auth_token}")
-
-            if auth_token:
-                auth_header = {"Authorization": f"{auth_token}"}
-
-                login_response = await client.get(
-                    "http://krakend:8080/user/self_info/",
-                    headers=auth_header,
-                    follow_redirects=True,
-                )
-            else:
-                print("EXC:   get_current_user    Get cookie fail")
-                raise HTTPException(status_code=500, detail="Get cookie fail")
-
-            if login_response.status_code != 200:
-                print(
-                    f"EXC:   get_current_user    Authorization failed: {login_response.text}"
-                )
-                raise HTTPException(
-                    status_code=status.HTTP_401_UNAUTHORIZED,
-                    detail=f"Authorization failed: {login_response.text}",
-                )
-
-            response_data: dict = login_response.json()
-            print(f"INFO:    get_current_user обработал - {response_data}")
-
-            return RequestUserData(
-                user_id=response_data["user_db"]["id"],
-                username=response_data["user_db"]["username"],
-                email=response_data["user_db"]["email"],
-                is_active=response_data["user_db"]["is_active"],
-                jti=response_data["jwt_payload"]["jti"],
-                access_expire=response_data["jwt_payload"]["exp"],
-                iat=response_data["jwt_payload"]["iat"],
+            return await _get_local_user(token)
+        except LocalAuthUnavailable as e:
+            logger.debug(
+                f"Локальная проверка токена недоступна ({e}), запрос в users-service"
             )
 
-        except httpx.RequestError as exc:
-            print(f"EXC:   get_current_user    Gateway unavailable: {exc}")
-            raise HTTPException(status_code=503, detail=f"Gateway unavailable: {exc}")
+    user = await _get_remote_user(auth_token)
+    if user.is_active:
+        _active_users.set(user.user_id, True)
+    return user
@@ -0,0 +1,28 @@
+import httpx
+
+from core.config import settings
+
+_auth_client: httpx.AsyncClient | None = None
+
+
+def get_auth_client() -> httpx.AsyncClient:
+    """Общий для приложения HTTP-клиент проверки токенов в users-service"""
+    global _auth_client
+    if _auth_client is None:
+        _auth_client = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=settings.auth.max_connections,
+                max_keepalive_connections=settings.auth.max_keepalive_connections,
+                keepalive_expiry=settings.auth.keepalive_expiry,
+            ),
+            timeout=httpx.Timeout(settings.auth.timeout),
+            follow_redirects=True,
+        )
+    return _auth_client
+
+
+async def close_auth_client() -> None:
+    global _auth_client
+    if _auth_client is not None:
+        await _auth_client.aclose()
+        _auth_client = None
@@ -1,2 +1,6 @@
 ACCESS_EXPIRE_NAME = "expire"
 ACCESS_ISSUED_AT_NAME = "iat"
+
+# Ключи черного списка access-токенов в Redis users-service
+ACCESS_BLACKLIST_KEY = "blacklist:access:{jti}"
+REVOKED_TOKEN_KEY = "revoked:{jti}"
@@ -1,6 +1,7 @@
 VIDEO_FILES_NAME = "video"
 IMAGE_FILES_NAME = "image"
 AUDIO_FILES_NAME = "audio"
+ATTACHMENT_KINDS = (VIDEO_FILES_NAME, IMAGE_FILES_NAME, AUDIO_FILES_NAME)
 
 NOTES_ATTACHMENT_NAME = "post_attachment"
 USERS_AVATAR_NAME = "avatar"
@@ -14,3 +14,9 @@ class NSFileUploadResponse(BaseModel):
     content_type: str
     category: str
     uploaded_at_s3: str
+
+
+class NSFileDeleteResult(BaseModel):
+    uuid: str
+    ok: bool
+    error: str | None = None
@@ -0,0 +1,77 @@
+"""Задержка первых запросов на холодном и прогретом пуле соединений.
+
+python -m jobs.bench_pool_warmup                               # 200 запросов, 20 параллельно
+python -m jobs.bench_pool_warmup --requests 500 --concurrency 50
+
+Каждый прогон - новый пул: холодный начинает без соединений и подготовленных
+выражений, прогретый перед замером проходит DbHelper.warm_up, как при старте.
+"""
+
+import argparse
+import asyncio
+import itertools
+import statistics
+import time
+
+from core.config import settings
+from core.models.db_helper import DbHelper
+from core.notes_repo import NotesRepo
+
+from utils.logging import logger
+
+
+def make_helper() -> DbHelper:
+    return DbHelper(
+        url=str(settings.db.DB_URL_asyncpg),
+        pool_size=settings.db.pool_size,
+        max_overflow=settings.db.max_overflow,
+        prepared_statement_cache_size=settings.db.prepared_statement_cache_size,
+    )
+
+
+async def run_queries(helper: DbHelper, requests: int, concurrency: int) -> list[float]:
+    """Латентности (мс) горячих запросов, по кругу, не больше concurrency одновременно"""
+    semaphore = asyncio.Semaphore(concurrency)
+    statements = itertools.islice(itertools.cycle(NotesRepo.hot_statements()), requests)
+
+    async def run_one(stmt, params) -> float:
+        async with semaphore:
+            started_at = time.perf_counter()
+            async with helper.session_factory() as session:
+                await session.scalars(stmt, params)
+            return (time.perf_counter() - started_at) * 1000
+
+    return await asyncio.gather(*(run_one(stmt, params) for stmt, params in statements))
+
+
+def report(name: str, latencies: list[float]) -> None:
+    percentiles = statistics.quantiles(latencies, n=100)
+    logger.info(
+        f"{name}: p50 {percentiles[49]:.2f} мс, p99 {percentiles[98]:.2f} мс, "
+        f"max {max(latencies):.2f} мс"
+    )
+
+
+async def main(requests: int, concurrency: int) -> None:
+    cold = make_helper()
+    try:
+        report("Холодный пул", await run_queries(cold, requests, concurrency))
+    finally:
+        await cold.dispose()
+
+    warm = make_helper()
+    try:
+        await warm.warm_up(concurrency, NotesRepo.hot_statements())
+        report("Прогретый пул", await run_queries(warm, requests, concurrency))
+    finally:
+        await warm.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Холодный и прогретый пул: p50 / p99 первых запросов"
+    )
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=20)
+    args = parser.parse_args()
+    asyncio.run(main(args.requests, args.concurrency))
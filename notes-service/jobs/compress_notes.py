@@ -0,0 +1,66 @@
+"""Фоновое сжатие тел заметок zstd.
+
+python -m jobs.compress_notes train       # обучить новый словарь по образцам
+python -m jobs.compress_notes backfill    # сжать несжатые тела выше порога
+python -m jobs.compress_notes decompress  # распаковать все тела (перед откатом миграции)
+"""
+
+import argparse
+import asyncio
+from compression import zstd
+
+from core.config import settings
+from core.models import db_helper
+from core.note_compression_repo import NoteCompressionRepo
+
+from utils.logging import logger
+
+
+async def train() -> None:
+    samples = await NoteCompressionRepo.sample_bodies(
+        settings.compression.dict_train_samples
+    )
+    if not samples:
+        logger.warning("Нет заметок для обучения словаря zstd")
+        return
+    zstd_dict = await asyncio.to_thread(
+        zstd.train_dict,
+        [sample.encode() for sample in samples],
+        settings.compression.dict_size,
+    )
+    dict_id = await NoteCompressionRepo.create_dict(
+        zstd_dict.dict_content, samples=len(samples)
+    )
+    logger.info(f"Обучен словарь zstd {dict_id} по {len(samples)} заметкам")
+
+
+async def run_batches(batch, action: str) -> None:
+    after, total = 0, 0
+    while True:
+        after, done = await batch(
+            after=after, limit=settings.compression.backfill_batch_size
+        )
+        if after is None:
+            break
+        total += done
+        logger.info(f"{action}: обработано до id {after}, всего {total}")
+    logger.info(f"{action} завершено, заметок: {total}")
+
+
+async def main(command: str) -> None:
+    try:
+        await NoteCompressionRepo.load_dicts()
+        if command == "train":
+            await train()
+        elif command == "backfill":
+            await run_batches(NoteCompressionRepo.compress_batch, "Сжатие")
+        else:
+            await run_batches(NoteCompressionRepo.decompress_batch, "Распаковка")
+    finally:
+        await db_helper.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Сжатие тел заметок zstd")
+    parser.add_argument("command", choices=("train", "backfill", "decompress"))
+    asyncio.run(main(parser.parse_args().command))
@@ -1,29 +1,68 @@
+import asyncio
 from contextlib import asynccontextmanager
-import tracemalloc
 
-from fastapi import FastAPI, Request
+from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import ORJSONResponse
 
 from api import router as api_router
 from core.config import settings
+from core.models import db_helper
+from core.app_redis.client import close_redis_client
+from core.note_compression_repo import NoteCompressionRepo
+from core.notes_purger import NotesPurger
+from core.outbox_relay import OutboxRelay
+from core.notes_repo import NotesRepo
+from integrations.auth.client import close_auth_client, get_auth_client
+from integrations.files.client import close_media_client, get_media_client
 
-from prometheus_fastapi_instrumentator import Instrumentator
+from prometheus_fastapi_instrumentator import Instrumentator, metrics
 
 from errors_handlers import register_errors_handlers
 
+from utils.access_log import AccessLogMiddleware
 from utils.logging import logger
+from utils.memory_profiler import MemoryProfiler
+from utils.read_your_writes import ReadYourWritesMiddleware
+from utils.sql_metrics import SqlStatsMiddleware, sql_metrics
 
-
-# Включаем отслеживание памяти, для дебага ошибок с ассинхронными функциями
-tracemalloc.start()
+# Отслеживание памяти только по настройке: иначе включается через admin API профилирования
+if settings.profiling.memory_on_start:
+    MemoryProfiler.start(settings.profiling.traceback_frames)
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     logger.info("Запуск приложения...")
+    get_media_client()
+    get_auth_client()
+    await NoteCompressionRepo.load_dicts()
+    replica_checks = None
+    if db_helper.replicas is not None:
+        await db_helper.replicas.check()
+        replica_checks = asyncio.create_task(
+            db_helper.replicas.run_checks(settings.replicas.check_interval)
+        )
+    if settings.db.pool_warmup:
+        await db_helper.warm_up(settings.db.pool_warmup, NotesRepo.hot_statements())
+    purge = None
+    if settings.purge.enabled:
+        purge = asyncio.create_task(NotesPurger.run(settings.purge.interval))
+    outbox = None
+    if settings.outbox.enabled:
+        outbox = asyncio.create_task(OutboxRelay.run(settings.outbox.interval))
     yield
     logger.info("Выключение...")
+    if replica_checks is not None:
+        replica_checks.cancel()
+    if purge is not None:
+        purge.cancel()
+    if outbox is not None:
+        outbox.cancel()
+    await close_media_client()
+    await close_auth_client()
+    await close_redis_client()
+    await db_helper.dispose()
 
 
 def create_app() -> FastAPI:
@@ -44,19 +83,28 @@ def create_app() -> FastAPI:
         allow_headers=["*"],
     )
 
-    # Подключаем middleware для просмотра содержимого http запроса
-    @main_app.middleware("http")
-    async def log_requests(request: Request, call_next):
-        logger.info("\n----------- New request -----------")
-        logger.info(f"Request: {request.method} {request.url}")
-        logger.info(f"Headers: {request.headers}")
-        try:
-            body = await request.json()
-            logger.info(f"Body: {body}\n")
-        except Exception as e:
-            logger.warning(f"Could not decode JSON body: {e}\n")
-        response = await call_next(request)
-        return response
+    # Подключаем структурный access-лог (без чтения тела запроса)
+    if settings.access.enabled:
+        main_app.add_middleware(
+            AccessLogMiddleware,
+            sample_rate=settings.access.sample_rate,
+            slow_threshold_ms=settings.access.slow_threshold_ms,
+        )
+
+    # Подключаем сбор статистики SQL по запросу (и детектор N+1 в режиме DEV)
+    if settings.sql_metrics.enabled:
+        main_app.add_middleware(
+            SqlStatsMiddleware,
+            detect_n_plus_one=settings.app.mode == "DEV",
+            n_plus_one_threshold=settings.sql_metrics.n_plus_one_threshold,
+        )
+
+    # Подключаем закрепление за primary после записи (только при наличии реплик)
+    if db_helper.replicas is not None:
+        main_app.add_middleware(
+            ReadYourWritesMiddleware,
+            pin_seconds=settings.replicas.pin_seconds,
+        )
 
     # Подключаем api роутеры
     main_app.include_router(api_router)
@@ -65,7 +113,11 @@ def create_app() -> FastAPI:
     register_errors_handlers(main_app)
 
     # Подключаем prometheus метрики
-    Instrumentator().instrument(main_app).expose(main_app)
+    instrumentator = Instrumentator()
+    if settings.sql_metrics.enabled:
+        # С пользовательской инструментацией стандартные метрики подключаются явно
+        instrumentator.add(metrics.default(), sql_metrics())
+    instrumentator.instrument(main_app).expose(main_app)
 
     # Подключаем админ панель
     # setup_admin(app, db_manager.engine)
@@ -0,0 +1,45 @@
+import os
+
+import pytest
+
+# core.config создает settings при импорте: обязательные параметры без .env
+REQUIRED_ENV = {
+    "NOTES_DB_HOST": "localhost",
+    "NOTES_DB_PORT": "5432",
+    "NOTES_DB_USER": "notes",
+    "NOTES_DB_PWD": "notes",
+    "NOTES_DB_NAME": "notes",
+    "NOTES_REDIS_HOST": "localhost",
+    "NOTES_REDIS_PORT": "6379",
+}
+for name, value in REQUIRED_ENV.items():
+    os.environ.setdefault(name, value)
+
+
+@pytest.fixture
+def make_settings(monkeypatch):
+    """Settings из переменных окружения, без .env-файла"""
+    from core.config import Settings
+
+    def make(**env: str) -> Settings:
+        for name, value in env.items():
+            monkeypatch.setenv(name, value)
+        return Settings(_env_file=None)
+
+    return make
+
+
+@pytest.fixture
+def redis(monkeypatch):
+    """In-memory Redis вместо клиента кэша заметок"""
+    import fakeredis
+
+    from core import notes_cache
+
+    client = fakeredis.FakeAsyncRedis(decode_responses=True)
+
+    async def get_redis_client():
+        return client
+
+    monkeypatch.setattr(notes_cache, "get_redis_client", get_redis_client)
+    return client
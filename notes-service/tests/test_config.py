@@ -0,0 +1,17 @@
+def test_imports_batch_size_from_env(make_settings):
+    settings = make_settings(NOTES_IMPORTS_BATCH_SIZE="250")
+
+    assert settings.imports.batch_size == 250
+
+
+def test_nested_env_splits_only_section(make_settings):
+    settings = make_settings(NOTES_DB_HOST="db.internal", NOTES_REDIS_PORT="6390")
+
+    assert settings.db.host == "db.internal"
+    assert settings.redis.port == 6390
+
+
+def test_revisions_snapshot_interval_from_env(make_settings):
+    settings = make_settings(NOTES_REVISIONS_SNAPSHOT_INTERVAL="7")
+
+    assert settings.revisions.snapshot_interval == 7
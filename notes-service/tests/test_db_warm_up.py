@@ -0,0 +1,114 @@
+import asyncio
+from types import SimpleNamespace
+
+from sqlalchemy import text
+
+from core.models.db_helper import DbHelper
+
+
+class FakeConnection:
+    def __init__(self, engine: "FakeEngine") -> None:
+        self.engine = engine
+        self.executed = []
+        self.rolled_back = False
+
+    async def execute(self, stmt, params=None):
+        self.executed.append((str(stmt), params))
+
+    async def rollback(self) -> None:
+        self.rolled_back = True
+
+    async def close(self) -> None:
+        self.engine.open -= 1
+
+
+class FakeEngine:
+    """Движок, считающий одновременно открытые соединения"""
+
+    def __init__(self, pool_size: int, fail_connect: int = 0) -> None:
+        self.url = "postgresql+asyncpg://fake"
+        self.pool = SimpleNamespace(size=lambda: pool_size)
+        self.fail_connect = fail_connect
+        self.open = 0
+        self.max_open = 0
+        self.connections = []
+
+    def connect(self):
+        return SimpleNamespace(start=self._start)
+
+    async def _start(self) -> FakeConnection:
+        # Уступаем циклу: последовательное открытие не даст max_open > 1
+        await asyncio.sleep(0)
+        if self.fail_connect:
+            self.fail_connect -= 1
+            raise OSError("connection refused")
+        self.open += 1
+        self.max_open = max(self.max_open, self.open)
+        conn = FakeConnection(self)
+        self.connections.append(conn)
+        return conn
+
+
+def make_helper(engine: FakeEngine, *replicas: FakeEngine) -> DbHelper:
+    helper = DbHelper.__new__(DbHelper)
+    helper.engine = engine
+    helper.replicas = (
+        SimpleNamespace(replicas=[SimpleNamespace(engine=e) for e in replicas])
+        if replicas
+        else None
+    )
+    return helper
+
+
+async def test_warm_up_opens_connections_concurrently():
+    engine = FakeEngine(pool_size=5)
+    stmt = text("SELECT 1 FROM notes WHERE id = :id")
+
+    await make_helper(engine).warm_up(3, [(stmt, {"id": 0})])
+
+    assert len(engine.connections) == 3
+    assert engine.max_open == 3
+    assert engine.open == 0
+    for conn in engine.connections:
+        assert conn.executed == [
+            ("SELECT 1", None),
+            ("SELECT 1 FROM notes WHERE id = :id", {"id": 0}),
+        ]
+        assert conn.rolled_back
+
+
+async def test_warm_up_covers_replicas():
+    primary = FakeEngine(pool_size=5)
+    replica = FakeEngine(pool_size=5)
+
+    await make_helper(primary, replica).warm_up(2)
+
+    assert primary.max_open == 2
+    assert replica.max_open == 2
+
+
+async def test_warm_up_zero_opens_nothing():
+    engine = FakeEngine(pool_size=5)
+
+    await make_helper(engine).warm_up(0)
+
+    assert engine.connections == []
+
+
+async def test_warm_up_clamps_to_pool_size():
+    engine = FakeEngine(pool_size=2)
+
+    await make_helper(engine).warm_up(10)
+
+    assert len(engine.connections) == 2
+    assert engine.max_open == 2
+    assert engine.open == 0
+
+
+async def test_warm_up_connect_errors_do_not_fail_startup():
+    engine = FakeEngine(pool_size=5, fail_connect=2)
+
+    warmed = await DbHelper._warm_up_engine(engine, 3, [])
+
+    assert warmed == 1
+    assert engine.open == 0
@@ -0,0 +1,54 @@
+import pytest
+
+from utils import etag_matches, make_etag, note_etag, version_from_if_match
+
+
+def test_make_etag_is_strong_and_deterministic():
+    etag = make_etag("alice", "v", 7, "full")
+
+    assert etag == make_etag("alice", "v", 7, "full")
+    assert etag.startswith('"') and etag.endswith('"')
+    assert etag != make_etag("alice", "v", 8, "full")
+
+
+@pytest.mark.parametrize(
+    "header, matches",
+    [
+        (None, False),
+        ("", False),
+        ('"abc"', True),
+        ('W/"abc"', True),
+        ('"other"', False),
+        ('"other", "abc"', True),
+        ('"other",W/"abc"', True),
+        ("*", True),
+        ('"abc-stale"', False),
+    ],
+)
+def test_if_none_match_uses_weak_comparison(header, matches):
+    assert etag_matches(header, '"abc"') is matches
+
+
+@pytest.mark.parametrize(
+    "header, version",
+    [
+        (None, None),
+        ("", None),
+        ('"5.3"', 3),
+        (' "5.3" ', 3),
+        ('W/"5.3"', None),
+        ('"6.3"', None),
+        ('"5.x"', None),
+        ("5.3", None),
+        ("*", None),
+        ('"6.1", "5.3"', 3),
+        ('"5.3", "5.4"', None),
+        ('"5.3", W/"5.4"', 3),
+    ],
+)
+def test_if_match_uses_strong_comparison(header, version):
+    assert version_from_if_match(header, 5) == version
+
+
+def test_note_etag_round_trips_through_if_match():
+    assert version_from_if_match(note_etag(5, 12), 5) == 12
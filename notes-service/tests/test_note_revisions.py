@@ -0,0 +1,123 @@
+from datetime import datetime, timezone
+
+import pytest
+
+from core.config import settings
+from core.note_revisions_repo import NoteRevisionsRepo
+
+NOW = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+
+def history(versions: int) -> list[str]:
+    """Версии заметки: каждая правит одну строку и добавляет новую"""
+    contents = []
+    lines = [f"line {number}\n" for number in range(50)]
+    for version in range(1, versions + 1):
+        lines[version % len(lines)] = f"edited in v{version}\n"
+        lines.append(f"added in v{version}\n")
+        contents.append("".join(lines))
+    return contents
+
+
+def build_revisions(contents: list[str]) -> list:
+    """Ревизии, как их пишет update_note: версия v заменяется версией v + 1"""
+    return [
+        NoteRevisionsRepo.build_revision(
+            note_id=1,
+            seq=version,
+            version=version,
+            title=f"v{version}",
+            content=contents[version - 1],
+            created_at=NOW,
+            newer_content=contents[version],
+        )
+        for version in range(1, len(contents))
+    ]
+
+
+def chain_for(revisions: list, current_version: int, version: int) -> list:
+    """Выборка get_revision: от ближайшего снимка не старше version (или от
+    текущей заметки) вниз до version, от новых к старым"""
+    snapshots = [
+        revision.version
+        for revision in revisions
+        if revision.is_snapshot and revision.version >= version
+    ]
+    upper = min(snapshots, default=current_version)
+    return sorted(
+        (revision for revision in revisions if version <= revision.version <= upper),
+        key=lambda revision: revision.version,
+        reverse=True,
+    )
+
+
+@pytest.fixture
+def snapshot_interval(monkeypatch):
+    monkeypatch.setattr(settings.revisions, "snapshot_interval", 5)
+    return 5
+
+
+def test_every_interval_revision_is_a_snapshot(snapshot_interval):
+    revisions = build_revisions(history(23))
+
+    assert [revision.version for revision in revisions if revision.is_snapshot] == [
+        5,
+        10,
+        15,
+        20,
+    ]
+    assert all(revision.delta for revision in revisions if not revision.is_snapshot)
+
+
+def test_every_version_is_restored(snapshot_interval):
+    contents = history(23)
+    revisions = build_revisions(contents)
+    current_version = len(contents)
+
+    for version in range(1, current_version):
+        chain = chain_for(revisions, current_version, version)
+
+        assert chain[-1].version == version
+        # Не больше snapshot_interval дельт до нужной версии
+        assert len(chain) <= snapshot_interval
+        restored = NoteRevisionsRepo.restore_content(contents[-1], chain)
+        assert restored == contents[version - 1], version
+
+
+def test_restore_across_snapshot_boundary(snapshot_interval):
+    contents = history(23)
+    revisions = build_revisions(contents)
+
+    # Версия 9 собирается от снимка 10, версия 11 - от снимка 15
+    chain = chain_for(revisions, len(contents), 9)
+    assert [revision.version for revision in chain] == [10, 9]
+    assert NoteRevisionsRepo.restore_content(contents[-1], chain) == contents[8]
+
+    chain = chain_for(revisions, len(contents), 11)
+    assert [revision.version for revision in chain] == [15, 14, 13, 12, 11]
+    assert NoteRevisionsRepo.restore_content(contents[-1], chain) == contents[10]
+
+
+def test_restore_from_current_note_after_last_snapshot(snapshot_interval):
+    contents = history(23)
+    revisions = build_revisions(contents)
+
+    chain = chain_for(revisions, len(contents), 21)
+
+    assert not any(revision.is_snapshot for revision in chain)
+    assert NoteRevisionsRepo.restore_content(contents[-1], chain) == contents[20]
+
+
+def test_rewrite_is_stored_as_snapshot(snapshot_interval):
+    revision = NoteRevisionsRepo.build_revision(
+        note_id=1,
+        seq=1,
+        version=1,
+        title="v1",
+        content="short\n",
+        created_at=NOW,
+        newer_content="entirely\ndifferent\ntext\n",
+    )
+
+    assert revision.is_snapshot
+    assert revision.content == "short\n"
@@ -0,0 +1,211 @@
+import asyncio
+
+import pytest
+from redis.exceptions import ConnectionError as RedisConnectionError
+
+from core.config import settings
+from core.notes_cache import LIST_VERSION_KEY, LOCK_SUFFIX, NotesCache
+from utils.read_your_writes import primary_pinned
+
+USERNAME = "alice"
+VERSION_KEY = LIST_VERSION_KEY.format(username=USERNAME)
+
+
+async def settle() -> None:
+    """Даем читателям дойти до ожидания общей загрузки"""
+    await asyncio.sleep(0.05)
+
+
+def fail_pipeline(monkeypatch, redis):
+    """Запись через pipeline падает, отдельные команды работают"""
+    pipeline = redis.pipeline
+
+    def broken_pipeline(*args, **kwargs):
+        pipe = pipeline(*args, **kwargs)
+
+        async def execute(*args, **kwargs):
+            raise RedisConnectionError("connection reset")
+
+        pipe.execute = execute
+        return pipe
+
+    monkeypatch.setattr(redis, "pipeline", broken_pipeline)
+
+
+async def test_list_version_is_stable_without_writes(redis):
+    first = await NotesCache.list_version(USERNAME)
+
+    assert first is not None
+    assert await NotesCache.list_version(USERNAME) == first
+    assert 0 < await redis.ttl(VERSION_KEY) <= settings.cache.list_version_ttl
+
+
+@pytest.mark.parametrize(
+    "invalidate",
+    [
+        lambda: NotesCache.invalidate_user_lists(USERNAME),
+        lambda: NotesCache.invalidate_note(1, USERNAME),
+    ],
+)
+async def test_write_changes_list_version(redis, invalidate):
+    before = await NotesCache.list_version(USERNAME)
+
+    await invalidate()
+
+    assert await NotesCache.list_version(USERNAME) != before
+
+
+async def test_lost_version_is_not_reused(redis):
+    before = await NotesCache.list_version(USERNAME)
+    await redis.flushall()
+
+    # Инкремент без версии не должен начать счет заново с маленьких чисел
+    await NotesCache.invalidate_user_lists(USERNAME)
+
+    assert await NotesCache.list_version(USERNAME) > before
+
+
+@pytest.mark.parametrize(
+    "invalidate",
+    [
+        lambda: NotesCache.invalidate_user_lists(USERNAME),
+        lambda: NotesCache.invalidate_note(1, USERNAME),
+    ],
+)
+async def test_failed_bump_drops_list_version(monkeypatch, redis, invalidate):
+    before = await NotesCache.list_version(USERNAME)
+    fail_pipeline(monkeypatch, redis)
+
+    await invalidate()
+
+    assert await redis.get(VERSION_KEY) is None
+    assert await NotesCache.list_version(USERNAME) != before
+
+
+async def test_single_flight_shares_one_load(redis):
+    calls = 0
+    release = asyncio.Event()
+
+    async def loader():
+        nonlocal calls
+        calls += 1
+        await release.wait()
+        return {"value": calls}
+
+    readers = [
+        asyncio.create_task(NotesCache.read_through("notes:test", "test", 60, loader))
+        for _ in range(5)
+    ]
+    await settle()
+    release.set()
+
+    assert await asyncio.gather(*readers) == [{"value": 1}] * 5
+    assert calls == 1
+    assert await NotesCache.read_through("notes:test", "test", 60, loader) == {
+        "value": 1
+    }
+
+
+async def test_single_flight_propagates_loader_error(redis):
+    calls = 0
+    release = asyncio.Event()
+
+    async def loader():
+        nonlocal calls
+        calls += 1
+        await release.wait()
+        raise LookupError("db failed")
+
+    readers = [
+        asyncio.create_task(NotesCache.read_through("notes:test", "test", 60, loader))
+        for _ in range(3)
+    ]
+    await settle()
+    release.set()
+    results = await asyncio.gather(*readers, return_exceptions=True)
+
+    assert calls == 1
+    assert all(isinstance(result, LookupError) for result in results)
+    # Ошибка не кэшируется и не оставляет блокировку: следующий промах грузит заново
+    assert NotesCache._inflight == {}
+    assert await redis.get("notes:test" + LOCK_SUFFIX) is None
+    with pytest.raises(LookupError):
+        await NotesCache.read_through("notes:test", "test", 60, loader)
+    assert calls == 2
+
+
+async def test_cancelled_waiter_does_not_cancel_shared_load(redis):
+    release = asyncio.Event()
+
+    async def loader():
+        await release.wait()
+        return {"value": 1}
+
+    owner = asyncio.create_task(
+        NotesCache.read_through("notes:test", "test", 60, loader)
+    )
+    await settle()
+    waiter = asyncio.create_task(
+        NotesCache.read_through("notes:test", "test", 60, loader)
+    )
+    await settle()
+    waiter.cancel()
+    release.set()
+
+    assert await owner == {"value": 1}
+    with pytest.raises(asyncio.CancelledError):
+        await waiter
+
+
+def pinned_loader(seen: list[bool]):
+    """loader, запоминающий, шло ли чтение на primary"""
+
+    async def loader():
+        seen.append(primary_pinned())
+        return {"value": 1}
+
+    return loader
+
+
+async def test_cache_fill_reads_from_primary(redis):
+    seen = []
+
+    await NotesCache.read_through("notes:test", "test", 60, pinned_loader(seen))
+
+    assert seen == [True]
+    assert not primary_pinned()
+
+
+async def test_disabled_cache_reads_from_replica(monkeypatch, redis):
+    monkeypatch.setattr(settings.cache, "enabled", False)
+    seen = []
+
+    await NotesCache.read_through("notes:test", "test", 60, pinned_loader(seen))
+    await NotesCache.read_through(None, "test", 60, pinned_loader(seen))
+
+    assert seen == [False, False]
+
+
+async def test_redis_error_reads_from_replica(monkeypatch, redis):
+    async def broken_get(*args, **kwargs):
+        raise RedisConnectionError("connection reset")
+
+    monkeypatch.setattr(redis, "get", broken_get)
+    seen = []
+
+    assert await NotesCache.read_through(
+        "notes:test", "test", 60, pinned_loader(seen)
+    ) == {"value": 1}
+    assert seen == [False]
+
+
+async def test_lock_error_reads_from_replica(monkeypatch, redis):
+    async def broken_set(*args, **kwargs):
+        raise RedisConnectionError("connection reset")
+
+    monkeypatch.setattr(redis, "set", broken_set)
+    seen = []
+
+    await NotesCache.read_through("notes:test", "test", 60, pinned_loader(seen))
+
+    assert seen == [False]
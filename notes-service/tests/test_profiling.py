@@ -0,0 +1,131 @@
+import tracemalloc
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from api.api_v1 import profiling
+from core.config import settings
+from errors_handlers import register_errors_handlers
+from utils.memory_profiler import MemoryProfiler
+
+ADMIN_TOKEN = "s3cret-admin-token"
+MEMORY_URLS = [
+    ("get", "/memory"),
+    ("post", "/memory/start"),
+    ("get", "/memory/top"),
+    ("post", "/memory/stop"),
+]
+
+
+@pytest.fixture(autouse=True)
+def stopped_profiler():
+    MemoryProfiler.stop()
+    yield
+    MemoryProfiler.stop()
+
+
+@pytest.fixture
+def client(monkeypatch):
+    app = FastAPI()
+    app.include_router(profiling.router)
+    register_errors_handlers(app)
+    monkeypatch.setattr(settings.profiling, "admin_token", ADMIN_TOKEN)
+    return TestClient(app)
+
+
+def url(path: str) -> str:
+    return settings.api.v1.profiling + path
+
+
+@pytest.mark.parametrize("admin_token", [None, ""])
+@pytest.mark.parametrize("method, path", MEMORY_URLS)
+def test_api_is_disabled_without_configured_token(
+    client, monkeypatch, admin_token, method, path
+):
+    monkeypatch.setattr(settings.profiling, "admin_token", admin_token)
+
+    for headers in ({}, {"X-Admin-Token": ""}, {"X-Admin-Token": "anything"}):
+        response = client.request(method, url(path), headers=headers)
+        assert response.status_code == 404
+
+    assert not tracemalloc.is_tracing()
+
+
+@pytest.mark.parametrize("method, path", MEMORY_URLS)
+@pytest.mark.parametrize("headers", [{}, {"X-Admin-Token": "wrong"}])
+def test_wrong_or_missing_token_is_rejected(client, method, path, headers):
+    response = client.request(method, url(path), headers=headers)
+
+    assert response.status_code == 403
+    assert not tracemalloc.is_tracing()
+
+
+def test_admin_can_start_read_and_stop(client):
+    headers = {"X-Admin-Token": ADMIN_TOKEN}
+
+    assert client.get(url("/memory/top"), headers=headers).status_code == 409
+
+    response = client.post(url("/memory/start?frames=2"), headers=headers)
+    assert response.status_code == 200
+    assert response.json()["data"]["running"] is True
+    assert response.json()["data"]["frames"] == 2
+
+    response = client.get(url("/memory/top?limit=5"), headers=headers)
+    assert response.status_code == 200
+    assert len(response.json()["data"]) <= 5
+
+    response = client.post(url("/memory/stop"), headers=headers)
+    assert response.status_code == 200
+    assert response.json()["data"]["running"] is False
+    assert not tracemalloc.is_tracing()
+
+
+def test_profiler_reports_growth_since_baseline():
+    MemoryProfiler.start(frames=1)
+    retained = [bytearray(1024) for _ in range(1000)]
+
+    top = MemoryProfiler.top(limit=10)
+
+    assert MemoryProfiler.is_running()
+    assert any(
+        entry["file"] == __file__ and entry["size_diff_kb"] >= 1000 for entry in top
+    )
+    assert all(entry["line"] is not None for entry in top)
+    del retained
+
+
+def test_reset_baseline_hides_reported_growth():
+    MemoryProfiler.start()
+    retained = [bytearray(1024) for _ in range(1000)]
+
+    MemoryProfiler.top(limit=10, reset_baseline=True)
+    top = MemoryProfiler.top(limit=10, group_by="filename")
+
+    assert not any(
+        entry["file"] == __file__ and entry["size_diff_kb"] >= 1000 for entry in top
+    )
+    assert all(entry["line"] is None for entry in top)
+    del retained
+
+
+def test_stop_disables_tracing_and_status():
+    MemoryProfiler.start()
+    MemoryProfiler.stop()
+
+    status = MemoryProfiler.status()
+    assert status == {
+        "running": False,
+        "frames": status["frames"],
+        "traced_kb": 0.0,
+        "peak_kb": 0.0,
+    }
+    # Повторная остановка безопасна
+    MemoryProfiler.stop()
+
+
+def test_top_works_when_tracing_was_started_elsewhere():
+    tracemalloc.start()
+
+    assert MemoryProfiler.is_running()
+    assert isinstance(MemoryProfiler.top(limit=5), list)
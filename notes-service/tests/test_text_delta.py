@@ -0,0 +1,62 @@
+import pytest
+
+from utils.text_delta import apply_delta, delta_size, make_delta
+
+TEXTS = [
+    "",
+    "one line",
+    "one line\n",
+    "first\nsecond\nthird",
+    "first\nsecond\nthird\n",
+    "first\r\nsecond\r\nthird\r\n",
+    "mixed\r\nendings\nand\rcarriage\n",
+    "\n\n\n",
+    "Заметка 📝\nстрока разделитель\nконец",
+    "completely different\ncontent here\n",
+]
+
+
+@pytest.mark.parametrize("source", TEXTS)
+@pytest.mark.parametrize("target", TEXTS)
+def test_round_trip(source, target):
+    assert apply_delta(source, make_delta(source, target)) == target
+
+
+@pytest.mark.parametrize(
+    "source, target",
+    [
+        ("a\nb\nc", "a\nb\nc\n"),
+        ("a\nb\nc\n", "a\nb\nc"),
+        ("a\nb\n", "a\r\nb\r\n"),
+        ("text", ""),
+        ("", "text"),
+    ],
+)
+def test_line_ending_changes_are_kept(source, target):
+    assert apply_delta(source, make_delta(source, target)) == target
+
+
+def test_identical_text_is_a_single_copy():
+    text = "a\nb\nc\n"
+
+    assert make_delta(text, text) == [3]
+    assert make_delta("", "") == []
+
+
+def test_small_edit_gives_small_delta():
+    source = "".join(f"line {number}\n" for number in range(1000))
+    target = source.replace("line 500\n", "line five hundred\n")
+
+    delta = make_delta(source, target)
+
+    assert apply_delta(source, delta) == target
+    assert delta_size(delta) < 100
+
+
+def test_whole_text_replacement():
+    source, target = "old\ntext\n", "brand new\n"
+
+    delta = make_delta(source, target)
+
+    assert delta == [-2, "brand new\n"]
+    assert apply_delta(source, delta) == target
@@ -1,3 +1,12 @@
-__all__ = ("camel_case_to_snake_case",)
+__all__ = (
+    "camel_case_to_snake_case",
+    "TTLCache",
+    "etag_matches",
+    "make_etag",
+    "note_etag",
+    "version_from_if_match",
+)
 
 from .case_converter import camel_case_to_snake_case
+from .ttl_cache import TTLCache
+from .etag import etag_matches, make_etag, note_etag, version_from_if_match
@@ -0,0 +1,11 @@
+# Конфигурация полнотекстового поиска Postgres для заметок.
+# Используется в генерируемой колонке search_vector, поэтому при смене нужна миграция
+NOTES_SEARCH_CONFIG = "russian"
+NOTES_SEARCH_HEADLINE_OPTIONS = "MaxFragments=2, MaxWords=25, MinWords=8"
+# Длина превью содержимого в генерируемой колонке excerpt, при смене нужна миграция
+NOTES_EXCERPT_LENGTH = 200
+# Временная таблица для загрузки импортируемых заметок через COPY
+NOTES_IMPORT_STAGING_TABLE = "notes_import_staging"
+# Теги заметок: хранятся в нижнем регистре, без пробелов и запятых (запятая - разделитель в ключах кэша)
+NOTES_TAG_MAX_LENGTH = 64
+NOTES_MAX_TAGS = 32
@@ -0,0 +1,42 @@
+from hashlib import blake2b
+
+
+def make_etag(*parts: object) -> str:
+    """Строгий ETag из частей, описывающих состояние ресурса"""
+    digest = blake2b(
+        ":".join(str(part) for part in parts).encode(), digest_size=12
+    ).hexdigest()
+    return f'"{digest}"'
+
+
+def note_etag(note_id: int, version: int) -> str:
+    """ETag заметки; версия читается обратно из If-Match"""
+    return f'"{note_id}.{version}"'
+
+
+def etag_matches(header: str | None, etag: str) -> bool:
+    """Проверка If-None-Match (слабое сравнение, поддерживается '*')"""
+    if not header:
+        return False
+    tags = {tag.strip().removeprefix("W/") for tag in header.split(",")}
+    return "*" in tags or etag in tags
+
+
+def version_from_if_match(header: str | None, note_id: int) -> int | None:
+    """Ожидаемая версия заметки из заголовка If-Match вида '"<id>.<version>"'.
+
+    If-Match сравнивается строго: слабые ETag не подходят. Из списка берутся
+    ETag этой заметки, и версия должна быть ровно одна. '*' не задает версию
+    для оптимистичной блокировки, поэтому, как и несовпадение, дает None.
+    """
+    if not header:
+        return None
+    versions = set()
+    for tag in header.split(","):
+        tag = tag.strip()
+        if tag.startswith("W/") or len(tag) < 2 or tag[0] != '"' or tag[-1] != '"':
+            continue
+        note_part, _, version = tag[1:-1].partition(".")
+        if note_part == str(note_id) and version.isdigit():
+            versions.add(int(version))
+    return versions.pop() if len(versions) == 1 else None
@@ -1,12 +1,43 @@
 from loguru import logger
+import orjson
 import sys
 
+
+def is_access_record(record) -> bool:
+    return "access" in record["extra"]
+
+
+def not_access_record(record) -> bool:
+    return "access" not in record["extra"]
+
+
+def access_log_format(record) -> str:
+    """Одна JSON-строка на запрос для sink access-лога"""
+    record["extra"]["access_line"] = orjson.dumps(
+        {"time": record["time"].isoformat(), **record["extra"]["access"]}
+    ).decode()
+    return "{extra[access_line]}\n"
+
+
+def add_access_sink(sink=sys.stdout) -> int:
+    """Sink access-лога: запись идет из фонового потока loguru через очередь,
+    поэтому медленный вывод не задерживает ответы"""
+    return logger.add(
+        sink,
+        format=access_log_format,
+        level="INFO",
+        filter=is_access_record,
+        enqueue=True,
+    )
+
+
 # Настройка логгера
 logger.remove()
 logger.add(
     sys.stdout,
     format="<green>{time:YYYY-MM-DD HH:mm:ss}</green> | <level>{level: <8}</level> | <cyan>{name}</cyan>:<cyan>{function}</cyan>:<cyan>{line}</cyan> - <level>{message}</level>",
     level="INFO",
+    filter=not_access_record,
 )
 logger.add(
     "logs/notes_service.log",
@@ -14,4 +45,6 @@ logger.add(
     retention="7 days",
     format="{time:YYYY-MM-DD HH:mm:ss} | {level: <8} | {name}:{function}:{line} - {message}",
     level="DEBUG",
+    filter=not_access_record,
 )
+add_access_sink()
@@ -0,0 +1,67 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator
+
+from starlette.datastructures import MutableHeaders
+from starlette.requests import HTTPConnection
+
+SAFE_METHODS = frozenset({"GET", "HEAD", "OPTIONS"})
+PIN_COOKIE = "notes_read_primary"
+
+_read_primary: ContextVar[bool] = ContextVar("read_primary", default=False)
+
+
+def primary_pinned() -> bool:
+    """Чтения текущего запроса должны идти на primary"""
+    return _read_primary.get()
+
+
+@contextmanager
+def read_from_primary() -> Iterator[None]:
+    """Чтения внутри блока идут на primary (например, заполнение кэша)"""
+    token = _read_primary.set(True)
+    try:
+        yield
+    finally:
+        _read_primary.reset(token)
+
+
+class ReadYourWritesMiddleware:
+    """ASGI middleware закрепления клиента за primary после записи.
+
+    Изменяющие запросы целиком выполняются на primary, а успешный ответ на
+    них ставит cookie на pin_seconds: пока она есть, чтения клиента тоже идут
+    на primary, и он сразу видит свои изменения, даже если реплика отстает.
+    """
+
+    def __init__(self, app, pin_seconds: int = 5):
+        self.app = app
+        self.pin_seconds = pin_seconds
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        is_write = scope["method"] not in SAFE_METHODS
+        pinned = is_write or PIN_COOKIE in HTTPConnection(scope).cookies
+
+        async def send_with_pin(message):
+            if (
+                is_write
+                and message["type"] == "http.response.start"
+                and message["status"] < 400
+            ):
+                headers = MutableHeaders(scope=message)
+                headers.append(
+                    "set-cookie",
+                    f"{PIN_COOKIE}=1; Max-Age={self.pin_seconds}; Path=/; "
+                    "HttpOnly; SameSite=Lax",
+                )
+            await send(message)
+
+        token = _read_primary.set(pinned)
+        try:
+            await self.app(scope, receive, send_with_pin)
+        finally:
+            _read_primary.reset(token)
@@ -0,0 +1,42 @@
+from difflib import SequenceMatcher
+
+# Построчная дельта - список операций над строками исходного текста:
+#   n > 0 - скопировать n строк, n < 0 - пропустить -n строк, str - вставить текст
+TextDelta = list[int | str]
+
+
+def make_delta(source: str, target: str) -> TextDelta:
+    """Дельта, превращающая source в target; размер пропорционален правке"""
+    source_lines = source.splitlines(keepends=True)
+    target_lines = target.splitlines(keepends=True)
+    delta: TextDelta = []
+    matcher = SequenceMatcher(None, source_lines, target_lines, autojunk=False)
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag == "equal":
+            delta.append(i2 - i1)
+            continue
+        if i2 > i1:
+            delta.append(i1 - i2)
+        if j2 > j1:
+            delta.append("".join(target_lines[j1:j2]))
+    return delta
+
+
+def apply_delta(source: str, delta: TextDelta) -> str:
+    source_lines = source.splitlines(keepends=True)
+    parts: list[str] = []
+    position = 0
+    for op in delta:
+        if isinstance(op, str):
+            parts.append(op)
+        elif op > 0:
+            parts.extend(source_lines[position : position + op])
+            position += op
+        else:
+            position -= op
+    return "".join(parts)
+
+
+def delta_size(delta: TextDelta) -> int:
+    """Примерный объем дельты в символах: вставки целиком, счетчики строк по 8"""
+    return sum(len(op) if isinstance(op, str) else 8 for op in delta)
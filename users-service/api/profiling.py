@@ -0,0 +1,64 @@
+import asyncio
+import hmac
+
+from fastapi import APIRouter, Depends, Header, Query
+
+from core.settings import settings
+
+from exceptions.exceptions import (
+    NotAllowedPermisionError,
+    ProfilingDisabledError,
+    ProfilingNotRunningError,
+)
+
+from utils.logging import logger
+from utils.memory_profiler import GROUP_BY_OPTIONS, MemoryProfiler
+
+
+async def require_admin_token(x_admin_token: str | None = Header(None)) -> None:
+    admin_token = settings.profiling.admin_token
+    if not admin_token:
+        raise ProfilingDisabledError
+    if x_admin_token is None or not hmac.compare_digest(x_admin_token, admin_token):
+        logger.warning("Запрос к admin API профилирования с неверным токеном")
+        raise NotAllowedPermisionError("Invalid admin token")
+
+
+profiling = APIRouter(dependencies=[Depends(require_admin_token)])
+
+
+# Состояние профилирования памяти
+@profiling.get("/profiling/memory")
+async def memory_status():
+    return {"data": MemoryProfiler.status()}
+
+
+# Запуск tracemalloc и базовый снимок
+@profiling.post("/profiling/memory/start")
+async def start_memory_profiling(
+    frames: int = Query(settings.profiling.traceback_frames, ge=1, le=64),
+):
+    await asyncio.to_thread(MemoryProfiler.start, frames)
+    logger.info(f"Профилирование памяти запущено (frames={frames})")
+    return {"data": MemoryProfiler.status()}
+
+
+# Топ источников аллокаций относительно базового снимка
+@profiling.get("/profiling/memory/top")
+async def memory_top(
+    limit: int = Query(settings.profiling.top_limit, ge=1, le=500),
+    group_by: str = Query("lineno", pattern=f"^({'|'.join(GROUP_BY_OPTIONS)})$"),
+    reset_baseline: bool = Query(False),
+):
+    if not MemoryProfiler.is_running():
+        raise ProfilingNotRunningError
+    top = await asyncio.to_thread(MemoryProfiler.top, limit, group_by, reset_baseline)
+    return {"data": top, "status": MemoryProfiler.status()}
+
+
+# Остановка tracemalloc: накладные расходы на аллокации исчезают
+@profiling.post("/profiling/memory/stop")
+async def stop_memory_profiling():
+    MemoryProfiler.stop()
+    logger.info("Профилирование памяти остановлено")
+    return {"data": MemoryProfiler.status()}
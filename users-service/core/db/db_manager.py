@@ -14,6 +14,7 @@ from sqlalchemy.ext.asyncio import (
 )
 
 from core.settings import settings
+from utils.sql_metrics import instrument_engine
 from utils.time_decorator import time_all_methods, sync_timed_report, async_timed_report
 
 
@@ -26,6 +27,7 @@ class DbManager:
         echo_pool: bool = False,
         pool_size: int = 5,
         max_overflow: int = 10,
+        instrument: bool = False,
     ) -> None:
         self.engine: AsyncEngine = create_async_engine(
             url=url,
@@ -34,6 +36,8 @@ class DbManager:
             pool_size=pool_size,
             max_overflow=max_overflow,
         )
+        if instrument:
+            instrument_engine(self.engine)
         self.session_factory: async_sessionmaker[AsyncSession] = async_sessionmaker(
             bind=self.engine,
             autoflush=False,
@@ -55,4 +59,5 @@ db_manager = DbManager(
     echo_pool=settings.db.echo_pool,
     pool_size=settings.db.pool_size,
     max_overflow=settings.db.max_overflow,
+    instrument=settings.sql_metrics.enabled,
 )
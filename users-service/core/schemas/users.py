@@ -45,6 +45,8 @@ class JWTPayload(BaseModel):
     jti: str
     role: str
     iat: datetime
+    # Имя пользователя нужно другим сервисам для локальной проверки токена
+    username: Optional[str] = None
 
 
 class AccessToken(BaseModel):
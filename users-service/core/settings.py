@@ -21,6 +21,30 @@ class AppSettings(BaseModel):
     enable_time_reports: bool = False
 
 
+class AccessLogConfig(BaseModel):
+    enabled: bool = True
+    # Доля успешных запросов в access-логе; 5xx и медленные пишутся всегда.
+    # Полный лог: ACCESS_SAMPLE_RATE=1.0
+    sample_rate: float = 0.1
+    slow_threshold_ms: float = 1000.0
+
+
+class ProfilingConfig(BaseModel):
+    # Запуск tracemalloc при старте процесса; по умолчанию только через admin API
+    memory_on_start: bool = False
+    traceback_frames: int = 1
+    top_limit: int = 25
+    # Токен заголовка X-Admin-Token; без него admin API профилирования отключено
+    admin_token: str | None = None
+
+
+class SqlMetricsConfig(BaseModel):
+    # Метрики SQL по эндпоинтам (число запросов, время, строки)
+    enabled: bool = True
+    # Детектор N+1 работает только в режиме DEV: порог повторов одной формы запроса
+    n_plus_one_threshold: int = 5
+
+
 class JwtAuth(BaseModel):
     model_config = ConfigDict(strict=True)
 
@@ -49,6 +73,19 @@ class DatabaseSettings(BaseModel):
         return f"postgresql+asyncpg://{self.user}:{self.pwd}@{self.host}:{self.port}/{self.name}"
 
 
+class MediaServiceConfig(BaseModel):
+    base_url: str = "http://krakend:8080"
+    # Пул соединений общего HTTP-клиента
+    max_connections: int = 100
+    max_keepalive_connections: int = 20
+    keepalive_expiry: float = 30.0
+    # Таймауты операций, сек
+    connect_timeout: float = 5.0
+    upload_timeout: float = 120.0
+    get_timeout: float = 10.0
+    delete_timeout: float = 10.0
+
+
 class RedisSettings(BaseModel):
     host: str
     port: int
@@ -63,13 +100,19 @@ class Settings(BaseSettings):
         env_file=str(DOTENV_FILE_PATH),
         case_sensitive=False,
         env_nested_delimiter="_",
+        # Делится только первый "_" после префикса секции: USERS_ACCESS_SAMPLE_RATE -> access.sample_rate
+        env_nested_max_split=1,
         env_prefix="USERS_",
     )
 
     app: AppSettings = AppSettings() 
+    access: AccessLogConfig = AccessLogConfig()
+    profiling: ProfilingConfig = ProfilingConfig()
+    sql_metrics: SqlMetricsConfig = SqlMetricsConfig()
     jwt: JwtAuth = JwtAuth()
     db: DatabaseSettings
     redis: RedisSettings
+    media: MediaServiceConfig = MediaServiceConfig()
 
 
 settings = Settings()  # type: ignore
@@ -109,6 +109,17 @@ class NotAllowedPermisionError(BaseAPIException):
         super().__init__(detail=detail, status_code=status.HTTP_403_FORBIDDEN)
 
 
+# Исключения admin API
+class ProfilingDisabledError(BaseAPIException):
+    def __init__(self, detail: str = "Profiling API is disabled"):
+        super().__init__(detail=detail, status_code=status.HTTP_404_NOT_FOUND)
+
+
+class ProfilingNotRunningError(BaseAPIException):
+    def __init__(self, detail: str = "Memory profiling is not running"):
+        super().__init__(detail=detail, status_code=status.HTTP_409_CONFLICT)
+
+
 # Исключения обработки файлов
 class EmptyFileError(BaseAPIException):
     def __init__(self, detail: str = "File is empty"):
@@ -0,0 +1,35 @@
+import httpx
+
+from core.settings import settings
+
+_media_client: httpx.AsyncClient | None = None
+
+
+def get_media_client() -> httpx.AsyncClient:
+    """Общий для приложения HTTP-клиент media-service с пулом keep-alive соединений"""
+    global _media_client
+    if _media_client is None:
+        _media_client = httpx.AsyncClient(
+            base_url=settings.media.base_url,
+            limits=httpx.Limits(
+                max_connections=settings.media.max_connections,
+                max_keepalive_connections=settings.media.max_keepalive_connections,
+                keepalive_expiry=settings.media.keepalive_expiry,
+            ),
+            timeout=httpx.Timeout(
+                settings.media.get_timeout, connect=settings.media.connect_timeout
+            ),
+            follow_redirects=True,
+        )
+    return _media_client
+
+
+def operation_timeout(seconds: float) -> httpx.Timeout:
+    return httpx.Timeout(seconds, connect=settings.media.connect_timeout)
+
+
+async def close_media_client() -> None:
+    global _media_client
+    if _media_client is not None:
+        await _media_client.aclose()
+        _media_client = None
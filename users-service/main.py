@@ -5,31 +5,37 @@ current_dir = os.path.dirname(os.path.abspath(__file__))
 sys.path.append(current_dir)
 
 from contextlib import asynccontextmanager
-import tracemalloc
 
-from fastapi import FastAPI, Request
+from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import ORJSONResponse
 
 from core.settings import settings
 from api import api_router
+from integrations.files.client import close_media_client, get_media_client
 
-from prometheus_fastapi_instrumentator import Instrumentator
+from prometheus_fastapi_instrumentator import Instrumentator, metrics
 
 from errors_handlers import register_errors_handlers
 
+from utils.access_log import AccessLogMiddleware
 from utils.logging import logger
+from utils.memory_profiler import MemoryProfiler
+from utils.sql_metrics import SqlStatsMiddleware, sql_metrics
 
 
-# Включаем отслеживание памяти, для дебага ошибок с ассинхронными функциями
-tracemalloc.start()
+# Отслеживание памяти только по настройке: иначе включается через admin API профилирования
+if settings.profiling.memory_on_start:
+    MemoryProfiler.start(settings.profiling.traceback_frames)
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     logger.info("Запуск приложения...")
+    get_media_client()
     yield
     logger.info("Выключение...")
+    await close_media_client()
 
 
 def create_app() -> FastAPI:
@@ -50,19 +56,21 @@ def create_app() -> FastAPI:
         allow_headers=["*"],
     )
 
-    # Подключаем middleware для просмотра содержимого http запроса
-    @main_app.middleware("http")
-    async def log_requests(request: Request, call_next):
-        logger.info(f"\n----------- New request -----------")
-        logger.info(f"Request: {request.method} {request.url}")
-        logger.info(f"Headers: {request.headers}")
-        try:
-            body = await request.json()
-            logger.info(f"Body: {body}\n")
-        except Exception as e:
-            logger.warning(f"Could not decode JSON body: {e}\n")
-        response = await call_next(request)
-        return response
+    # Подключаем структурный access-лог (без чтения тела запроса)
+    if settings.access.enabled:
+        main_app.add_middleware(
+            AccessLogMiddleware,
+            sample_rate=settings.access.sample_rate,
+            slow_threshold_ms=settings.access.slow_threshold_ms,
+        )
+
+    # Подключаем сбор статистики SQL по запросу (и детектор N+1 в режиме DEV)
+    if settings.sql_metrics.enabled:
+        main_app.add_middleware(
+            SqlStatsMiddleware,
+            detect_n_plus_one=settings.app.mode == "DEV",
+            n_plus_one_threshold=settings.sql_metrics.n_plus_one_threshold,
+        )
 
     # Подключаем api-роутеры
     main_app.include_router(api_router)
@@ -71,7 +79,11 @@ def create_app() -> FastAPI:
     register_errors_handlers(main_app)
 
     # Подключаем prometheus-метрики
-    Instrumentator().instrument(main_app).expose(main_app)
+    instrumentator = Instrumentator()
+    if settings.sql_metrics.enabled:
+        # С пользовательской инструментацией стандартные метрики подключаются явно
+        instrumentator.add(metrics.default(), sql_metrics())
+    instrumentator.instrument(main_app).expose(main_app)
 
     # Подключаем админ панель
     # setup_admin(app, db_manager.engine)
@@ -167,7 +167,7 @@ class AuthService:
             raise EntityNotFoundError(detail="Refresh token not found")
 
     async def _issue_tokens(
-        self, user_id: int, user_role: str
+        self, user_id: int, user_role: str, username: str | None = None
     ) -> tuple[AccessToken, str]:
         """
         Приватный вспомогательный метод для генерации Access и Refresh токенов,
@@ -175,6 +175,7 @@ class AuthService:
 
         Params:
             user_id(int): ID пользователя, для которого генерируются токены.
+            username(str | None): Имя пользователя, передается в claims Access токена.
 
         Returns:
             tuple: Кортеж из Access токена (str) и "сырого" Refresh токена (str)
@@ -185,7 +186,9 @@ class AuthService:
         logger.debug(f"Начало создания токенов для пользователя ID: {user_id}.")
 
         # 1. Создание Access токена
-        access_token = create_access_token(user_id=user_id, user_role=user_role)
+        access_token = create_access_token(
+            user_id=user_id, user_role=user_role, username=username
+        )
 
         # 2. Создание Refresh токена и его хэша
         refresh_token_raw, refresh_hash = gen_refresh_token()
@@ -260,7 +263,7 @@ class AuthService:
 
             # 4. Генерация токенов и сохранение Refresh токена в БД
             access_token, refresh_token = await self._issue_tokens(
-                user_id=user.id, user_role=user.role
+                user_id=user.id, user_role=user.role, username=user.username
             )
 
             # 5. Установка токенов в куки
@@ -519,7 +522,7 @@ class AuthService:
             await RefreshTokensRepo.delete_refresh_token(stored)
 
             access_token, refresh_token = await self._issue_tokens(
-                user_id=user.id, user_role=user.role
+                user_id=user.id, user_role=user.role, username=user.username
             )
 
             set_tokens_cookie(
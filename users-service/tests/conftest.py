@@ -0,0 +1,16 @@
+import os
+
+# core.settings создает settings при импорте: обязательные параметры без .env.
+# Режим TEST не подключает файловые sink логгера
+REQUIRED_ENV = {
+    "USERS_APP_MODE": "TEST",
+    "USERS_DB_HOST": "localhost",
+    "USERS_DB_PORT": "5433",
+    "USERS_DB_USER": "users",
+    "USERS_DB_PWD": "users",
+    "USERS_DB_NAME": "users",
+    "USERS_REDIS_HOST": "localhost",
+    "USERS_REDIS_PORT": "6380",
+}
+for name, value in REQUIRED_ENV.items():
+    os.environ.setdefault(name, value)
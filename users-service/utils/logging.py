@@ -7,6 +7,7 @@ sys.path.append(current_dir)
 from pathlib import Path
 import sys
 import loguru
+import orjson
 from core.settings import settings
 
 # Определяем путь к директории для логов
@@ -15,6 +16,35 @@ LOGS_DIR = f"{BASE_DIR}/logs"
 
 logger = loguru.logger
 
+
+def is_access_record(record) -> bool:
+    return "access" in record["extra"]
+
+
+def not_access_record(record) -> bool:
+    return "access" not in record["extra"]
+
+
+def access_log_format(record) -> str:
+    """Одна JSON-строка на запрос для sink access-лога"""
+    record["extra"]["access_line"] = orjson.dumps(
+        {"time": record["time"].isoformat(), **record["extra"]["access"]}
+    ).decode()
+    return "{extra[access_line]}\n"
+
+
+def add_access_sink(sink=sys.stdout) -> int:
+    """Sink access-лога: запись идет из фонового потока loguru через очередь,
+    поэтому медленный вывод не задерживает ответы"""
+    return logger.add(
+        sink,
+        format=access_log_format,
+        level="INFO",
+        filter=is_access_record,
+        enqueue=True,
+    )
+
+
 if settings.app.mode != "TEST":
     # Настройка уровня логирования
     logger.remove()
@@ -27,6 +57,8 @@ if settings.app.mode != "TEST":
         backtrace=True,
         diagnose=True,
         enqueue=True,
+        filter=not_access_record,
     )
     # Добавляем обработчик для печати в stdout
-    logger.add(sys.stderr)
+    logger.add(sys.stderr, filter=not_access_record)
+    add_access_sink()
@@ -0,0 +1,78 @@
+import tracemalloc
+
+# Аллокации самого tracemalloc и импорта модулей в отчет не попадают
+SNAPSHOT_FILTERS = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+    tracemalloc.Filter(False, "<unknown>"),
+)
+GROUP_BY_OPTIONS = ("lineno", "filename")
+
+
+class MemoryProfiler:
+    """Профилирование памяти по запросу.
+
+    tracemalloc запускается только на время замера: пока профилирование
+    выключено, аллокации не отслеживаются и ничего не стоят. При старте
+    снимается базовый снимок, отчет - разница с ним по файлам и строкам.
+    """
+
+    _baseline: tracemalloc.Snapshot | None = None
+
+    @staticmethod
+    def is_running() -> bool:
+        return tracemalloc.is_tracing()
+
+    @staticmethod
+    def _take_snapshot() -> tracemalloc.Snapshot:
+        return tracemalloc.take_snapshot().filter_traces(SNAPSHOT_FILTERS)
+
+    @classmethod
+    def start(cls, frames: int = 1) -> None:
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(frames)
+        cls._baseline = cls._take_snapshot()
+
+    @classmethod
+    def stop(cls) -> None:
+        tracemalloc.stop()
+        cls._baseline = None
+
+    @classmethod
+    def status(cls) -> dict:
+        current, peak = tracemalloc.get_traced_memory()
+        return {
+            "running": tracemalloc.is_tracing(),
+            "frames": tracemalloc.get_traceback_limit(),
+            "traced_kb": round(current / 1024, 1),
+            "peak_kb": round(peak / 1024, 1),
+        }
+
+    @classmethod
+    def top(
+        cls, limit: int, group_by: str = "lineno", reset_baseline: bool = False
+    ) -> list[dict]:
+        """Топ источников аллокаций относительно базового снимка (по росту размера)"""
+        snapshot = cls._take_snapshot()
+        # Трассировка запущена в обход start (PYTHONTRACEMALLOC): базой станет этот снимок
+        if cls._baseline is None:
+            cls._baseline = snapshot
+        stats = snapshot.compare_to(cls._baseline, group_by)
+        if reset_baseline:
+            cls._baseline = snapshot
+
+        top = []
+        for stat in stats[:limit]:
+            frame = stat.traceback[0]
+            top.append(
+                {
+                    "file": frame.filename,
+                    "line": frame.lineno if group_by == "lineno" else None,
+                    "size_kb": round(stat.size / 1024, 1),
+                    "size_diff_kb": round(stat.size_diff / 1024, 1),
+                    "count": stat.count,
+                    "count_diff": stat.count_diff,
+                }
+            )
+        return top
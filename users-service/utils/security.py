@@ -26,11 +26,14 @@ ACCESS_ISSUED_AT_NAME = "iat"
 REFRESH_TOKEN_TYPE = "refresh"
 
 
-def create_access_token(user_id: int, user_role: str) -> AccessToken:
+def create_access_token(
+    user_id: int, user_role: str, username: str | None = None
+) -> AccessToken:
     """
     Создает новый access-токен для указанного пользователя.
 
     :param user_id: Идентификатор пользователя
+    :param username: Имя пользователя, передается в токене для других сервисов
     :return: Строка с новым access-токеном
     """
     if isinstance(user_id, int):
@@ -46,6 +49,7 @@ def create_access_token(user_id: int, user_role: str) -> AccessToken:
             jti=jti,
             iat=iat,
             role=user_role,
+            username=username,
         )
 
         # Генерируем токен
@@ -189,5 +193,6 @@ def decode_jwt(
             jti=decoded["jti"],
             role=decoded["role"],
             iat=decoded["iat"],
+            username=decoded.get("username"),
         )
     raise TypeError